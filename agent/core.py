@@ -1,31 +1,72 @@
 import config
 from utils.database import get_relevant_history, get_relevant_context, store_conversation_turn
 from bin.tool_utils import execute_tool
+from tools_mod import plugins
+from utils import tracing, worker_pool
+
+
+def _select_model(models):
+    """Picks the tool-enabled model from the models dict built by the entry points."""
+    if isinstance(models, dict):
+        return models.get("tools") or models.get("main") or next(iter(models.values()))
+    return models
+
+
+def _last_user_text(conversation_history):
+    for turn in reversed(conversation_history):
+        if isinstance(turn, dict) and turn.get("role") == "user":
+            texts = [p for p in turn.get("parts", []) if isinstance(p, str)]
+            if texts:
+                return texts[-1]
+    return ""
+
+
+def run_agent_step(models, conversation_history, user_id, user_input=None, print_func=print):
+    with tracing.span("run_agent_step", user_id=user_id):
+        return _run_agent_step(models, conversation_history, user_id, user_input, print_func)
+
+
+def _run_agent_step(models, conversation_history, user_id, user_input, print_func):
+    if user_input:
+        conversation_history.append({"role": "user", "parts": [user_input]})
+    user_query = user_input or _last_user_text(conversation_history)
+
+    # Tool modules created or edited since the last step are (re)loaded here
+    report = plugins.refresh()
+    if report["added"] or report["reloaded"] or report["failed"]:
+        print_func(plugins.format_report(report))
+        # Pool workers imported the old code
+        worker_pool.recycle()
 
-def run_agent_step(model_wrapper, user_query, user_id, conversation_history, print_func=print):
     # 1. Restore the context retrieval (RAG)
     # This searches the 'agent_learning' collection for relevant code/docs
-    context = get_relevant_context(user_query)
-    
+    with tracing.span("get_relevant_context", category="retrieval"):
+        context = get_relevant_context(user_query)
+
     # 2. Restore the MMR History retrieval
     # This fetches the last 10-15 relevant turns from 'agent_memory'
-    history_turns = get_relevant_history(user_query, n_results=10)
-    
+    with tracing.span("get_relevant_history", category="retrieval"):
+        history_turns = get_relevant_history(user_query, n_results=10)
+
     # 3. Restore the System Prompt Assembly
     # We must ensure the agent knows WHAT it is remembering
     # (Note: In this implementation, the history is passed to the API, context injection typically happens there or via history manipulation.
     # For now, we follow the user instruction to just focus on the return signature and execution loop.)
-    
+
     # 4. Agent Reasoning Loop
     from api import agentic_reason_and_act
 
+    model_wrapper = _select_model(models)
+
     # We pass the full history plus the new query
-    thought, function_call = agentic_reason_and_act(model_wrapper, conversation_history)
-    
+    with tracing.span("agentic_reason_and_act", category="model", turns=len(conversation_history)):
+        thought, function_call = agentic_reason_and_act(model_wrapper, conversation_history)
+
     if function_call:
         print_func(f"🤖 Tool Call: {function_call.name}")
         # Execute the tool using execute_tool
-        result = execute_tool(function_call, model_wrapper)
+        with tracing.span("execute_tool", category="tool", tool=function_call.name):
+            result = execute_tool(function_call, models)
 
         # Append the result to history as a function_response to maintain context
         # Assuming conversation_history is a list of dicts (Gemini/standard format)
@@ -38,6 +79,6 @@ def run_agent_step(model_wrapper, user_query, user_id, conversation_history, pri
 
     else:
         # No tool call, just thought/response
+        if thought:
+            conversation_history.append({"role": "model", "parts": [thought]})
         return True, thought, user_query
-
-    return thought, function_call
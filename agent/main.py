@@ -1,5 +1,6 @@
 from agent.core import run_agent_step
 from utils.database import store_conversation_turn
+from utils import tracing, metrics, worker_pool
 
 
 def handle_agent_task(models, initial_prompt, initial_context):
@@ -8,6 +9,8 @@ def handle_agent_task(models, initial_prompt, initial_context):
     """
     print("🤖 Agent started. Type 'exit' to quit.")
     user_id = "default_user"  # In a real app, this would be dynamic
+    metrics.start_session(user_id)
+    worker_pool.prewarm()
 
     sys_prompt = f"""Your goal is to: {initial_prompt}.
     When you need to retrieve information, first consider if you can narrow down your search.
@@ -40,7 +43,8 @@ def handle_agent_task(models, initial_prompt, initial_context):
                 print(f"🤖: {response}")
                 # If a final response was given after a tool call, store the turn
                 if last_user_input:
-                    store_conversation_turn(last_user_input, response, user_id)
+                    with tracing.span("store_conversation_turn", category="persistence"):
+                        store_conversation_turn(last_user_input, response, user_id)
 
         except KeyboardInterrupt:
             print("\n👋 Agent stopped by user.")
@@ -48,3 +52,7 @@ def handle_agent_task(models, initial_prompt, initial_context):
         except Exception as e:
             print(f"🔥 A critical error occurred: {e}")
             break
+
+    metrics.dump_session()
+    worker_pool.shutdown()
+    print(metrics.format_summary())
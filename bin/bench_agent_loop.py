@@ -0,0 +1,272 @@
+import sys
+import os
+import io
+import json
+import time
+import tempfile
+import argparse
+import builtins
+import contextlib
+import statistics
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from bin.stub_model_server import StubModelServer
+
+PHASES = ("retrieval", "model", "tool", "persistence")
+
+# Each scenario is an initial prompt, the follow-up user inputs and the
+# canned model replies served by the stub for the whole conversation.
+SCENARIOS = {
+    "single_answer": {
+        "prompt": "Say hello.",
+        "inputs": [],
+        "script": [{"text": "Hello! How can I help?"}],
+    },
+    "read_and_answer": {
+        "prompt": "Summarise the README.",
+        "inputs": [],
+        "script": [
+            {"function_call": {"name": "read_file", "args": {"path": "README.md"}}},
+            {"text": "The README explains how to install and run the agent."},
+        ],
+    },
+    "multi_tool": {
+        "prompt": "Inspect the project and report its state.",
+        "inputs": [],
+        "script": [
+            {"function_call": {"name": "list_files", "args": {"path": "utils"}}},
+            {"function_call": {"name": "read_file", "args": {"path": "config.py"}}},
+            {"function_call": {"name": "git_status", "args": {}}},
+            {"text": "The project is configured and the working tree was inspected."},
+        ],
+    },
+    "follow_up": {
+        "prompt": "What does main.py do?",
+        "inputs": ["And api.py?"],
+        "script": [
+            {"function_call": {"name": "read_file", "args": {"path": "main.py"}}},
+            {"text": "main.py builds the models and starts the agent."},
+            {"function_call": {"name": "read_file", "args": {"path": "api.py"}}},
+            {"text": "api.py wraps generate_content with retry handling."},
+        ],
+    },
+}
+
+
+class StepRecorder:
+    """Collects wall-clock time per agent step, split by phase."""
+
+    def __init__(self):
+        self.steps = []
+        self._current = None
+
+    def begin_step(self):
+        self._current = {"total": 0.0, **{phase: 0.0 for phase in PHASES}}
+        self.steps.append(self._current)
+
+    def add(self, phase, elapsed):
+        if self._current is None:
+            self.begin_step()
+        self._current[phase] += elapsed
+        if phase == "persistence":
+            # Persistence runs after run_agent_step returns; charge it to that step.
+            self._current["total"] += elapsed
+
+    def timed(self, phase, func):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add(phase, time.perf_counter() - start)
+        return wrapper
+
+    def timed_step(self, func):
+        def wrapper(*args, **kwargs):
+            self.begin_step()
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._current["total"] += time.perf_counter() - start
+        return wrapper
+
+
+@contextlib.contextmanager
+def _patched(patches):
+    """Temporarily replaces (owner, attribute) pairs with new values."""
+    saved = [(owner, name, getattr(owner, name)) for owner, name, _ in patches]
+    try:
+        for owner, name, value in patches:
+            setattr(owner, name, value)
+        yield
+    finally:
+        for owner, name, value in reversed(saved):
+            setattr(owner, name, value)
+
+
+def _scripted(values, final):
+    remaining = list(values)
+
+    def reply(*args, **kwargs):
+        return remaining.pop(0) if remaining else final
+    return reply
+
+
+def _instrumentation(recorder):
+    import agent.core
+    import agent.main
+    import tui_agent
+    from utils.model_wrapper import GenerativeModelWrapper
+
+    return [
+        (agent.core, "get_relevant_context", recorder.timed("retrieval", agent.core.get_relevant_context)),
+        (agent.core, "get_relevant_history", recorder.timed("retrieval", agent.core.get_relevant_history)),
+        (agent.core, "execute_tool", recorder.timed("tool", agent.core.execute_tool)),
+        (agent.main, "store_conversation_turn", recorder.timed("persistence", agent.main.store_conversation_turn)),
+        (GenerativeModelWrapper, "generate_content", recorder.timed("model", GenerativeModelWrapper.generate_content)),
+        (agent.main, "run_agent_step", recorder.timed_step(agent.main.run_agent_step)),
+        (tui_agent, "run_agent_step", recorder.timed_step(tui_agent.run_agent_step)),
+    ]
+
+
+def run_handle_agent_task(scenario):
+    import config
+    from agent.main import handle_agent_task
+    from utils.model_wrapper import GenerativeModelWrapper
+    from tools_mod import tool_definitions
+
+    models = {
+        "main": GenerativeModelWrapper(
+            model_name=config.MODEL_NAME,
+            system_instruction="You are a capable Termux agent with RAG and system access.",
+            tools=tool_definitions,
+        )
+    }
+    with _patched([(builtins, "input", _scripted(scenario["inputs"], "exit"))]):
+        handle_agent_task(models, scenario["prompt"], [])
+
+
+def run_tui_main(scenario):
+    import tui_agent
+
+    with _patched([(tui_agent.charm, "gum_input", _scripted(scenario["inputs"], ""))]):
+        tui_agent.main(initial_agent_prompt=scenario["prompt"])
+
+
+ENTRY_POINTS = {
+    "handle_agent_task": run_handle_agent_task,
+    "tui_agent.main": run_tui_main,
+}
+
+
+def run_benchmark(scenarios, entry_points, repeat=1, latency_ms=0, verbose=False):
+    """Runs every scenario through every entry point and returns the step timings."""
+    import config
+    from utils import metrics
+
+    results = []
+    with StubModelServer(latency_ms=latency_ms) as server:
+        saved = (config.GEMINI_BASE_URL, config.API_KEY)
+        config.GEMINI_BASE_URL = server.base_url
+        config.API_KEY = config.API_KEY or "stub"
+        try:
+            for entry_name in entry_points:
+                for scenario_name, scenario in scenarios.items():
+                    for run in range(repeat):
+                        server.load_script(scenario["script"])
+                        recorder = StepRecorder()
+                        sink = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+                        start = time.perf_counter()
+                        with _patched(_instrumentation(recorder)), sink:
+                            ENTRY_POINTS[entry_name](scenario)
+                        results.append({
+                            "entry_point": entry_name,
+                            "scenario": scenario_name,
+                            "run": run,
+                            "wall": time.perf_counter() - start,
+                            "model_requests": len(server.requests),
+                            "tokens": metrics.get_stats()["totals"],
+                            "steps": recorder.steps,
+                        })
+        finally:
+            config.GEMINI_BASE_URL, config.API_KEY = saved
+    return results
+
+
+def _ms(seconds):
+    return f"{seconds * 1000:9.2f}"
+
+
+def format_report(results):
+    header = f"{'step':>4} {'total':>9} {'retrieval':>9} {'model':>9} {'tool':>9} {'persist':>9} {'other':>9}"
+    lines = []
+    for result in results:
+        lines.append(
+            f"== {result['entry_point']} / {result['scenario']} (run {result['run']}): "
+            f"{len(result['steps'])} steps, {result['model_requests']} model calls, "
+            f"{result['tokens']['total_tokens']} tokens, {result['wall'] * 1000:.2f} ms wall"
+        )
+        lines.append(header)
+        for i, step in enumerate(result["steps"], 1):
+            other = step["total"] - sum(step[phase] for phase in PHASES)
+            lines.append(
+                f"{i:>4} {_ms(step['total'])} {_ms(step['retrieval'])} {_ms(step['model'])} "
+                f"{_ms(step['tool'])} {_ms(step['persistence'])} {_ms(other)}"
+            )
+
+    all_steps = [step for result in results for step in result["steps"]]
+    if all_steps:
+        lines.append("== summary over all steps (ms: mean / median / max)")
+        for phase in ("total", *PHASES):
+            values = [step[phase] * 1000 for step in all_steps]
+            lines.append(
+                f"{phase:>11}: {statistics.mean(values):9.2f} / "
+                f"{statistics.median(values):9.2f} / {max(values):9.2f}"
+            )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the agent loop against a local stub model.")
+    parser.add_argument("--scenario", action="append", help="Scenario name to run (default: all).")
+    parser.add_argument("--scenario-file", help="JSON file with extra scenarios in the SCENARIOS format.")
+    parser.add_argument("--entry-point", action="append", choices=sorted(ENTRY_POINTS),
+                        help="Entry point to drive (default: all).")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--latency-ms", type=int, default=0, help="Simulated model latency per call.")
+    parser.add_argument("--db-path", help="ChromaDB path to use (default: a throwaway temp dir).")
+    parser.add_argument("--json", dest="json_path", help="Also write raw results to this file.")
+    parser.add_argument("--verbose", action="store_true", help="Show the agent's own output.")
+    args = parser.parse_args()
+
+    # utils.database opens its client at import time, so this must happen first.
+    os.environ["CHROMA_DB_PATH"] = args.db_path or tempfile.mkdtemp(prefix="bench_chroma_")
+    # Keep benchmark sessions out of the real metrics log.
+    os.environ.setdefault("GEMINI_METRICS_LOG", os.devnull)
+
+    scenarios = dict(SCENARIOS)
+    if args.scenario_file:
+        with open(args.scenario_file, "r", encoding="utf-8") as f:
+            scenarios.update(json.load(f))
+    if args.scenario:
+        scenarios = {name: scenarios[name] for name in args.scenario}
+
+    results = run_benchmark(
+        scenarios,
+        args.entry_point or list(ENTRY_POINTS),
+        repeat=args.repeat,
+        latency_ms=args.latency_ms,
+        verbose=args.verbose,
+    )
+    print(format_report(results))
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
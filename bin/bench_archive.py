@@ -0,0 +1,90 @@
+import sys
+import os
+import time
+import random
+import shutil
+import argparse
+import tempfile
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils import archiver
+
+# Compares compress_path/decompress_archive's archiver with the
+# shutil.make_archive / unpack_archive calls they replaced. The first archiver
+# row stores the same files as shutil (ignore rules off); note that shutil's
+# gztar compresses at level 9 while the archiver defaults to 6.
+
+
+def make_tree(root, files=1500, size=64 * 1024, seed=1):
+    """Writes compressible text files plus node_modules noise that the archiver skips."""
+    rng = random.Random(seed)
+    words = [f"token{i}" for i in range(500)]
+    for i in range(files):
+        directory = os.path.join(root, f"pkg{i % 30}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"file{i}.txt"), "w") as f:
+            written = 0
+            while written < size:
+                line = " ".join(rng.choice(words) for _ in range(12)) + "\n"
+                f.write(line)
+                written += len(line)
+    noise = os.path.join(root, "node_modules")
+    os.makedirs(noise, exist_ok=True)
+    for i in range(files // 3):
+        with open(os.path.join(noise, f"n{i}.js"), "w") as f:
+            f.write("module.exports = 1;\n" * (size // 20))
+
+
+def tree_bytes(root):
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(root) for f in files)
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark archive creation and extraction.")
+    parser.add_argument("--files", type=int, default=1500)
+    parser.add_argument("--size-kb", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--formats", default="zip,gztar")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "proj")
+        print(f"🏗️ Generating {args.files} files x {args.size_kb} KiB...")
+        make_tree(source, args.files, args.size_kb * 1024)
+        total = tree_bytes(source)
+        print(f"📊 {total / 1e6:.1f} MB in tree, {os.cpu_count()} CPUs")
+        for fmt in args.formats.split(","):
+            suffix = archiver.FORMATS[fmt][0]
+            legacy = os.path.join(tmp, "legacy")
+            seconds, legacy_path = timed(shutil.make_archive, legacy, fmt, root_dir=tmp, base_dir="proj")
+            print(f"   {fmt:<6} shutil.make_archive      {seconds * 1000:9.1f} ms  "
+                  f"{total / 1e6 / seconds:7.1f} MB/s  {os.path.getsize(legacy_path) / 1e6:.1f} MB")
+            out = os.path.join(tmp, "new" + suffix)
+            seconds, summary = timed(archiver.create, source, out, fmt, workers=args.workers, report=None,
+                                     ignore_rules=False)
+            print(f"   {fmt:<6} archiver.create          {seconds * 1000:9.1f} ms  "
+                  f"{summary['bytes'] / 1e6 / seconds:7.1f} MB/s  {summary['size'] / 1e6:.1f} MB")
+            filtered = os.path.join(tmp, "filtered" + suffix)
+            seconds, summary = timed(archiver.create, source, filtered, fmt, workers=args.workers, report=None)
+            print(f"   {fmt:<6} ... skipping ignored     {seconds * 1000:9.1f} ms  {summary['files']} files")
+            seconds, summary = timed(archiver.create, source, os.path.join(tmp, "inc" + suffix), fmt,
+                                     workers=args.workers, report=None, since_manifest=archiver.manifest_path(filtered))
+            print(f"   {fmt:<6} ... incremental, no edits {seconds * 1000:9.1f} ms  {summary['files']} files")
+
+            seconds, _ = timed(shutil.unpack_archive, legacy_path, os.path.join(tmp, "x_legacy_" + fmt))
+            print(f"   {fmt:<6} shutil.unpack_archive    {seconds * 1000:9.1f} ms")
+            seconds, _ = timed(archiver.extract, out, os.path.join(tmp, "x_new_" + fmt), args.workers, report=None)
+            print(f"   {fmt:<6} archiver.extract         {seconds * 1000:9.1f} ms")
+            os.remove(legacy_path)
+
+
+if __name__ == "__main__":
+    main()
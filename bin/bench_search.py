@@ -0,0 +1,113 @@
+import sys
+import os
+import re
+import time
+import random
+import fnmatch
+import argparse
+import tempfile
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils import file_search
+from utils.trigram_index import TrigramIndex
+
+# Generates a synthetic repository and times content searches over it.
+
+WORDS = ["alpha", "beta", "gamma", "delta", "request", "response", "handler", "config",
+         "session", "token", "cache", "index", "worker", "result", "buffer", "stream"]
+
+
+def make_repo(root, files=2000, lines=200, seed=1):
+    """Writes `files` source files (plus .git/node_modules noise and a few binaries) under root."""
+    rng = random.Random(seed)
+    for i in range(files):
+        directory = os.path.join(root, f"pkg{i % 40}", f"mod{i % 7}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"file{i}.py"), "w") as f:
+            for n in range(lines):
+                words = " ".join(rng.choice(WORDS) for _ in range(6))
+                f.write(f"def func_{i}_{n}(x):  # {words}\n")
+            if i % 97 == 0:
+                f.write("NEEDLE_MARKER = 'needle in a haystack'\n")
+    for noise in (".git/objects", "node_modules/lib"):
+        directory = os.path.join(root, noise)
+        os.makedirs(directory, exist_ok=True)
+        for i in range(files // 4):
+            with open(os.path.join(directory, f"n{i}.js"), "w") as f:
+                f.write("NEEDLE_MARKER\n" * lines)
+    with open(os.path.join(root, "blob.bin"), "wb") as f:
+        f.write(b"\0NEEDLE_MARKER" * 10000)
+
+
+def legacy_find(directory_path, content_pattern, name_pattern=None):
+    """find_files_task before the rewrite: full reads, uncompiled pattern, no ignores."""
+    found = []
+    for root, _, files in os.walk(directory_path):
+        for filename in files:
+            if name_pattern and not fnmatch.fnmatch(filename, name_pattern):
+                continue
+            filepath = os.path.join(root, filename)
+            try:
+                with open(filepath, "r", errors="ignore") as f:
+                    if not re.search(content_pattern, f.read()):
+                        continue
+            except OSError:
+                continue
+            found.append(filepath)
+    return found
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark workspace content search on a synthetic repo.")
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--lines", type=int, default=200)
+    parser.add_argument("--pattern", default="NEEDLE_MARKER")
+    parser.add_argument("--root", help="Existing directory to search instead of a synthetic repo.")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.root
+        if not root:
+            root = tmp
+            print(f"🏗️ Generating {args.files} files x {args.lines} lines...")
+            make_repo(root, args.files, args.lines)
+
+        rows = [
+            ("legacy find_files (full scan)", lambda: len(legacy_find(root, args.pattern))),
+            ("file_search.search", lambda: len(file_search.search(root, args.pattern, max_results=10**6)[0])),
+            ("file_search.search, first 20", lambda: len(file_search.search(root, args.pattern, max_results=20)[0])),
+            ("legacy, common word", lambda: len(legacy_find(root, "handler"))),
+            ("file_search.search, common word, first 20",
+             lambda: len(file_search.search(root, "handler", max_results=20)[0])),
+        ]
+        print(f"📊 Searching for {args.pattern!r} in {root}")
+        for label, func in rows:
+            seconds, count = timed(func)
+            print(f"   {label:<44} {seconds * 1000:9.1f} ms  {count} results")
+
+        index = TrigramIndex(root, path=os.path.join(tmp, "bench-index.sqlite"))
+        seconds, stats = timed(index.refresh)
+        print(f"📇 Trigram index: built in {seconds * 1000:.1f} ms ({stats['files']} files)")
+        seconds, _ = timed(index.refresh)
+        print(f"   {'refresh (no changes)':<44} {seconds * 1000:9.1f} ms")
+        queries = [
+            ("grep_index " + args.pattern, args.pattern, 10**6),
+            ("grep_index regex", r"NEEDLE_\w+ = '(needle|pin)", 10**6),
+            ("grep_index common word, first 20", "handler", 20),
+        ]
+        for label, pattern, limit in queries:
+            seconds, (results, _, candidates) = timed(index.search, pattern, max_results=limit)
+            print(f"   {label:<44} {seconds * 1000:9.1f} ms  {len(results)} results, {candidates} candidates")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
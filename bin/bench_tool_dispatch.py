@@ -0,0 +1,70 @@
+import sys
+import os
+import time
+import argparse
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import tools_mod
+from tools_mod import registry
+
+# Compares tool lookup through the registry with the linear lookup the
+# dispatchers used before it: scan each module's `library`, then rebuild the
+# memory/database declaration lists to see whether the name belongs to them.
+LEGACY_MODULES = (
+    tools_mod.core, tools_mod.web, tools_mod.file_ops, tools_mod.git, tools_mod.nlp,
+    tools_mod.debug_test, tools_mod.tool_creator, tools_mod.knowledge, tools_mod.system,
+)
+
+
+def _declared_names(module):
+    return [decl["name"] for decl in registry._flatten_declarations(module.tool_definitions())]
+
+
+def legacy_lookup(name):
+    for module in LEGACY_MODULES:
+        if name in module.library:
+            return module.library[name]
+    for module in (tools_mod.memory, tools_mod.database):
+        if name in _declared_names(module):
+            return module.library[name]
+    return None
+
+
+def registry_lookup(name):
+    spec = registry.get(name)
+    return spec.func if spec is not None else None
+
+
+def _time(func, name, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(name)
+    return (time.perf_counter() - start) / iterations
+
+
+def run(names, iterations):
+    rows = []
+    for name in names:
+        legacy = _time(legacy_lookup, name, iterations)
+        current = _time(registry_lookup, name, iterations)
+        rows.append((name, legacy, current))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark tool lookup: legacy linear scan vs. registry.")
+    parser.add_argument("--tool", action="append", help="Tool name to look up (default: a few representative tools).")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    names = args.tool or ["read_file", "debug_echo", "get_usage_stats", "query_memory"]
+    print(f"📊 Tool lookup, mean of {args.iterations} iterations ({len(registry.tool_names())} tools registered)")
+    for name, legacy, current in run(names, args.iterations):
+        speedup = legacy / current if current else float("inf")
+        print(f"   {name:<20} legacy {legacy * 1e6:10.2f} µs   registry {current * 1e6:8.2f} µs   x{speedup:,.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+import sys
+import os
+import re
+import argparse
+import subprocess
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+# Compares the import cost of an entry point with lazily loaded tool modules
+# (the default) against GEMINI_EAGER_TOOLS=1, using `python -X importtime`.
+
+
+def measure(target, eager, runs=3):
+    """Returns (best total µs, {module: (self µs, cumulative µs)}) for `import target`."""
+    env = dict(os.environ, GEMINI_EAGER_TOOLS="1" if eager else "0")
+    best = None
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {target}"],
+            cwd=PROJECT_ROOT, env=env, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"import {target} failed:\n{proc.stderr[-2000:]}")
+        modules = {}
+        total = 0
+        for match in _LINE.finditer(proc.stderr):
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us))
+            if len(indent) == 1:
+                total += int(cumulative_us)
+        if best is None or total < best[0]:
+            best = (total, modules)
+    return best
+
+
+def format_report(target, lazy, eager, top=15):
+    lazy_total, lazy_modules = lazy
+    eager_total, eager_modules = eager
+    lines = [
+        f"📊 import {target}",
+        f"   eager tool modules: {eager_total / 1000:8.1f} ms ({len(eager_modules)} modules)",
+        f"   lazy tool modules:  {lazy_total / 1000:8.1f} ms ({len(lazy_modules)} modules)",
+        f"   saved:              {(eager_total - lazy_total) / 1000:8.1f} ms",
+        "",
+        "Heaviest modules no longer imported at startup (cumulative ms):",
+    ]
+    # Top-level packages plus the tool modules themselves
+    skipped = [
+        (cumulative, name) for name, (_, cumulative) in eager_modules.items()
+        if name not in lazy_modules and (name.startswith("tools_mod.") or "." not in name)
+    ]
+    for cumulative, name in sorted(skipped, reverse=True)[:top]:
+        lines.append(f"   {cumulative / 1000:8.1f}  {name}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report the startup import cost of lazy vs. eager tool loading.")
+    parser.add_argument("--target", default="main", help="Module to import (default: main).")
+    parser.add_argument("--runs", type=int, default=3, help="Runs per mode; the fastest is reported.")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    eager = measure(args.target, eager=True, runs=args.runs)
+    lazy = measure(args.target, eager=False, runs=args.runs)
+    print(format_report(args.target, lazy, eager, args.top))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+import sys
+import os
+import json
+import time
+import threading
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+class StubModelServer:
+    """
+    A local stand-in for the Gemini REST endpoint.
+
+    Replies to ``models/<model>:generateContent`` with the next entry of a
+    script. Each entry is either ``{"text": "..."}`` or
+    ``{"function_call": {"name": "...", "args": {...}}}`` and may carry its own
+    ``latency_ms``. Once the script is exhausted the server answers with
+    ``default_text``. Point the agent at it through ``config.GEMINI_BASE_URL``.
+    """
+
+    def __init__(self, script=None, latency_ms=0, host="127.0.0.1", port=0, default_text="Done."):
+        self.script = list(script or [])
+        self.latency_ms = latency_ms
+        self.default_text = default_text
+        self.requests = []
+        self._lock = threading.Lock()
+        self._cursor = 0
+        self._thread = None
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def load_script(self, script):
+        """Replaces the script and rewinds to its first entry."""
+        with self._lock:
+            self.script = list(script)
+            self._cursor = 0
+            self.requests = []
+
+    def next_entry(self, request_body):
+        with self._lock:
+            self.requests.append(request_body)
+            if self._cursor < len(self.script):
+                entry = self.script[self._cursor]
+                self._cursor += 1
+                return entry
+        return {"text": self.default_text}
+
+    def build_response(self, entry, request_body):
+        if "function_call" in entry:
+            part = {"functionCall": entry["function_call"]}
+        else:
+            part = {"text": entry.get("text", "")}
+
+        # Rough token estimate so usage accounting has something to aggregate.
+        prompt_tokens = max(1, len(json.dumps(request_body.get("contents", []))) // 4)
+        candidate_tokens = max(1, len(json.dumps(part)) // 4)
+        return {
+            "candidates": [
+                {"content": {"role": "model", "parts": [part]}, "finishReason": "STOP", "index": 0}
+            ],
+            "usageMetadata": {
+                "promptTokenCount": prompt_tokens,
+                "candidatesTokenCount": candidate_tokens,
+                "totalTokenCount": prompt_tokens + candidate_tokens,
+            },
+            "modelVersion": "stub",
+        }
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    body = {}
+
+                if ":generateContent" in self.path:
+                    entry = server.next_entry(body)
+                    latency = entry.get("latency_ms", server.latency_ms)
+                    if latency:
+                        time.sleep(latency / 1000.0)
+                    payload = server.build_response(entry, body)
+                elif ":countTokens" in self.path:
+                    payload = {"totalTokens": max(1, len(json.dumps(body)) // 4)}
+                else:
+                    self.send_error(404, f"Unsupported stub endpoint: {self.path}")
+                    return
+
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve canned Gemini responses locally.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=int, default=0, help="Default delay before each reply.")
+    parser.add_argument("--script", help="JSON file with a list of response entries.")
+    args = parser.parse_args()
+
+    script = []
+    if args.script:
+        with open(args.script, "r", encoding="utf-8") as f:
+            script = json.load(f)
+
+    server = StubModelServer(script, latency_ms=args.latency_ms, host=args.host, port=args.port)
+    print(f"Stub model server listening on {server.base_url}")
+    print(f"Run the agent with GEMINI_BASE_URL={server.base_url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
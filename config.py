@@ -14,9 +14,127 @@ CUSTOM_SEARCH_CX = os.environ.get("CUSTOM_SEARCH_CX", "")
 # Hugging Face API Token (for Inference API)
 HF_API_TOKEN = os.environ.get("HF_API_TOKEN", "")
 
+# Optional override of the Gemini API endpoint (e.g. bin/stub_model_server.py)
+GEMINI_BASE_URL = os.environ.get("GEMINI_BASE_URL", "")
+
+# Import every tool module at startup instead of on first use (see tools_mod/__init__.py)
+EAGER_TOOL_IMPORTS = os.environ.get("GEMINI_EAGER_TOOLS", "") == "1"
+
 MODEL_NAME = "gemini-2.5-flash"
 IMAGE_OUTPUT_DIR = os.path.join(os.path.expanduser("~"), "gemini_generated_images")
 
+# Per-session token and latency stats are appended here when a session ends
+METRICS_LOG_PATH = os.environ.get(
+    "GEMINI_METRICS_LOG", os.path.join(os.path.expanduser("~"), "gemini_agent_metrics.jsonl")
+)
+
+# Tool deadlines in seconds ("default" applies to unlisted tools, 0 disables).
+# A call may override its deadline with a `timeout_seconds` argument.
+TOOL_TIMEOUTS = {
+    "default": 120,
+    "visit_page": 45,
+    "scrape_text": 45,
+    "download_file": 600,
+    "google_search": 30,
+    "run_tests": 300,
+    "lint_python_file": 120,
+    "format_code": 120,
+    "execute_shell_command": 300,
+    "run_command": 300,
+    "install_packages": 1800,
+    "git_pull": 300,
+    "git_push": 300,
+    "learn_repo": 3600,
+    "learn_directory": 3600,
+    "learn_url": 300,
+    "debug_failure": 30,
+}
+
+# Tools executed in pre-warmed worker processes (utils/worker_pool.py).
+# Workers are replaced after WORKER_MAX_CALLS calls or above WORKER_MAX_RSS_MB.
+WORKER_POOL_SIZE = int(os.environ.get("GEMINI_WORKER_POOL_SIZE", "2"))
+WORKER_POOL_TOOLS = {"run_tests", "lint_python_file", "format_code"}
+WORKER_MAX_CALLS = 50
+WORKER_MAX_RSS_MB = 512
+# Imported once per worker so forked `python -m` runs start warm
+WORKER_PRELOAD = [
+    "tools_mod.debug_test",
+    "tools_mod.file_ops",
+    "unittest",
+    "flake8.main.cli",
+    "black",
+]
+
+# Tool results longer than RESULT_SPILL_CHARS are stored in RESULT_STORE_DIR;
+# the model sees a head/tail preview and pages through them with fetch_result.
+RESULT_STORE_DIR = os.environ.get(
+    "GEMINI_RESULT_STORE", os.path.join(os.path.expanduser("~"), ".gemini_agent", "results")
+)
+RESULT_SPILL_CHARS = 8000
+RESULT_PREVIEW_HEAD = 2000
+RESULT_PREVIEW_TAIL = 500
+RESULT_PAGE_CHARS = 4000
+RESULT_STORE_MAX_FILES = 200
+
+# On-disk trigram indexes used by the grep_index tool, one per workspace root
+INDEX_DIR = os.environ.get(
+    "GEMINI_INDEX_DIR", os.path.join(os.path.expanduser("~"), ".gemini_agent", "index")
+)
+
+# Ingestion pipeline used by learn_repo/learn_directory (utils/ingest.py).
+# Files are read by INGEST_READERS threads, split into chunks of about
+# CHUNK_CHARS, and upserted in batches capped by both count and characters.
+INGEST_READERS = int(os.environ.get("GEMINI_INGEST_READERS", "4"))
+INGEST_QUEUE_SIZE = 64
+INGEST_MAX_FILE_BYTES = 1024 * 1024
+INGEST_BATCH_DOCS = 64
+INGEST_BATCH_CHARS = 200_000
+INGEST_RETRIES = 3
+CHUNK_CHARS = 2000
+CHUNK_OVERLAP_LINES = 3
+# Only files with these extensions (or none) are learned; the rest are
+# skipped before being opened.
+INGEST_EXTENSIONS = frozenset((
+    ".py", ".pyi", ".ipynb", ".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx", ".vue", ".svelte",
+    ".java", ".kt", ".kts", ".scala", ".groovy", ".gradle", ".go", ".rs", ".c", ".h", ".cc", ".cpp",
+    ".cxx", ".hpp", ".hh", ".cs", ".fs", ".swift", ".m", ".mm", ".rb", ".php", ".pl", ".pm", ".lua",
+    ".r", ".jl", ".dart", ".ex", ".exs", ".erl", ".hs", ".clj", ".elm", ".zig", ".nim", ".sol",
+    ".sh", ".bash", ".zsh", ".fish", ".ps1", ".bat", ".sql", ".graphql", ".proto", ".thrift",
+    ".html", ".htm", ".css", ".scss", ".sass", ".less", ".xml", ".svg", ".json", ".jsonl", ".yaml",
+    ".yml", ".toml", ".ini", ".cfg", ".conf", ".properties", ".md", ".rst", ".txt",
+    ".adoc", ".tex", ".csv", ".tsv", ".cmake", ".mk", ".dockerfile", ".tf", ".hcl", ".nix",
+))
+# Documents (PDF) are extracted by INGEST_DOCUMENT_WORKERS processes; their
+# text is cached in DOCUMENT_CACHE_DIR by content hash (utils/documents.py).
+INGEST_DOCUMENT_WORKERS = int(os.environ.get("GEMINI_INGEST_DOCUMENT_WORKERS", str(os.cpu_count() or 2)))
+INGEST_MAX_DOCUMENT_BYTES = 200 * 1024 * 1024
+DOCUMENT_CACHE_DIR = os.environ.get(
+    "GEMINI_DOCUMENT_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".gemini_agent", "documents")
+)
+
+# Crawler behind learn_url (utils/crawler.py)
+CRAWL_MAX_DEPTH = 2
+CRAWL_MAX_PAGES = 50
+CRAWL_WORKERS = 8
+CRAWL_PER_HOST = 2
+CRAWL_HOST_DELAY = 0.25
+CRAWL_TIMEOUT = 20
+CRAWL_MAX_BYTES = 5 * 1024 * 1024
+CRAWL_USER_AGENT = "gemini-agent-crawler/1.0"
+CRAWL_CACHE_DIR = os.environ.get(
+    "GEMINI_CRAWL_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".gemini_agent", "crawl")
+)
+# Last learned commit per repository for incremental learn_repo (utils/repo_learning.py)
+LEARN_STATE_DIR = os.environ.get(
+    "GEMINI_LEARN_STATE_DIR", os.path.join(os.path.expanduser("~"), ".gemini_agent", "learned")
+)
+# Background learn_* jobs: records and per-job checkpoints (utils/jobs.py)
+JOB_WORKERS = int(os.environ.get("GEMINI_JOB_WORKERS", "2"))
+JOBS_KEEP = 50
+JOBS_DIR = os.environ.get(
+    "GEMINI_JOBS_DIR", os.path.join(os.path.expanduser("~"), ".gemini_agent", "jobs")
+)
+
 SAFETY_SETTINGS = [
     {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
     {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
@@ -36,6 +154,7 @@ PROJECT_CONTEXT_IGNORE = [
     "venv",
     ".idea",
     ".vscode",
+    "chroma_db",
 ]
 
 # VPS SSH Configuration
@@ -3,6 +3,7 @@ import config
 from agent.main import handle_agent_task
 from utils.model_wrapper import GenerativeModelWrapper
 from tools_mod import tool_definitions
+from utils import tracing
 
 def main():
     # 1. Initialize the model dictionary required by the agent handler
@@ -16,10 +17,12 @@ def main():
     }
 
     # 2. Extract the prompt from command line arguments
-    if "--agent" in sys.argv:
+    # --profile / --profile=PATH records a trace of every agent step
+    argv = tracing.enable_from_argv(sys.argv)
+    if "--agent" in argv:
         try:
-            idx = sys.argv.index("--agent")
-            initial_prompt = " ".join(sys.argv[idx + 1:])
+            idx = argv.index("--agent")
+            initial_prompt = " ".join(argv[idx + 1:])
         except (IndexError, ValueError):
             initial_prompt = "help"
     else:
@@ -0,0 +1,38 @@
+import os
+import tempfile
+
+
+class TempTreeMixin:
+    """
+    setUp/tearDown for tests that work on a tree of files in a temporary
+    directory. self.root is the tree (TREE names a subdirectory of self.tmp
+    for tests that keep other files next to it); _write (text or bytes)
+    and _read keep line endings exactly as given.
+    """
+    TREE = ""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.tmp.name, self.TREE) if self.TREE else self.tmp.name
+        os.makedirs(self.root, exist_ok=True)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _path(self, rel):
+        return os.path.join(self.root, rel)
+
+    def _write(self, rel, data):
+        path = self._path(rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if isinstance(data, bytes):
+            with open(path, "wb") as f:
+                f.write(data)
+        else:
+            with open(path, "w", newline="") as f:
+                f.write(data)
+        return path
+
+    def _read(self, rel):
+        with open(self._path(rel), newline="") as f:
+            return f.read()
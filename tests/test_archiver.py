@@ -0,0 +1,88 @@
+import os
+import sys
+import json
+import gzip
+import tarfile
+import zipfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tests.temp_tree import TempTreeMixin
+from utils import archiver
+
+
+class TestArchiver(TempTreeMixin, unittest.TestCase):
+    TREE = "proj"
+
+    def setUp(self):
+        super().setUp()
+        self._write("a.txt", "alpha\n" * 1000)
+        self._write("sub/b.sh", "echo b\n")
+        self._write("node_modules/c.js", "ignored\n")
+        os.chmod(os.path.join(self.root, "sub", "b.sh"), 0o755)
+
+    def _out(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_zip_round_trip(self):
+        os.makedirs(os.path.join(self.root, "empty"))
+        archiver.create(self.root, self._out("p.zip"), workers=3, report=None)
+        with zipfile.ZipFile(self._out("p.zip")) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(sorted(zf.namelist()), ["proj/a.txt", "proj/empty/", "proj/sub/b.sh"])
+        archiver.extract(self._out("p.zip"), self._out("x"), report=None)
+        with open(self._out("x/proj/a.txt")) as f:
+            self.assertEqual(f.read(), "alpha\n" * 1000)
+        self.assertEqual(os.stat(self._out("x/proj/sub/b.sh")).st_mode & 0o777, 0o755)
+        self.assertTrue(os.path.isdir(self._out("x/proj/empty")))
+
+    def test_tar_keeps_empty_directories(self):
+        os.makedirs(os.path.join(self.root, "empty"))
+        archiver.create(self.root, self._out("p.tar"), report=None)
+        archiver.extract(self._out("p.tar"), self._out("x"), report=None)
+        self.assertEqual(os.listdir(self._out("x/proj/empty")), [])
+
+    def test_zip_extraction_drops_special_mode_bits(self):
+        info = zipfile.ZipInfo("run.sh")
+        info.external_attr = 0o104755 << 16  # setuid
+        with zipfile.ZipFile(self._out("suid.zip"), "w") as zf:
+            zf.writestr(info, "echo hi\n")
+        archiver.extract(self._out("suid.zip"), self._out("x"), report=None)
+        self.assertEqual(os.stat(self._out("x/run.sh")).st_mode & 0o7777, 0o755)
+
+    def test_parallel_gzip_blocks(self):
+        out = self._out("p.tar.gz")
+        compressor_block = archiver.BLOCK_BYTES
+        archiver.BLOCK_BYTES = 1024  # several gzip members
+        try:
+            archiver.create(self.root, out, report=None)
+        finally:
+            archiver.BLOCK_BYTES = compressor_block
+        with gzip.open(out) as f:
+            self.assertGreater(len(f.read()), 6000)
+        with tarfile.open(out) as tar:
+            self.assertEqual(sorted(tar.getnames()), ["proj/a.txt", "proj/sub/b.sh"])
+
+    def test_incremental(self):
+        first = self._out("full.tar")
+        archiver.create(self.root, first, report=None)
+        self._write("new.txt", "new\n")
+        os.remove(os.path.join(self.root, "sub", "b.sh"))
+        summary = archiver.create(self.root, self._out("inc.tar"), since_manifest=archiver.manifest_path(first),
+                                  report=None)
+        # sub/ is left empty, so it is now stored as a directory entry
+        self.assertEqual((summary["files"], summary["deleted"]), (2, 1))
+        with open(archiver.manifest_path(self._out("inc.tar"))) as f:
+            manifest = json.load(f)
+        self.assertEqual(sorted(manifest["files"]), ["proj/a.txt", "proj/new.txt", "proj/sub/"])
+
+    def test_rejects_escaping_members(self):
+        with zipfile.ZipFile(self._out("evil.zip"), "w") as zf:
+            zf.writestr("../escape.txt", "x")
+        with self.assertRaises(ValueError):
+            archiver.extract(self._out("evil.zip"), self._out("x"), report=None)
+
+
+if __name__ == "__main__":
+    unittest.main()
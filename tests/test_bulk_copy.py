@@ -0,0 +1,66 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tests.temp_tree import TempTreeMixin
+from utils import bulk_copy
+
+
+class TestBulkCopy(TempTreeMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        for rel in ("src/a.txt", "src/b.txt", "src/sub/c.py"):
+            self._write(rel, rel * 100)
+        os.chmod(self._path("src/a.txt"), 0o640)
+
+    def test_copy_file_keeps_data_and_mode(self):
+        bulk_copy.copy_file(self._path("src/a.txt"), self._path("a.copy"))
+        self.assertEqual(self._read("a.copy"), "src/a.txt" * 100)
+        self.assertEqual(os.stat(self._path("a.copy")).st_mode & 0o777, 0o640)
+
+    def test_short_kernel_copy_falls_back(self):
+        with mock.patch.object(os, "copy_file_range", return_value=0, create=True):
+            method = bulk_copy.copy_file(self._path("src/a.txt"), self._path("a.copy"))
+            self.assertEqual(method, "sendfile")
+            self.assertEqual(self._read("a.copy"), "src/a.txt" * 100)
+            with mock.patch.object(os, "sendfile", return_value=0, create=True):
+                method = bulk_copy.copy_file(self._path("src/b.txt"), self._path("b.copy"))
+        self.assertEqual(method, "copy")
+        self.assertEqual(self._read("b.copy"), "src/b.txt" * 100)
+
+    def test_glob_tree_and_errors(self):
+        results = bulk_copy.run([
+            {"source": self._path("src/*.txt"), "destination": self._path("out")},
+            {"source": self._path("src"), "destination": self._path("tree")},
+            {"source": self._path("missing"), "destination": self._path("x")},
+        ])
+        self.assertEqual([r[3] is None for r in results], [True, True, True, False])
+        self.assertEqual(sorted(os.listdir(self._path("out"))), ["a.txt", "b.txt"])
+        self.assertEqual(self._read("tree/sub/c.py"), "src/sub/c.py" * 100)
+
+    def test_move_and_overwrite(self):
+        self._write("dst/a.txt", "old")
+        results = bulk_copy.run([{"source": self._path("src/a.txt"), "destination": self._path("dst/")}],
+                                move=True, overwrite=False)
+        self.assertIn("exists", results[0][3])
+        results = bulk_copy.run([{"source": self._path("src/a.txt"), "destination": self._path("dst/")}], move=True)
+        self.assertEqual(results[0][2], "rename")
+        self.assertFalse(os.path.exists(self._path("src/a.txt")))
+        self.assertEqual(self._read("dst/a.txt"), "src/a.txt" * 100)
+
+    def test_same_file_is_an_error(self):
+        for move in (False, True):
+            results = bulk_copy.run([
+                {"source": self._path("src/a.txt"), "destination": self._path("src/a.txt")},
+                {"source": self._path("src/*.txt"), "destination": self._path("src")},
+            ], move=move)
+            self.assertTrue(all("same file" in r[3] for r in results), results)
+            self.assertEqual(self._read("src/a.txt"), "src/a.txt" * 100)
+            self.assertEqual(self._read("src/b.txt"), "src/b.txt" * 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,70 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import config
+from utils import chunking
+
+SOURCE = '''"""Module docstring."""
+import os
+
+LIMIT = 3
+
+
+# Says hello
+@decorator
+def hello(name):
+    return f"hello {name}"
+
+
+class Greeter:
+    """Greets people."""
+
+    greeting = "hi"
+
+    def greet(self, name):
+        return self.greeting + name
+
+    async def wait(self):
+        pass
+\f
+def after():
+    pass
+'''
+
+
+class TestChunking(unittest.TestCase):
+    def _symbols(self, chunks):
+        return [(meta["kind"], meta["qualname"], first, last) for _, first, last, meta in chunks]
+
+    def test_definitions_become_chunks(self):
+        chunks = chunking.chunk_python(SOURCE, "pkg/mod.py")
+        self.assertEqual(self._symbols(chunks), [
+            ("module", "mod", 1, 4),
+            ("function", "hello", 7, 10),
+            ("class", "Greeter", 13, 22),
+            ("function", "after", 24, 25),
+        ])
+        self.assertTrue(chunks[1][0].startswith("# Says hello\n@decorator\n"))
+        self.assertEqual(chunks[1][3]["language"], "python")
+
+    def test_large_class_is_split_into_header_and_methods(self):
+        with mock.patch.object(config, "CHUNK_CHARS", 60):
+            chunks = chunking.chunk_python(SOURCE, "pkg/mod.py")
+        self.assertEqual(self._symbols(chunks)[2:5], [
+            ("class", "Greeter", 13, 16),
+            ("method", "Greeter.greet", 18, 19),
+            ("method", "Greeter.wait", 21, 22),
+        ])
+
+    def test_fallback_to_line_windows(self):
+        chunks = chunking.chunk_source("def broken(:\n    pass\n", "bad.py")
+        self.assertEqual(chunks, [("def broken(:\n    pass\n", 1, 2)])
+        self.assertEqual(len(chunking.chunk_source("a\nb\n", "notes.txt")[0]), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import os
+import sys
+import threading
+import unittest
+import functools
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tests.temp_tree import TempTreeMixin
+from utils import crawler
+
+PAGES = {
+    "index.html": '<title>Home</title><a href="a.html">a</a> <a href="a.html#part">a</a> <a href="./a.html">a</a>'
+                  '<a href="b.html?y=2&x=1">b</a> <a href="b.html?x=1&y=2">b</a> <a href="logo.png">logo</a>'
+                  '<a href="http://elsewhere.invalid/">out</a> <a href="private/p.html">p</a>',
+    "a.html": '<p>Page A</p><script>var hidden = 1;</script><a href="c.html">c</a>',
+    "b.html": "<p>Page B</p>",
+    "c.html": '<p>Page C</p><a href="d.html">d</a>',
+    "d.html": "<p>Page D</p>",
+    "private/p.html": "<p>secret</p>",
+    "robots.txt": "User-agent: *\nDisallow: /private/\n",
+}
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class TestCrawler(TempTreeMixin, unittest.TestCase):
+    TREE = "site"
+
+    def setUp(self):
+        super().setUp()
+        for rel, body in PAGES.items():
+            self._write(rel, body)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(QuietHandler, directory=self.root))
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_port}/"
+        self.cache_dir = os.path.join(self.tmp.name, "cache")
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        super().tearDown()
+
+    def _crawl(self, **kwargs):
+        c = crawler.Crawler(delay=0, cache_dir=self.cache_dir, **kwargs)
+        pages = {url[len(self.base):]: (text, meta) for url, text, meta in c.crawl(self.base + "index.html")}
+        return c, pages
+
+    def test_normalize(self):
+        self.assertEqual(crawler.normalize("HTTP://Example.COM:80/a/../b/?z=1&a=2#frag"),
+                         "http://example.com/b/?a=2&z=1")
+        self.assertIsNone(crawler.normalize("mailto:someone@example.com"))
+
+    def test_crawl_scope_depth_and_dedupe(self):
+        c, pages = self._crawl(max_depth=2)
+        self.assertEqual(sorted(pages), ["a.html", "b.html?x=1&y=2", "c.html", "index.html"])
+        self.assertEqual(pages["index.html"][1], {"title": "Home", "depth": 0})
+        self.assertNotIn("hidden", pages["a.html"][0])
+        self.assertEqual(c.stats["skipped"], 1)  # private/ is disallowed by robots.txt
+
+    def test_recrawl_uses_conditional_get(self):
+        self._crawl(max_depth=2)
+        c, pages = self._crawl(max_depth=2)
+        self.assertEqual(pages, {})
+        self.assertEqual(c.stats["not_modified"], 4)
+        self.assertEqual(c.stats["fetched"], 0)
+
+    def test_deferred_pages_are_cached_only_once_confirmed(self):
+        c = crawler.Crawler(delay=0, cache_dir=self.cache_dir, max_depth=2, deferred=True)
+        for url, _, _ in c.crawl(self.base + "index.html"):
+            if url.endswith("a.html"):
+                c.confirm(url)  # the others "failed to store"
+        c.save()
+        c, pages = self._crawl(max_depth=2)
+        self.assertEqual(sorted(pages), ["b.html?x=1&y=2", "c.html", "index.html"])
+        self.assertEqual(c.stats["not_modified"], 1)
+
+    def test_page_limit(self):
+        c, pages = self._crawl(max_depth=5, max_pages=2)
+        self.assertEqual(len(pages), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import sys
+import json
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tests.temp_tree import TempTreeMixin
+from utils import dir_listing
+
+
+class TestDirListing(TempTreeMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        for rel in ("a/b/c.py", "a/d.txt", "e.txt", "node_modules/pkg/index.js"):
+            self._write(rel, rel)
+
+    def _paths(self, page):
+        return [rel.replace(os.sep, "/") for rel, _, _, _ in page["entries"]]
+
+    def test_depth_first_and_ignored(self):
+        page = dir_listing.list_directory(self.root)
+        self.assertEqual(self._paths(page), ["a", "a/b", "a/b/c.py", "a/d.txt", "e.txt"])
+        self.assertIsNone(page["next_cursor"])
+        page = dir_listing.list_directory(self.root, include_ignored=True)
+        self.assertIn("node_modules/pkg/index.js", self._paths(page))
+
+    def test_max_depth(self):
+        page = dir_listing.list_directory(self.root, max_depth=0)
+        self.assertEqual(self._paths(page), ["a", "e.txt"])
+
+    def test_paging(self):
+        first = dir_listing.list_directory(self.root, max_entries=2)
+        self.assertEqual(self._paths(first), ["a", "a/b"])
+        second = dir_listing.list_directory(self.root, max_entries=2, cursor=first["next_cursor"])
+        self.assertEqual(self._paths(second), ["a/b/c.py", "a/d.txt"])
+        with self.assertRaises(ValueError):
+            dir_listing.list_directory(self.root, max_entries=2, sort="size", cursor=first["next_cursor"])
+
+    def test_paging_resumes_after_the_last_path(self):
+        for sort in dir_listing.SORT_KEYS:
+            full = self._paths(dir_listing.list_directory(self.root, sort=sort))
+            paged, cursor = [], None
+            while True:
+                page = dir_listing.list_directory(self.root, sort=sort, max_entries=1, cursor=cursor)
+                paged += self._paths(page)
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    break
+            self.assertEqual(paged, full, sort)
+        first = dir_listing.list_directory(self.root, max_entries=2)
+        self._write("a/b/new.py", "")  # inside the directory the page stopped at
+        os.remove(self._path("a/b/c.py"))
+        second = dir_listing.list_directory(self.root, max_entries=2, cursor=first["next_cursor"])
+        self.assertEqual(self._paths(second), ["a/b/new.py", "a/d.txt"])
+        os.remove(self._path("a/b/new.py"))
+        os.rmdir(self._path("a/b"))
+        third = dir_listing.list_directory(self.root, max_entries=2, cursor=first["next_cursor"])
+        self.assertEqual(self._paths(third), ["a/d.txt", "e.txt"])
+
+    def test_json(self):
+        data = json.loads(dir_listing.format_json(dir_listing.list_directory(self.root, max_depth=0)))
+        self.assertEqual([e[:3] for e in data["entries"]], [["a", "d", 0], ["e.txt", "f", 5]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tests.temp_tree import TempTreeMixin
+import config
+from utils import documents, ingest
+
+
+def write_pdf(path, page_texts):
+    """A minimal PDF with one line of Helvetica text per page."""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in page_texts:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents {len(objects)} 0 R "
+            f"/Resources << /Font << /F1 3 0 R >> >> >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    out = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    with open(path, "wb") as f:
+        f.write(out)
+
+
+class TestDocuments(TempTreeMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.object(config, "DOCUMENT_CACHE_DIR", os.path.join(self.root, "cache"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_pages_are_extracted_once_and_cached(self):
+        path = os.path.join(self.root, "manual.pdf")
+        write_pdf(path, ["Installing the widget", "Removing the widget"])
+        first = list(documents.extract_all([path], workers=1))
+        again = list(documents.extract_all([path], workers=1))
+        self.assertEqual([cached for _, _, cached in first], [False])
+        self.assertEqual([cached for _, _, cached in again], [True])
+        self.assertEqual([page.strip() for page in documents.pages(first[0][1])],
+                         ["Installing the widget", "Removing the widget"])
+
+    def test_ingest_streams_pages_with_page_metadata(self):
+        pdf = os.path.join(self.root, "manual.pdf")
+        write_pdf(pdf, ["First page", "Second page"])
+        broken = self._write("broken.pdf", b"not a pdf")
+        stored = []
+        result = ingest.ingest(
+            [pdf, broken], upsert=lambda ids, texts, metas, vectors: stored.extend(metas),
+            delete_sources=lambda sources: None, report=None,
+        )
+        self.assertEqual([(m["source"], m["page"], m["chunk"]) for m in stored], [(pdf, 1, 0), (pdf, 2, 1)])
+        self.assertEqual(result["documents"], 1)
+        self.assertEqual(list(result["failed"]), [broken])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tests.temp_tree import TempTreeMixin
+from utils import file_reader
+
+
+class TestFileReader(TempTreeMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = self._write("log.txt", "".join(f"line {i}{' MATCH' if i in (5, 7, 40) else ''}\n" for i in range(1, 51)))
+
+    def test_line_ranges(self):
+        self.assertEqual(file_reader.read_lines(self.path, 2, 3), ("line 2\nline 3", 2, 3, 50))
+        self.assertEqual(file_reader.read_lines(self.path, -1)[0], "line 50")
+        self.assertEqual(file_reader.read_lines(self.path, 49, 99)[1:], (49, 50, 50))
+
+    def test_index_follows_changes(self):
+        file_reader.read_lines(self.path, 1, 1)
+        self._write("log.txt", "a\nb\n")
+        os.utime(self.path, ns=(1, 1))
+        self.assertEqual(file_reader.read_lines(self.path, 2), ("b", 2, 2, 2))
+
+    def test_head_tail_bytes(self):
+        self.assertEqual(file_reader.head(self.path, 2), "line 1\nline 2")
+        self.assertEqual(file_reader.tail(self.path, 2), "line 49\nline 50")
+        self.assertEqual(file_reader.read_bytes(self.path, 0, 6), "line 1")
+
+    def test_windows_merge(self):
+        spans, matches, total = file_reader.windows(self.path, "MATCH", context=1)
+        self.assertEqual((matches, total), (3, 50))
+        self.assertEqual([(first, last, matched) for first, last, _, matched in spans], [(4, 8, [5, 7]), (39, 41, [40])])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,50 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tests.temp_tree import TempTreeMixin
+from utils import file_search
+
+
+class TestFileSearch(TempTreeMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self._write("a.py", "import os\nneedle = 1\n\nneedle = 2\n")
+        self._write("sub/deep/b.py", "x = 'needle'\n")
+        self._write("node_modules/c.js", "needle\n")
+        self._write("build_out/d.txt", "needle\n")
+        self._write(".gitignore", "build_out/\n*.log\n")
+        self._write("e.log", "needle\n")
+        with open(os.path.join(self.root, "f.bin"), "wb") as f:
+            f.write(b"\0needle\n")
+
+    def _rel(self, results):
+        return [(os.path.relpath(p, self.root), n, line) for p, n, line in results]
+
+    def test_line_numbers_and_ignores(self):
+        results, truncated = file_search.search(self.root, "needle")
+        self.assertFalse(truncated)
+        self.assertEqual(self._rel(results), [
+            ("a.py", 2, "needle = 1"),
+            ("a.py", 4, "needle = 2"),
+            (os.path.join("sub", "deep", "b.py"), 1, "x = 'needle'"),
+        ])
+
+    def test_max_depth(self):
+        results, _ = file_search.search(self.root, "needle", max_depth=0)
+        self.assertEqual({os.path.basename(p) for p, _, _ in results}, {"a.py"})
+
+    def test_max_results(self):
+        results, truncated = file_search.search(self.root, "needle", max_results=1)
+        self.assertEqual(len(results), 1)
+        self.assertTrue(truncated)
+
+    def test_name_only(self):
+        results, _ = file_search.search(self.root, name_pattern="*.py")
+        self.assertEqual(sorted(os.path.basename(p) for p in results), ["a.py", "b.py"])
+
+
+if __name__ == "__main__":
+    unittest.main()
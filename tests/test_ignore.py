@@ -0,0 +1,52 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tests.temp_tree import TempTreeMixin
+from utils import file_search
+from utils.ignore import IgnoreRules
+
+
+class TestIgnoreRules(TempTreeMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self._write(".gitignore", "*.log\n!keep.log\n/top.txt\nout/\ndocs/**/*.tmp\n\\#hash\n")
+        self._write("pkg/.gitignore", "local.py\n!*.log\n")
+        for rel in (
+            "a.log", "keep.log", "top.txt", "sub/top.txt", "out/x.py", "docs/a/b/c.tmp", "docs/c.tmp",
+            "#hash", "pkg/local.py", "pkg/debug.log", "pkg/main.py", "chroma_db/data.bin", "src/out",
+        ):
+            self._write(rel, "x\n")
+
+    def test_walk_uses_gitignore_semantics(self):
+        walked = {
+            os.path.relpath(p, self.root).replace(os.sep, "/")
+            for p in file_search.walk_files(self.root, ignore=IgnoreRules(self.root))
+        }
+        self.assertEqual(walked, {
+            ".gitignore", "keep.log", "sub/top.txt", "pkg/.gitignore", "pkg/debug.log",
+            "pkg/main.py", "src/out",
+        })
+
+    def test_ignored_path_checks_parents(self):
+        rules = IgnoreRules(self.root)
+        self.assertTrue(rules.ignored_path(os.path.join(self.root, "out", "x.py")))
+        self.assertTrue(rules.ignored_path(os.path.join(self.root, "chroma_db", "data.bin")))
+        self.assertFalse(rules.ignored_path(os.path.join(self.root, "pkg", "main.py")))
+
+    def test_sniff_rejects_before_reading(self):
+        with open(os.path.join(self.root, "blob.dat"), "wb") as f:
+            f.write(b"\0" * 10)
+        self.assertEqual(file_search.sniff(os.path.join(self.root, "img.png"))[1], "binary")
+        self.assertEqual(file_search.sniff(os.path.join(self.root, "blob.dat"))[1], "binary")
+        self.assertEqual(file_search.sniff(os.path.join(self.root, "a.log"), extensions={".py"})[1], "extension")
+        self.assertEqual(file_search.sniff(os.path.join(self.root, "a.log"), max_bytes=1)[1], "too large")
+        f, head = file_search.sniff(os.path.join(self.root, "pkg", "main.py"), max_bytes=100, extensions={".py"})
+        with f:
+            self.assertEqual(head, b"x\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
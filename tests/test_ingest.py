@@ -0,0 +1,79 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tests.temp_tree import TempTreeMixin
+import config
+from utils import chunking, ingest
+
+
+class FakeStore:
+    def __init__(self, bad_source=None):
+        self.bad_source = bad_source
+        self.docs = {}
+        self.batches = []
+        self.deleted = []
+
+    def upsert(self, ids, texts, metadatas, embeddings):
+        if any(meta["source"] == self.bad_source for meta in metadatas):
+            raise RuntimeError("rejected")
+        self.batches.append(len(ids))
+        for doc_id, text, meta in zip(ids, texts, metadatas):
+            self.docs[doc_id] = (text, meta)
+
+    def delete(self, sources):
+        self.deleted.extend(sources)
+
+
+class TestIngest(TempTreeMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.multiple(config, INGEST_RETRIES=1, CHUNK_CHARS=50, INGEST_BATCH_DOCS=4)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _run(self, paths, store):
+        return ingest.ingest(
+            paths, embed=lambda texts: [[float(len(t))] for t in texts], upsert=store.upsert,
+            delete_sources=store.delete, readers=2, report=None,
+        )
+
+    def test_chunks_overlap_and_carry_line_numbers(self):
+        text = "".join(f"l{i:02d}\n" for i in range(1, 41))
+        chunks = chunking.chunk_text(text)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(chunks[0][1], 1)
+        self.assertEqual(chunks[-1][2], 40)
+        for (_, _, end), (_, start, _) in zip(chunks, chunks[1:]):
+            self.assertEqual(start, end - config.CHUNK_OVERLAP_LINES + 1)
+
+    def test_skips_binary_and_empty_files(self):
+        paths = [
+            self._write("a.txt", b"hello\n" * 30),
+            self._write("b.bin", b"\x00\x01\x02" * 100),
+            self._write("c.txt", b"  \n"),
+        ]
+        store = FakeStore()
+        result = self._run(paths, store)
+        self.assertEqual(result["read"], 1)
+        self.assertEqual(result["skipped_reasons"], {"binary": 1, "empty": 1})
+        self.assertEqual({meta["source"] for _, meta in store.docs.values()}, {paths[0]})
+        self.assertEqual(store.deleted, [paths[0]])
+
+    def test_failed_file_is_isolated_and_batches_are_capped(self):
+        paths = [self._write(f"f{i}.txt", f"file {i} line\n".encode() * 20) for i in range(6)]
+        store = FakeStore(bad_source=paths[3])
+        result = self._run(paths, store)
+        self.assertEqual(list(result["failed"]), [paths[3]])
+        stored = {meta["source"] for _, meta in store.docs.values()}
+        self.assertEqual(stored, set(paths) - {paths[3]})
+        self.assertEqual(result["stored"], len(store.docs))
+        self.assertTrue(all(size <= 4 for size in store.batches))
+        self.assertIn("Failed 1 files", ingest.format_report(result))
+
+
+if __name__ == "__main__":
+    unittest.main()
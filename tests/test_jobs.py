@@ -0,0 +1,157 @@
+import os
+import sys
+import json
+import time
+import threading
+import unittest
+import functools
+from unittest import mock
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tests.temp_tree import TempTreeMixin
+import config
+from utils import jobs, ingest, supervisor
+
+
+class SlowHandler(SimpleHTTPRequestHandler):
+    def do_GET(self):
+        time.sleep(0.05)
+        super().do_GET()
+
+    def log_message(self, *args):
+        pass
+
+
+class TestJobs(TempTreeMixin, unittest.TestCase):
+    TREE = "src"
+
+    def setUp(self):
+        super().setUp()
+        self.dir = os.path.join(self.tmp.name, "jobs")
+        self.files = [self._write(f"f{i}.txt", f"file {i}\n") for i in range(6)]
+        self.stored = []
+        self.gate = threading.Event()
+        self.gate.set()
+        patcher = mock.patch.object(config, "INGEST_RETRIES", 1)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        jobs.register("test_ingest", self._ingest)
+        jobs.register("test_spin", self._spin)
+
+    def _ingest(self, path, **pipeline):
+        def upsert(ids, texts, metadatas, embeddings):
+            self.gate.wait(5)
+            self.stored.extend(meta["source"] for meta in metadatas)
+
+        files = sorted(os.path.join(path, name) for name in os.listdir(path))
+        result = ingest.ingest(files, embed=None, upsert=upsert, delete_sources=None, **pipeline)
+        return ingest.format_report(result)
+
+    def _spin(self, **pipeline):
+        while True:
+            supervisor.check_cancelled()
+            time.sleep(0.01)
+
+    def test_submit_returns_at_once_and_completes(self):
+        manager = jobs.JobManager(self.dir, workers=1)
+        self.gate.clear()
+        job, how = manager.submit("test_ingest", {"path": self.root})
+        self.assertEqual(how, "started")
+        self.assertIn(job.status, jobs.ACTIVE)
+        self.assertEqual(manager.submit("test_ingest", {"path": self.root})[1][:7], "already")
+        self.gate.set()
+        manager.wait(job.id, timeout=10)
+        self.assertEqual(job.status, "done", job.error)
+        self.assertEqual(job.checkpointed, 6)
+        self.assertEqual(sorted(self.stored), self.files)
+        self.assertFalse(os.path.exists(os.path.join(self.dir, job.id + ".done")))
+        with open(os.path.join(self.dir, job.id + ".json")) as f:
+            self.assertEqual(json.load(f)["status"], "done")
+
+    def test_interrupted_job_resumes_from_checkpoint(self):
+        record = {"id": "abc12345", "kind": "test_ingest", "params": {"path": self.root}, "status": "running",
+                  "attempts": 1}
+        os.makedirs(self.dir)
+        with open(os.path.join(self.dir, "abc12345.json"), "w") as f:
+            json.dump(record, f)
+        with open(os.path.join(self.dir, "abc12345.done"), "w") as f:
+            f.write("\n".join(self.files[:4]) + "\n")
+
+        manager = jobs.JobManager(self.dir, workers=1)
+        self.assertEqual(manager.jobs["abc12345"].status, "interrupted")
+        job, how = manager.submit("test_ingest", {"path": self.root})
+        self.assertEqual((job.id, how), ("abc12345", "resumed"))
+        manager.wait(job.id, timeout=10)
+        self.assertEqual(job.status, "done", job.error)
+        self.assertEqual(sorted(self.stored), self.files[4:])
+        self.assertIn("Resumed: 4 files", job.result)
+
+    def test_cancel(self):
+        manager = jobs.JobManager(self.dir, workers=1)
+        running, _ = manager.submit("test_spin", {})
+        queued, _ = manager.submit("test_ingest", {"path": self.root})
+        self.assertEqual(manager.cancel(queued.id).status, "cancelled")
+        deadline = time.monotonic() + 5
+        while running.status != "running" and time.monotonic() < deadline:
+            time.sleep(0.01)
+        manager.cancel(running.id)
+        manager.wait(running.id, timeout=5)
+        self.assertEqual(running.status, "cancelled")
+        self.assertEqual(self.stored, [])
+
+    def test_resubmitted_cancelled_job_runs_once(self):
+        runs = []
+        jobs.register("test_count", lambda **pipeline: runs.append(1) or "counted")
+        manager = jobs.JobManager(self.dir, workers=2)
+        spinners = [manager.submit("test_spin", {"n": n})[0] for n in range(2)]
+        deadline = time.monotonic() + 5
+        while any(j.status != "running" for j in spinners) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        job, _ = manager.submit("test_count", {})
+        manager.cancel(job.id)
+        self.assertEqual(manager.submit("test_count", {}), (job, "started"))  # queued a second time
+        for spinner in spinners:
+            manager.cancel(spinner.id)
+        manager.wait(job.id, timeout=5)
+        time.sleep(0.1)
+        self.assertEqual((job.status, runs), ("done", [1]))
+
+    def test_cancelled_crawl_keeps_its_checkpoint(self):
+        site = os.path.join(self.tmp.name, "site")
+        for i in range(40):
+            self._write(os.path.join(site, f"p{i}.html"), f'<p>page {i}</p><a href="p{i + 1}.html">next</a>')
+        server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(SlowHandler, directory=site))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        patcher = mock.patch.multiple(
+            config, CRAWL_HOST_DELAY=0, CRAWL_CACHE_DIR=os.path.join(self.tmp.name, "crawl"), INGEST_BATCH_DOCS=1
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        with mock.patch.dict(os.environ, {"CHROMA_DB_PATH": os.path.join(self.tmp.name, "chroma")}):
+            from utils import learning
+
+        def upsert(ids, texts, metadatas, embeddings):
+            self.stored.extend(meta["source"] for meta in metadatas)
+
+        jobs.register("test_crawl", lambda url, **pipeline: learning.learn_url(
+            url, crawl=True, max_depth=50, max_pages=50, embed=None, upsert=upsert, delete_sources=None, **pipeline
+        ))
+        manager = jobs.JobManager(self.dir, workers=1)
+        job, _ = manager.submit("test_crawl", {"url": f"http://127.0.0.1:{server.server_port}/p0.html"})
+        deadline = time.monotonic() + 10
+        while job.checkpointed < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        manager.cancel(job.id)
+        manager.wait(job.id, timeout=10)
+        self.assertEqual(job.status, "cancelled", job.result)
+        with open(os.path.join(self.dir, job.id + ".done")) as f:
+            self.assertGreaterEqual(len(f.read().split()), 2)
+        self.assertLess(len(self.stored), 40)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+import os
+import sys
+import json
+import unittest
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tests.temp_tree import TempTreeMixin
+from utils import metrics
+
+
+def _usage(prompt, candidates, cached=0):
+    return SimpleNamespace(prompt_token_count=prompt, candidates_token_count=candidates,
+                           cached_content_token_count=cached, total_token_count=prompt + candidates)
+
+
+class TestMetrics(TempTreeMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.session_id = metrics.start_session("tester")
+        metrics.record_model_call("flash", _usage(100, 20, cached=40), 0.5)
+        metrics.record_model_call("flash", _usage(300, 10), 1.5)
+        metrics.record_model_call("pro", _usage(50, 50), 2.0)
+        metrics.record_model_call("pro", None, 0.25)  # no usage metadata
+        metrics.record_tool_call("read_file", 0.1, "x" * 30)
+        metrics.record_tool_call("read_file", 0.2, "y" * 12)
+        metrics.record_tool_call("run_shell", 3.0, None)
+
+    def test_totals_per_session_model_and_tool(self):
+        stats = metrics.get_stats(top=2)
+        self.assertEqual(stats["session_id"], self.session_id)
+        self.assertEqual(stats["totals"], {"calls": 4, "prompt_tokens": 450, "candidate_tokens": 80,
+                                           "cached_tokens": 40, "total_tokens": 530, "seconds": 4.25})
+        self.assertEqual(stats["models"]["flash"]["total_tokens"], 430)
+        self.assertEqual((stats["models"]["pro"]["calls"], stats["models"]["pro"]["seconds"]), (2, 2.25))
+        self.assertEqual(stats["tools"]["read_file"]["calls"], 2)
+        self.assertEqual(stats["tools"]["read_file"]["result_chars"], 42)
+        self.assertAlmostEqual(stats["tools"]["read_file"]["seconds"], 0.3)
+        self.assertEqual(stats["tools"]["run_shell"]["result_chars"], 0)
+        self.assertEqual([c["total_tokens"] for c in stats["top_by_tokens"]], [310, 120])
+        self.assertEqual([c["name"] for c in stats["top_by_time"]], ["run_shell", "pro"])
+
+    def test_dump_appends_one_line_per_session(self):
+        path = self._path("logs/metrics.jsonl")
+        metrics.dump_session(path)
+        metrics.start_session("tester")
+        metrics.dump_session(path)
+        with open(path) as f:
+            first, second = [json.loads(line) for line in f]
+        self.assertEqual(first["session_id"], self.session_id)
+        self.assertEqual(sorted(first), ["elapsed_seconds", "models", "session_id", "tool_cache", "tools",
+                                         "top_by_time", "top_by_tokens", "totals"])
+        self.assertEqual(first["totals"]["calls"], 4)
+        self.assertEqual(second["totals"]["calls"], 0)
+        self.assertEqual(second["tools"], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
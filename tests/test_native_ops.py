@@ -0,0 +1,72 @@
+import os
+import sys
+import stat
+import shutil
+import unittest
+import subprocess
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tests.temp_tree import TempTreeMixin
+from utils import native_ops
+
+
+class TestNativeOps(TempTreeMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self._write("a.py", "foo = 1\nfood = foo\n")
+        self._write("pkg/b.py", "foo()\r\n")
+        self._write("pkg/c.txt", "foo\n")
+        self._write("node_modules/d.py", "foo\n")
+
+    def test_parse_mode(self):
+        self.assertEqual(native_ops.parse_mode("755", 0), 0o755)
+        self.assertEqual(native_ops.parse_mode("u+x,go-w", 0o666), 0o744)
+        self.assertEqual(native_ops.parse_mode("a=rX", 0o600, is_dir=True), 0o555)
+        self.assertEqual(native_ops.parse_mode("o=r", 0o640), 0o644)
+        with self.assertRaises(ValueError):
+            native_ops.parse_mode("u+q", 0)
+
+    def test_stat_text(self):
+        text = native_ops.stat_text(self._path("a.py"))
+        self.assertIn("Size: 19", text)
+        self.assertIn(stat.filemode(os.stat(self._path("a.py")).st_mode), text)
+
+    def test_sed(self):
+        commands = native_ops.parse_sed(r"s/\(fo*\)d/<\1>/g; s|=|:=|")
+        self.assertEqual(native_ops.apply_sed(commands, "food = 1\nfod fd\n"), "<foo> := 1\n<fo> <f>\n")
+        self.assertIsNone(native_ops.parse_sed("2d"))
+        self.assertIsNone(native_ops.parse_sed("s/a/b/w out.txt"))
+
+    def test_sed_trailing_newline_is_not_a_line(self):
+        for expression, expected in (("s/$/;/", "a;\nb;\n"), ("s/^/# /", "# a\n# b\n")):
+            self.assertEqual(native_ops.apply_sed(native_ops.parse_sed(expression), "a\nb\n"), expected)
+        self.assertEqual(native_ops.apply_sed(native_ops.parse_sed("s/$/;/"), "a\n\nb"), "a;\n;\nb;")
+
+    def test_sed_gnu_word_anchors(self):
+        commands = native_ops.parse_sed(r"s/\<foo\>/bar/g")
+        self.assertEqual(native_ops.apply_sed(commands, "foo food <foo>\n"), "bar food <bar>\n")
+
+    @unittest.skipUnless(shutil.which("sed"), "needs sed")
+    def test_sed_matches_real_sed_or_defers_to_it(self):
+        text = "baaac 12 foo\nx1y22\n"
+        for expression in (r"s/[0-9]\+/N/g", r"s/\(o\+\)/[\1]/", "s/^/> /", "s/$/;/", r"s/[]x]/-/g"):
+            sed = subprocess.run(["sed", expression], input=text, capture_output=True, text=True, check=True)
+            self.assertEqual(native_ops.apply_sed(native_ops.parse_sed(expression), text), sed.stdout, expression)
+        for expression in ("s/[[:digit:]]/N/g", r"s/\(f\)/\U\1/", r"s/o/\u&/", "s/a*/X/g", r"s/x\?/-/"):
+            self.assertIsNone(native_ops.parse_sed(expression), expression)
+
+    def test_regex_replace(self):
+        changes, scanned, diff = native_ops.regex_replace(self.root, r"\bfoo\b", "bar", "*.py", dry_run=True)
+        self.assertEqual((len(changes), scanned), (2, 2))
+        self.assertIn("+food = bar", diff)
+        self.assertEqual(self._read("a.py"), "foo = 1\nfood = foo\n")
+        native_ops.regex_replace(self.root, r"\bfoo\b", "bar", "*.py")
+        self.assertEqual(self._read("a.py"), "bar = 1\nfood = bar\n")
+        self.assertEqual(self._read("pkg/b.py"), "bar()\r\n")
+        self.assertEqual(self._read("pkg/c.txt"), "foo\n")
+        self.assertEqual(self._read("node_modules/d.py"), "foo\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tests.temp_tree import TempTreeMixin
+from utils import patching
+
+
+class TestPatching(TempTreeMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self._write("a.py", "def f():\n    return 1\n\n\ndef g():\n    return 2\n")
+        self._write("b.txt", "one\r\ntwo\r\n")
+
+    def test_unified_multi_hunk_and_create(self):
+        patch = (
+            "--- a/a.py\n+++ b/a.py\n"
+            "@@ -1,2 +1,3 @@\n def f():\n+    # one\n     return 1\n"
+            "@@ -5,2 +6,2 @@\n def g():\n-    return 2\n+    return 3\n"
+            "--- /dev/null\n+++ b/c.txt\n@@ -0,0 +1 @@\n+new\n"
+        )
+        changes = patching.apply(patch, self.root)
+        self.assertEqual(self._read("a.py"), "def f():\n    # one\n    return 1\n\n\ndef g():\n    return 3\n")
+        self.assertEqual(self._read("c.txt"), "new\n")
+        self.assertEqual([c[3]["added"] for c in changes], [2, 1])
+
+    def test_search_replace_keeps_line_endings(self):
+        patching.apply("b.txt\n<<<<<<< SEARCH\ntwo\n=======\n2\n>>>>>>> REPLACE\n", self.root)
+        self.assertEqual(self._read("b.txt"), "one\r\n2\r\n")
+
+    def test_whitespace_fuzz(self):
+        changes = patching.apply("a.py\n<<<<<<< SEARCH\n  return   2\n=======\n    return 4\n>>>>>>> REPLACE\n", self.root)
+        self.assertEqual(changes[0][3]["fuzzy"], 1)
+        self.assertTrue(self._read("a.py").endswith("    return 4\n"))
+
+    def test_all_or_nothing(self):
+        patch = (
+            "b.txt\n<<<<<<< SEARCH\none\n=======\n1\n>>>>>>> REPLACE\n"
+            "a.py\n<<<<<<< SEARCH\nmissing\n=======\nx\n>>>>>>> REPLACE\n"
+        )
+        with self.assertRaises(patching.PatchError):
+            patching.apply(patch, self.root)
+        self.assertEqual(self._read("b.txt"), "one\r\ntwo\r\n")
+
+    def test_ambiguous_search(self):
+        self._write("d.txt", "x\ny\nx\n")
+        with self.assertRaisesRegex(patching.PatchError, "matches 2 places"):
+            patching.apply("d.txt\n<<<<<<< SEARCH\nx\n=======\nz\n>>>>>>> REPLACE\n", self.root)
+
+    def test_removed_lines_that_look_like_headers(self):
+        self._write("q.sql", "SELECT 1;\n-- old comment\nSELECT 2;\n")
+        patch = "--- a/q.sql\n+++ b/q.sql\n@@ -1,3 +1,3 @@\n SELECT 1;\n--- old comment\n+-- new comment\n SELECT 2;\n"
+        changes = patching.apply(patch, self.root)
+        self.assertEqual(self._read("q.sql"), "SELECT 1;\n-- new comment\nSELECT 2;\n")
+        self.assertEqual((changes[0][3]["added"], changes[0][3]["removed"]), (1, 1))
+
+    def test_header_counts_are_only_a_hint(self):
+        self._write("c.txt", "a\nb\nc\nd\n")
+        undercounted = "--- a/c.txt\n+++ b/c.txt\n@@ -1,2 +1,2 @@\n a\n-b\n+B\n-c\n+C\n d\n\n"
+        patching.apply(undercounted, self.root)
+        self.assertEqual(self._read("c.txt"), "a\nB\nC\nd\n")
+        patching.apply("--- a/c.txt\n+++ b/c.txt\n@@ @@\n-d\n+D\n", self.root)
+        self.assertEqual(self._read("c.txt"), "a\nB\nC\nD\n")
+
+    def test_bad_hunks_are_rejected(self):
+        noop = "--- a/a.py\n+++ b/a.py\n@@ -1,2 +1,2 @@\n def f():\n     return 1\n"
+        with self.assertRaisesRegex(patching.PatchError, "changes nothing"):
+            patching.apply(noop, self.root)
+        stray = "--- a/a.py\n+++ b/a.py\n@@ -1,2 +1,2 @@\n def f():\n-    return 1\n+    return 2\nreturn 3\n"
+        with self.assertRaisesRegex(patching.PatchError, "outside a hunk"):
+            patching.apply(stray, self.root)
+        with self.assertRaisesRegex(patching.PatchError, "no hunks"):
+            patching.apply("--- a/a.py\n+++ b/a.py\n", self.root)
+        self.assertEqual(self._read("a.py"), "def f():\n    return 1\n\n\ndef g():\n    return 2\n")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import os
+import sys
+import textwrap
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tests.temp_tree import TempTreeMixin
+from tools_mod import registry
+
+
+class TestRegistry(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+        def copy_file(src, dst):
+            self.calls.append((src, dst))
+            return f"{src} -> {dst}"
+
+        registry.register(
+            "test_copy",
+            copy_file,
+            "Copies a file.",
+            {"type": "object", "properties": {"src": {}, "dst": {}}, "required": ["src", "dst"]},
+            arg_aliases={"src": ["source_path"], "dst": ["destination_path"]},
+            names=("test_copy_alias",),
+            module="tests.fake_tools",
+        )
+
+    def tearDown(self):
+        registry.unregister_module("tests.fake_tools")
+
+    def test_dispatch_normalizes_argument_aliases(self):
+        result = registry.dispatch("test_copy", {"source_path": "a", "destination_path": "b"})
+        self.assertEqual(result, "a -> b")
+
+    def test_alternative_tool_name(self):
+        self.assertEqual(registry.dispatch("test_copy_alias", {"src": "a", "dst": "b"}), "a -> b")
+
+    def test_missing_argument(self):
+        result = registry.dispatch("test_copy", {"src": "a"})
+        self.assertIn("'dst' parameter is required", result)
+        self.assertEqual(self.calls, [])
+
+    def test_declarations_advertise_timeout_override(self):
+        decl = registry.get("test_copy").declaration()
+        self.assertEqual(decl["parameters"]["properties"]["timeout_seconds"], registry.TIMEOUT_PARAMETER)
+        self.assertEqual(decl["parameters"]["required"], ["src", "dst"])
+        self.assertNotIn("timeout_seconds", registry.get("test_copy").parameters["properties"])
+
+    def test_unregister_module(self):
+        registry.unregister_module("tests.fake_tools")
+        self.assertIsNone(registry.get("test_copy"))
+        self.assertIsNone(registry.get("test_copy_alias"))
+
+
+class TestManifest(TempTreeMixin, unittest.TestCase):
+    MODULE = "fake_lazy_tools"
+
+    def setUp(self):
+        super().setUp()
+        self._write(f"{self.MODULE}.py", textwrap.dedent("""
+            from tools_mod.registry import tool
+
+            @tool("lazy_echo", "Echoes.", {"type": "object", "properties": {"text": {}}}, names=("echo_lazily",))
+            def lazy_echo(text=""):
+                return text
+        """))
+        sys.path.insert(0, self.root)
+        self.path = self._path("manifest.json")
+
+    def tearDown(self):
+        registry.unregister_module(self.MODULE)
+        sys.modules.pop(self.MODULE, None)
+        sys.path.remove(self.root)
+        super().tearDown()
+
+    def test_tools_are_advertised_before_their_module_is_imported(self):
+        registry.write_manifest([self.MODULE], self.path)
+        registry.unregister_module(self.MODULE)
+        del sys.modules[self.MODULE]
+
+        self.assertTrue(registry.load_manifest([self.MODULE], self.path))
+        self.assertNotIn(self.MODULE, sys.modules)
+        self.assertIn("lazy_echo", [d["name"] for d in registry.declarations()])
+
+        self.assertEqual(registry.dispatch("echo_lazily", {"text": "hi"}), "hi")
+        self.assertIn(self.MODULE, sys.modules)
+
+    def test_stale_manifest_is_rejected(self):
+        registry.write_manifest([self.MODULE], self.path)
+        registry.unregister_module(self.MODULE)
+        del sys.modules[self.MODULE]
+        with open(self._path(f"{self.MODULE}.py"), "a") as f:
+            f.write("# changed\n")
+        self.assertFalse(registry.load_manifest([self.MODULE], self.path))
+
+    def _rewrite(self, body):
+        self._write(f"{self.MODULE}.py", textwrap.dedent(body))
+
+    def test_reload_swaps_tools(self):
+        __import__(self.MODULE)
+        self._rewrite("""
+            from tools_mod.registry import tool
+
+            @tool("lazy_shout", "Shouts.", {"type": "object", "properties": {"text": {}}})
+            def lazy_shout(text=""):
+                return text.upper()
+        """)
+        registry.reload_module(self.MODULE)
+        self.assertIsNone(registry.get("lazy_echo"))
+        self.assertIsNone(registry.get("echo_lazily"))
+        self.assertEqual(registry.dispatch("lazy_shout", {"text": "hi"}), "HI")
+
+    def test_failed_reload_keeps_previous_tools(self):
+        __import__(self.MODULE)
+        self._rewrite("def broken(:\n")
+        with self.assertRaises(SyntaxError):
+            registry.reload_module(self.MODULE)
+        self.assertEqual(registry.dispatch("lazy_echo", {"text": "hi"}), "hi")
+
+
+if __name__ == "__main__":
+    unittest.main()
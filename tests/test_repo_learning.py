@@ -0,0 +1,103 @@
+import os
+import sys
+import unittest
+import subprocess
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tests.temp_tree import TempTreeMixin
+import config
+from utils import repo_learning
+
+
+class FakeStore:
+    def __init__(self):
+        self.sources = set()
+        self.upserted = set()
+        self.fail_deletes = False
+
+    def upsert(self, ids, texts, metadatas, embeddings):
+        for meta in metadatas:
+            self.sources.add(meta["source"])
+            self.upserted.add(os.path.basename(meta["source"]))
+
+    def delete(self, sources):
+        if self.fail_deletes:
+            raise RuntimeError("store unavailable")
+        self.sources -= set(sources)
+
+
+class TestRepoLearning(TempTreeMixin, unittest.TestCase):
+    TREE = "repo"
+
+    def setUp(self):
+        super().setUp()
+        self.root = os.path.realpath(self.root)
+        patcher = mock.patch.object(config, "LEARN_STATE_DIR", os.path.join(self.tmp.name, "state"))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self._git("init", "-q")
+        for name in ("a.py", "b.py", "d.txt"):
+            self._write(name, f"{name} v1\n")
+        self._commit()
+        self.store = FakeStore()
+
+    def _git(self, *args):
+        subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *args], cwd=self.root, check=True,
+                       capture_output=True)
+
+    def _commit(self):
+        self._git("add", "-A")
+        self._git("commit", "-q", "-m", "change")
+
+    def _learn(self, **kwargs):
+        self.store.upserted = set()
+        return repo_learning.learn_repo(
+            self.root, upsert=self.store.upsert, delete_sources=self.store.delete, report=None, **kwargs
+        )
+
+    def test_only_changes_are_relearned(self):
+        self.assertIn("(full)", self._learn())
+        self.assertEqual(self.store.upserted, {"a.py", "b.py", "d.txt"})
+        self.assertIn("nothing changed", self._learn())
+
+        self._write("a.py", "a.py v2\n")
+        self._write("c.py", "c.py v1\n")
+        os.remove(os.path.join(self.root, "b.py"))
+        self._git("mv", "d.txt", "e.txt")
+        self._commit()
+        self.assertIn("incremental", self._learn())
+        self.assertEqual(self.store.upserted, {"a.py", "c.py", "e.txt"})
+        self.assertEqual({os.path.basename(s) for s in self.store.sources}, {"a.py", "c.py", "e.txt"})
+
+    def test_uncommitted_changes(self):
+        self._learn()
+        self._write("a.py", "a.py work in progress\n")
+        self._learn()
+        self.assertEqual(self.store.upserted, {"a.py"})
+        self.assertIn("nothing changed", self._learn())
+        self._git("checkout", "--", "a.py")
+        self._learn()
+        self.assertEqual(self.store.upserted, {"a.py"})
+
+    def test_failed_deletions_are_retried(self):
+        self._learn()
+        os.remove(os.path.join(self.root, "b.py"))
+        self._commit()
+        self.store.fail_deletes = True
+        self._learn()
+        self.store.fail_deletes = False
+        self.assertIn(os.path.join(self.root, "b.py"), self.store.sources)
+        self.assertIn("incremental", self._learn())
+        self.assertEqual({os.path.basename(s) for s in self.store.sources}, {"a.py", "d.txt"})
+        self.assertIn("nothing changed", self._learn())
+
+    def test_full_relearns_everything(self):
+        self._learn()
+        self._learn(full=True)
+        self.assertEqual(self.store.upserted, {"a.py", "b.py", "d.txt"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tests.temp_tree import TempTreeMixin
+import config
+from utils import result_store
+
+
+class TestResultStore(TempTreeMixin, unittest.TestCase):
+    def test_small_results_pass_through(self):
+        self.assertEqual(result_store.spill("read_file", "short", self.root), "short")
+        self.assertEqual(os.listdir(self.root), [])
+
+    def test_large_result_is_spilled_and_paged(self):
+        text = "".join(f"line {i}\n" for i in range(5000))
+        preview = result_store.spill("read_file", text, self.root)
+        self.assertLess(len(preview), config.RESULT_SPILL_CHARS)
+        self.assertTrue(preview.startswith(text[:config.RESULT_PREVIEW_HEAD]))
+        self.assertTrue(preview.endswith(text[-config.RESULT_PREVIEW_TAIL:]))
+
+        handle = preview.split("handle '")[1].split("'")[0]
+        pages, offset = [], 0
+        while True:
+            page = result_store.fetch(handle, offset, 10000, self.root)
+            body = page.split("\n", 1)[1].rsplit("\n", 1)[0]
+            pages.append(body)
+            offset += len(body)
+            if page.endswith("[End of result]"):
+                break
+        self.assertEqual("".join(pages), text)
+
+    def test_pages_are_never_spilled_again(self):
+        text = "x" * (config.RESULT_SPILL_CHARS * 3)
+        handle = result_store.spill("read_file", text, self.root).split("handle '")[1].split("'")[0]
+        for offset in (0, config.RESULT_SPILL_CHARS * 2):
+            page = result_store.fetch(handle, offset, config.RESULT_SPILL_CHARS * 2, self.root)
+            self.assertLessEqual(len(page), config.RESULT_SPILL_CHARS)
+            self.assertIs(result_store.spill("fetch_result", page, self.root), page)
+
+    def test_invalid_handle(self):
+        self.assertIn("Invalid result handle", result_store.fetch("../etc/passwd", directory=self.root))
+        self.assertIn("Unknown result handle", result_store.fetch("nope", directory=self.root))
+
+
+if __name__ == "__main__":
+    unittest.main()
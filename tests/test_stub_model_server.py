@@ -0,0 +1,54 @@
+import unittest
+import sys
+import os
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import config
+from api import agentic_reason_and_act
+from bin.stub_model_server import StubModelServer
+from utils.model_wrapper import GenerativeModelWrapper
+
+
+class TestStubModelServer(unittest.TestCase):
+
+    def setUp(self):
+        self.server = StubModelServer(
+            [
+                {"function_call": {"name": "read_file", "args": {"path": "README.md"}}},
+                {"text": "All done."},
+            ]
+        ).start()
+        self.saved = (config.GEMINI_BASE_URL, config.API_KEY)
+        config.GEMINI_BASE_URL = self.server.base_url
+        config.API_KEY = "stub"
+        self.model = GenerativeModelWrapper("stub-model")
+
+    def tearDown(self):
+        config.GEMINI_BASE_URL, config.API_KEY = self.saved
+        self.server.stop()
+
+    def test_script_is_replayed_in_order(self):
+        history = [{"role": "user", "parts": ["Read the README"]}]
+
+        thought, function_call = agentic_reason_and_act(self.model, history)
+        self.assertEqual(function_call.name, "read_file")
+        self.assertEqual(function_call.args["path"], "README.md")
+
+        thought, function_call = agentic_reason_and_act(self.model, history)
+        self.assertEqual(thought, "All done.")
+        self.assertIsNone(function_call)
+
+        thought, _ = agentic_reason_and_act(self.model, history)
+        self.assertEqual(thought, self.server.default_text)
+        self.assertEqual(len(self.server.requests), 3)
+
+    def test_usage_metadata_is_reported(self):
+        response = self.model.generate_content([{"role": "user", "parts": ["hello"]}])
+        self.assertGreater(response.usage_metadata.prompt_token_count, 0)
+        self.assertGreater(response.usage_metadata.candidates_token_count, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
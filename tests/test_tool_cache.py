@@ -0,0 +1,56 @@
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tools_mod import registry
+from utils import tool_cache
+
+
+class TestToolCache(unittest.TestCase):
+    def setUp(self):
+        tool_cache.clear()
+        self.reads = 0
+        self.tmp = tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False)
+        self.tmp.write("one")
+        self.tmp.close()
+
+        def read(filepath):
+            self.reads += 1
+            with open(filepath) as f:
+                return f.read()
+
+        registry.register("test_read", read, cache=tool_cache.files("filepath"), module="tests.cache_tools")
+        registry.register("test_touch", lambda: "ok", invalidates=("files",), module="tests.cache_tools")
+
+    def tearDown(self):
+        registry.unregister_module("tests.cache_tools")
+        os.remove(self.tmp.name)
+        tool_cache.clear()
+
+    def test_repeat_is_served_from_cache(self):
+        args = {"filepath": self.tmp.name}
+        self.assertEqual(registry.dispatch("test_read", args), "one")
+        self.assertEqual(registry.dispatch("test_read", args), "one")
+        self.assertEqual(self.reads, 1)
+
+    def test_file_change_invalidates(self):
+        args = {"filepath": self.tmp.name}
+        registry.dispatch("test_read", args)
+        with open(self.tmp.name, "w") as f:
+            f.write("two!")
+        self.assertEqual(registry.dispatch("test_read", args), "two!")
+        self.assertEqual(self.reads, 2)
+
+    def test_mutating_tool_invalidates_scope(self):
+        args = {"filepath": self.tmp.name}
+        registry.dispatch("test_read", args)
+        registry.dispatch("test_touch")
+        registry.dispatch("test_read", args)
+        self.assertEqual(self.reads, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import os
+import sys
+import json
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tests.temp_tree import TempTreeMixin
+from utils import tracing
+
+
+class TestTracing(TempTreeMixin, unittest.TestCase):
+    def tearDown(self):
+        tracing.disable()
+        super().tearDown()
+
+    def _record_nested(self):
+        with tracing.span("outer", "tool", tool="read_file") as outer:
+            with tracing.span("inner"):
+                pass
+            outer.set(chars=12)
+        with self.assertRaises(KeyError):
+            with tracing.span("failing"):
+                raise KeyError("x")
+
+    def _check(self, events):
+        self.assertEqual([e["name"] for e in events], ["inner", "outer", "failing"])
+        inner, outer, failing = events
+        self.assertEqual((outer["cat"], outer["ph"]), ("tool", "X"))
+        self.assertEqual(outer["args"], {"tool": "read_file", "chars": 12})
+        self.assertNotIn("args", inner)
+        self.assertLessEqual(outer["ts"], inner["ts"])
+        self.assertGreaterEqual(outer["ts"] + outer["dur"], inner["ts"] + inner["dur"])
+        self.assertEqual(failing["args"], {"error": "KeyError: 'x'"})
+
+    def test_off_by_default(self):
+        self.assertFalse(tracing.is_enabled())
+        self.assertIs(tracing.span("x"), tracing.span("y"))
+
+    def test_chrome_trace(self):
+        path = self._path("trace.json")
+        tracing.enable(path)
+        self._record_nested()
+        tracing.disable()
+        with open(path) as f:
+            trace = json.load(f)
+        self.assertEqual(trace["displayTimeUnit"], "ms")
+        self._check(trace["traceEvents"])
+
+    def test_jsonl_stream_is_closed_on_disable(self):
+        path = self._path("trace.jsonl")
+        tracing.enable(path)
+        self._record_nested()
+        tracing.disable()
+        self.assertIsNone(tracing._stream)
+        with open(path) as f:
+            self._check([json.loads(line) for line in f])
+        tracing.enable(self._path("second.json"))
+        with tracing.span("again"):
+            pass
+        tracing.disable()
+        with open(self._path("second.json")) as f:
+            self.assertEqual([e["name"] for e in json.load(f)["traceEvents"]], ["again"])
+
+
+if __name__ == "__main__":
+    unittest.main()
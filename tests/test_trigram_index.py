@@ -0,0 +1,70 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from tests.temp_tree import TempTreeMixin
+from utils import trigram_index
+from utils.trigram_index import TrigramIndex, required_literals
+
+
+class TestTrigramIndex(TempTreeMixin, unittest.TestCase):
+    TREE = "repo"
+
+    def setUp(self):
+        super().setUp()
+        self._write("a.py", "def alpha_handler():\n    return 1\n")
+        self._write("b.py", "def beta_handler():\n    return 2\n")
+        self._write("c.txt", "nothing to see\n")
+        self.index = TrigramIndex(self.root, os.path.join(self.tmp.name, "index.sqlite"))
+
+    def tearDown(self):
+        self.index.close()
+        super().tearDown()
+
+    def _names(self, results):
+        return [(os.path.basename(p), n) for p, n, _ in results]
+
+    def test_required_literals(self):
+        self.assertEqual(required_literals(r"def (alpha|beta)_handler\("), ["def ", "_handler("])
+        self.assertEqual(required_literals(r"foo\w+bar"), ["foo", "bar"])
+        self.assertEqual(required_literals("a.b", literal=True), ["a.b"])
+
+    def test_literal_narrows_candidates(self):
+        self.assertEqual(self.index.refresh()["added"], 3)
+        results, truncated, candidates = self.index.search("alpha_handler", literal=True)
+        self.assertEqual(self._names(results), [("a.py", 1)])
+        self.assertFalse(truncated)
+        self.assertEqual(candidates, 1)
+
+    def test_regex_is_verified(self):
+        self.index.refresh()
+        results, _, candidates = self.index.search(r"def \w+_handler\(\)")
+        self.assertEqual(self._names(results), [("a.py", 1), ("b.py", 1)])
+        self.assertEqual(candidates, 2)
+
+    def test_incremental_refresh(self):
+        self.index.refresh()
+        self.assertEqual(self.index.refresh()["added"], 0)
+        self._write("c.txt", "now mentions ALPHA_HANDLER\n")
+        os.utime(os.path.join(self.root, "c.txt"), ns=(1, 1))
+        os.remove(os.path.join(self.root, "b.py"))
+        stats = self.index.refresh()
+        self.assertEqual((stats["updated"], stats["removed"], stats["files"]), (1, 1, 2))
+        results, _, _ = self.index.search("alpha_handler", literal=True, ignore_case=True)
+        self.assertEqual(self._names(results), [("a.py", 1), ("c.txt", 1)])
+
+    def test_unindexed_files_are_always_candidates(self):
+        self._write("big.log", "x" * 64 + "\nalpha_handler in a large file\n")
+        with mock.patch.object(trigram_index, "MAX_FILE_BYTES", 64):
+            stats = self.index.refresh()
+        self.assertEqual((stats["added"], stats["skipped"]), (3, 1))
+        results, _, candidates = self.index.search("alpha_handler", literal=True)
+        self.assertEqual(self._names(results), [("a.py", 1), ("big.log", 2)])
+        self.assertEqual(candidates, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
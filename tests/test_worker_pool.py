@@ -0,0 +1,41 @@
+import os
+import sys
+import signal
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from utils.worker_pool import WorkerPool
+
+
+class TestWorkerPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = WorkerPool(size=1, max_calls=2)
+
+    def tearDown(self):
+        self.pool.close()
+
+    def _pid(self):
+        return self.pool.stats()[0]["pid"]
+
+    def test_call_runs_tool_in_worker(self):
+        self.assertEqual(self.pool.call("debug_echo", {"content": "hi"}), "Debug Echo: hi")
+        self.assertNotEqual(self._pid(), os.getpid())
+
+    def test_worker_recycled_after_max_calls(self):
+        first = self._pid()
+        self.pool.call("debug_echo", {"content": "1"})
+        self.assertEqual(self._pid(), first)
+        self.pool.call("debug_echo", {"content": "2"})
+        self.assertNotEqual(self._pid(), first)
+
+    def test_crash_is_isolated(self):
+        self.pool.call("debug_echo", {"content": "warm"})
+        os.kill(self._pid(), signal.SIGKILL)
+        result = self.pool.call("debug_echo", {"content": "x"})
+        self.assertIn("exited unexpectedly", result)
+        self.assertEqual(self.pool.call("debug_echo", {"content": "again"}), "Debug Echo: again")
+
+
+if __name__ == "__main__":
+    unittest.main()
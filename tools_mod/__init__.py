@@ -1,95 +1,87 @@
-from . import core, web, file_ops, memory, database, learning, display, git, nlp, debug_test, tool_creator, knowledge, system
-from .memory import execute_memory_tool
-from .database import execute_database_tool
-from .display import display_image_task
-from .learning import learn_repo_task, learn_directory_task, learn_url_task
-from utils.file_system import save_to_file
+import config
+from . import registry, plugins
+from utils import tracing, metrics, supervisor, worker_pool, result_store, tool_cache
+import time
 import traceback
 
+# Tool modules are the files in tools_mod/ that declare tools (see plugins.py).
+# When tool_manifest.json matches their source, the agent advertises their
+# tools from it and each module is imported on the first dispatch of one of
+# its tools; otherwise they are imported eagerly and the manifest is rebuilt.
+
+# Names re-exported from tool modules, resolved on first access.
+_EXPORTS = {
+    "execute_memory_tool": "memory",
+    "execute_database_tool": "database",
+    "display_image_task": "display",
+    "learn_repo_task": "learning",
+    "learn_directory_task": "learning",
+    "learn_url_task": "learning",
+}
+
+
+def load_tools(eager=None):
+    """Registers every tool, lazily from the manifest unless `eager` (or GEMINI_EAGER_TOOLS)."""
+    if eager is None:
+        eager = config.EAGER_TOOL_IMPORTS
+    module_names = plugins.discover()
+    if not eager and registry.load_manifest(module_names):
+        return
+    registry.write_manifest(module_names)
+
+
+def __getattr__(name):
+    if f"{__name__}.{name}" in plugins.discover():
+        return registry.import_module(f"{__name__}.{name}")
+    if name in _EXPORTS:
+        return getattr(registry.import_module(f"{__name__}.{_EXPORTS[name]}"), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+load_tools()
+
 def get_all_tool_definitions():
     """
     Returns a flat list of all tool definitions (Tools or Dicts).
     """
     all_tools = []
-
-    # Modern Modules (Return List[genai.types.Tool])
-    all_tools.extend(core.tool_definitions())
-    all_tools.extend(web.tool_definitions())
-    all_tools.extend(file_ops.tool_definitions())
-    all_tools.extend(learning.tool_definitions())
-    all_tools.extend(git.tool_definitions())
-    all_tools.extend(nlp.tool_definitions())
-    all_tools.extend(debug_test.tool_definitions())
-    all_tools.extend(tool_creator.tool_definitions())
-    all_tools.extend(knowledge.tool_definitions())
-    all_tools.extend(system.tool_definitions())
-
-    # Legacy Modules (Return List[Dict] or List[Tool])
-    all_tools.extend(memory.tool_definitions())
-    all_tools.extend(database.tool_definitions())
-    all_tools.extend(display.tool_definitions())
-
+    all_tools.extend(registry.tool_definitions())
     return all_tools
 
 def tool_definitions():
-    # Dynamically call get_all_tool_definitions each time
-    # to support runtime updates (e.g., via tool_creator)
+    # Served from the registry's cache, which is rebuilt whenever a tool
+    # is registered at runtime (e.g. via tool_creator)
     return get_all_tool_definitions()
 
-def execute_tool(name, args):
+def execute_tool(name, args, timeout=None):
     """
     Executes a tool by name with the given arguments.
     Catches exceptions and returns detailed tracebacks.
+    Runs under the tool's deadline (config.TOOL_TIMEOUTS), which `timeout`
+    or a `timeout_seconds` argument overrides; overruns return a timeout result.
+    Results above config.RESULT_SPILL_CHARS are replaced by a preview and a
+    fetch_result handle.
     """
-    try:
-        # 1. Modern Library Lookup
-        # Consolidated loop for cleaner extension
-        modern_modules = [
-            core, web, file_ops, git, nlp, debug_test, tool_creator, knowledge, system
-        ]
-
-        for module in modern_modules:
-            if hasattr(module, 'library') and name in module.library:
-                return module.library[name](**args)
-
-        # 2. Legacy / Special Cases
-
-        # Memory Tools
-        memory_tools = [t['name'] for t in memory.tool_definitions() if isinstance(t, dict) and 'name' in t]
-        if name in memory_tools:
-            return execute_memory_tool(name, args)
-
-        # Database Tools
-        database_tools = [t['name'] for t in database.tool_definitions() if isinstance(t, dict) and 'name' in t]
-        if name in database_tools:
-            return execute_database_tool(name, args)
-
-        # Learning Tools (Direct Mapping)
-        if name == "learn_repo":
-            return learn_repo_task()
-        elif name == "learn_directory":
-            path = args.get('path')
-            if not path:
-                return "Error: 'path' parameter is required for learn_directory."
-            return learn_directory_task(path)
-        elif name == "learn_url":
-            url = args.get('url')
-            if not url:
-                return "Error: 'url' parameter is required for learn_url."
-            return learn_url_task(url)
-
-        # Display Tools
-        if name == "display_image":
-            path = args.get('path')
-            if not path:
-                return "Error: 'path' parameter is required for display_image."
-            return display_image_task(path)
-
-        # Backward Compatibility
-        if name == "save_to_file":
-            return save_to_file(args.get('filename'), args.get('content'))
-
-        return f"Tool {name} not found."
+    args, override = supervisor.pop_timeout(args)
+    start = time.perf_counter()
+    with tracing.span(name, category="tool_call"):
+        result = supervisor.run_with_deadline(
+            name, _execute_tool, (name, args), timeout=override if override is not None else timeout
+        )
+    result = result_store.spill(name, result)
+    metrics.record_tool_call(name, time.perf_counter() - start, result)
+    return result
 
+def _execute_tool(name, args):
+    try:
+        if worker_pool.enabled(name):
+            try:
+                return worker_pool.call(name, args)
+            finally:
+                # The worker's own cache is separate; drop what the call made stale here
+                spec = registry.get(name)
+                if spec is not None:
+                    tool_cache.invalidate(spec.invalidates)
+        return registry.dispatch(name, args)
     except Exception as e:
         return f"Error executing tool '{name}': {e}\nTraceback:\n{traceback.format_exc()}"
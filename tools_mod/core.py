@@ -1,18 +1,46 @@
-import google.genai as genai
 import os
 import re
 from utils.commands import run_command, user_confirm
+from utils import tool_cache, file_reader
+from tools_mod.registry import tool
+from tools_mod import registry
 
 # --- Core Tools ---
 
 
+@tool(
+    "execute_shell_command",
+    "Run shell cmd",
+    {
+        "type": "object",
+        "properties": {"command": {"type": "string"}},
+        "required": ["command"],
+    },
+    arg_aliases={"command": ["cmd"]},
+    names=("run_command",),
+    invalidates=("*",),
+)
 def execute_shell_command(command):
     """Executes a shell command on the local system after user confirmation."""
     if user_confirm(f"Run: {command}?"):
-        return run_command(command, shell=True, check_output=True)
+        return run_command(command, shell=True, check_output=True, interactive=True)
     return "Denied."
 
 
+@tool(
+    "create_file",
+    "Create File",
+    {
+        "type": "object",
+        "properties": {
+            "filepath": {"type": "string"},
+            "content": {"type": "string"},
+        },
+        "required": ["filepath"],
+    },
+    arg_aliases={"filepath": ["path", "filename"], "content": ["data"]},
+    invalidates=("files", "git"),
+)
 def create_file_task(filepath, content=""):
     """Creates a new file at the specified path with optional content."""
     print(f"Tool: Running create_file_task(filepath='{filepath}')")
@@ -28,11 +56,65 @@ def create_file_task(filepath, content=""):
         return f"Error creating file {filepath}: {e}"
 
 
-def read_file_task(filepath):
+@tool(
+    "read_file",
+    "Read file content. For large files read only the part you need: a line range, the head or tail, "
+    "a byte range, or windows of lines around a regex pattern.",
+    {
+        "type": "object",
+        "properties": {
+            "filepath": {"type": "string"},
+            "start_line": {"type": "integer", "description": "First line (1-based; negative counts from the end)."},
+            "end_line": {"type": "integer", "description": "Last line, inclusive."},
+            "head": {"type": "integer", "description": "Return only the first N lines."},
+            "tail": {"type": "integer", "description": "Return only the last N lines."},
+            "byte_offset": {"type": "integer"},
+            "byte_length": {"type": "integer"},
+            "pattern": {"type": "string", "description": "Regex; returns numbered lines around its matches."},
+            "context": {"type": "integer", "description": "Lines shown before and after each match (default 10)."},
+            "max_matches": {"type": "integer", "description": "Matches to show windows for (default 5)."},
+        },
+        "required": ["filepath"],
+    },
+    arg_aliases={
+        "filepath": ["path", "filename"],
+        "start_line": ["start", "from_line"],
+        "end_line": ["end", "to_line"],
+        "pattern": ["around", "grep"],
+    },
+    cache=tool_cache.files("filepath"),
+)
+def read_file_task(filepath, start_line=None, end_line=None, head=None, tail=None, byte_offset=None,
+                   byte_length=None, pattern=None, context=10, max_matches=5):
     """Wrapper for reading a file to be called by the agent."""
     print(f'Tool: Running read_file_task(filepath="{filepath}")')
     try:
         filepath = os.path.expanduser(filepath)
+        if pattern:
+            spans, matches, total = file_reader.windows(filepath, pattern, int(context), int(max_matches))
+            if not spans:
+                return f"No matches for {pattern!r} in {filepath} ({total} lines)."
+            parts = []
+            for first, last, text, matched in spans:
+                numbered = [
+                    f"{'>' if n in matched else ' '}{n:6}: {line}"
+                    for n, line in enumerate(text.split("\n"), first)
+                ]
+                parts.append("\n".join(numbered))
+            return f"CONTEXT FILE ({filepath}, first {matches} matching lines of {pattern!r}, {total} lines):\n---\n" + "\n...\n".join(parts) + "\n---"
+        if head is not None:
+            return f"CONTEXT FILE ({filepath}, first {head} lines):\n---\n{file_reader.head(filepath, int(head))}\n---"
+        if tail is not None:
+            return f"CONTEXT FILE ({filepath}, last {tail} lines):\n---\n{file_reader.tail(filepath, int(tail))}\n---"
+        if byte_offset is not None or byte_length is not None:
+            offset, length = int(byte_offset or 0), int(byte_length if byte_length is not None else 4096)
+            content = file_reader.read_bytes(filepath, offset, length)
+            return f"CONTEXT FILE ({filepath}, {length} bytes from offset {offset}):\n---\n{content}\n---"
+        if start_line is not None or end_line is not None:
+            content, first, last, total = file_reader.read_lines(
+                filepath, int(start_line or 1), None if end_line is None else int(end_line)
+            )
+            return f"CONTEXT FILE ({filepath}, lines {first}-{last} of {total}):\n---\n{content}\n---"
         with open(filepath, "r", encoding="utf-8") as f:
             content = f.read()
         return f"CONTEXT FILE ({filepath}):\n---\n{content}\n---"
@@ -40,6 +122,23 @@ def read_file_task(filepath):
         return f"Error reading file {filepath}: {e}"
 
 
+@tool(
+    "install_packages",
+    "Install packages using apt-get",
+    {
+        "type": "object",
+        "properties": {
+            "packages": {
+                "type": "array",
+                "items": {
+                    "type": "string"
+                }
+            }
+        },
+        "required": ["packages"],
+    },
+    invalidates=("*",),
+)
 def install_packages(packages: list[str]):
     """Installs a list of packages using apt-get after user confirmation."""
     if not isinstance(packages, list):
@@ -54,67 +153,12 @@ def install_packages(packages: list[str]):
     cmd = f"sudo apt-get install -y {package_str}"
 
     if user_confirm(f"Run: {cmd}?"):
-        return run_command(cmd, shell=True, check_output=True)
+        return run_command(cmd, shell=True, check_output=True, interactive=True)
     return "Denied."
 
 
 def tool_definitions():
-    return [
-        genai.types.Tool(
-            function_declarations=[
-                genai.types.FunctionDeclaration(
-                    name="install_packages",
-                    description="Install packages using apt-get",
-                    parameters={
-                        "type": "object",
-                        "properties": {
-                            "packages": {
-                                "type": "array",
-                                "items": {
-                                    "type": "string"
-                                }
-                            }
-                        },
-                        "required": ["packages"],
-                    },
-                ),
-                genai.types.FunctionDeclaration(
-                    name="execute_shell_command",
-                    description="Run shell cmd",
-                    parameters={
-                        "type": "object",
-                        "properties": {"command": {"type": "string"}},
-                        "required": ["command"],
-                    },
-                ),
-                genai.types.FunctionDeclaration(
-                    name="create_file",
-                    description="Create File",
-                    parameters={
-                        "type": "object",
-                        "properties": {
-                            "filepath": {"type": "string"},
-                            "content": {"type": "string"},
-                        },
-                        "required": ["filepath"],
-                    },
-                ),
-                genai.types.FunctionDeclaration(
-                    name="read_file",
-                    description="Read file",
-                    parameters={
-                        "type": "object",
-                        "properties": {"filepath": {"type": "string"}},
-                        "required": ["filepath"],
-                    },
-                ),
-            ]
-        )
-    ]
-
-library = {
-    "execute_shell_command": execute_shell_command,
-    "create_file": create_file_task,
-    "read_file": read_file_task,
-    "install_packages": install_packages,
-}
+    return registry.tool_definitions(__name__)
+
+
+library = registry.library(__name__)
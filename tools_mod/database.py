@@ -4,40 +4,65 @@ from utils.database import (
     get_available_metadata_sources,
     get_collection_count
 )
+from utils import metrics
+from tools_mod.registry import tool
+from tools_mod import registry
 
-def tool_definitions():
-    return [
-        {
-            "name": "manage_knowledge",
-            "description": "Search and delete specific knowledge or history entries.",
-            "parameters": {
-                "type": "OBJECT",
-                "properties": {
-                    "action": {"type": "STRING", "enum": ["delete_history", "delete_knowledge"]},
-                    "query": {"type": "STRING", "description": "The search term to match for deletion"}
-                },
-                "required": ["action", "query"]
-            }
+@tool(
+    "manage_knowledge",
+    "Search and delete specific knowledge or history entries.",
+    {
+        "type": "OBJECT",
+        "properties": {
+            "action": {"type": "STRING", "enum": ["delete_history", "delete_knowledge"]},
+            "query": {"type": "STRING", "description": "The search term to match for deletion"}
         },
-        {
-            "name": "get_db_stats",
-            "description": "Get statistics about the memory and knowledge base.",
-            "parameters": {"type": "OBJECT", "properties": {}}
+        "required": ["action", "query"]
+    },
+)
+def manage_knowledge_task(action, query):
+    if action == "delete_history":
+        return search_and_delete_history(query)
+    elif action == "delete_knowledge":
+        return search_and_delete_knowledge(query)
+    return "Unknown database tool action."
+
+
+@tool(
+    "get_db_stats",
+    "Get statistics about the memory and knowledge base.",
+    {"type": "OBJECT", "properties": {}},
+)
+def get_db_stats_task():
+    return {
+        "history_count": get_collection_count("agent_memory"),
+        "knowledge_count": get_collection_count("agent_learning"),
+        "sources": get_available_metadata_sources()
+    }
+
+
+@tool(
+    "get_usage_stats",
+    "Get token usage and wall-clock time for this session, per model and per tool, with the most expensive calls.",
+    {
+        "type": "OBJECT",
+        "properties": {
+            "top": {"type": "INTEGER", "description": "How many of the most expensive calls to list (default 5)"}
         }
-    ]
+    },
+)
+def get_usage_stats_task(top=5):
+    return metrics.get_stats(top=int(top or 5))
+
+
+def tool_definitions():
+    return registry.tool_definitions(__name__)
+
+
+library = registry.library(__name__)
+
 
 def execute_database_tool(name, args):
-    if name == "manage_knowledge":
-        action = args.get("action")
-        query = args.get("query")
-        if action == "delete_history":
-            return search_and_delete_history(query)
-        elif action == "delete_knowledge":
-            return search_and_delete_knowledge(query)
-    elif name == "get_db_stats":
-        return {
-            "history_count": get_collection_count("agent_memory"),
-            "knowledge_count": get_collection_count("agent_learning"),
-            "sources": get_available_metadata_sources()
-        }
-    return "Unknown database tool action."
\ No newline at end of file
+    if name in library:
+        return registry.dispatch(name, args)
+    return "Unknown database tool action."
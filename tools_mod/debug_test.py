@@ -1,8 +1,23 @@
-import google.genai as genai
-import subprocess
-import sys
-import time
+from utils import supervisor, worker_pool
+from tools_mod.registry import tool
+from tools_mod import registry
 
+@tool(
+    "run_tests",
+    "Runs tests, lints, and formats a Python file.",
+    {
+        "type": "object",
+        "properties": {
+            "filepath": {
+                "type": "string",
+                "description": "Path to the Python file to test, lint, and format"
+            }
+        },
+        "required": ["filepath"],
+    },
+    arg_aliases={"filepath": ["path"]},
+    invalidates=("files", "git"),
+)
 def run_tests(filepath):
     """
     Runs tests, lints, and formats a Python file.
@@ -10,43 +25,39 @@ def run_tests(filepath):
     results = {}
 
     # Run tests
-    try:
-        test_result = subprocess.run(
-            [sys.executable, "-m", "unittest", filepath],
-            capture_output=True,
-            text=True,
-            check=True,
-        )
-        results["tests"] = test_result.stderr
-    except subprocess.CalledProcessError as e:
-        results["tests"] = e.stderr
+    test_result = worker_pool.run_module("unittest", [filepath])
+    results["tests"] = test_result.stderr
 
     # Run linter
-    try:
-        lint_result = subprocess.run(
-            [sys.executable, "-m", "flake8", filepath],
-            capture_output=True,
-            text=True,
-            check=True,
-        )
+    lint_result = worker_pool.run_module("flake8", [filepath])
+    if lint_result.returncode == 0:
         results["linting"] = lint_result.stdout or "No linting issues found."
-    except subprocess.CalledProcessError as e:
-        results["linting"] = e.stdout
+    else:
+        results["linting"] = lint_result.stdout
 
     # Run formatter
-    try:
-        format_result = subprocess.run(
-            [sys.executable, "-m", "black", filepath],
-            capture_output=True,
-            text=True,
-            check=True,
-        )
+    format_result = worker_pool.run_module("black", [filepath])
+    if format_result.returncode == 0:
         results["formatting"] = format_result.stderr or "No formatting changes needed."
-    except subprocess.CalledProcessError as e:
-        results["formatting"] = e.stderr
+    else:
+        results["formatting"] = format_result.stderr
 
     return results
 
+@tool(
+    "debug_failure",
+    "Intentionally raises an error for debugging purposes.",
+    {
+        "type": "object",
+        "properties": {
+            "error_type": {
+                "type": "string",
+                "description": "Type of error to raise (ValueError, ZeroDivisionError, Timeout, RuntimeError)"
+            }
+        },
+        "required": ["error_type"],
+    },
+)
 def debug_failure_task(error_type):
     """
     Intentionally raises an error to test the agent's error handling.
@@ -57,66 +68,31 @@ def debug_failure_task(error_type):
     elif error_type == "ZeroDivisionError":
         return 1 / 0
     elif error_type == "Timeout":
-        time.sleep(60) # Simulate timeout (may not actually trigger agent timeout immediately)
+        supervisor.sleep(60) # Simulate a hang; the tool deadline cancels this wait
         return "Finished wait (did not timeout system-level)."
     elif error_type == "RuntimeError":
         raise RuntimeError("This is a debug RuntimeError.")
     else:
         return f"Unknown error type: {error_type}"
 
+@tool(
+    "debug_echo",
+    "Echoes the input content back.",
+    {
+        "type": "object",
+        "properties": {
+            "content": {"type": "string"}
+        },
+        "required": ["content"],
+    },
+)
 def debug_echo_task(content):
     """Echoes content back. Useful for verifying tool connectivity."""
     return f"Debug Echo: {content}"
 
+
 def tool_definitions():
-    return [
-        genai.types.Tool(
-            function_declarations=[
-                genai.types.FunctionDeclaration(
-                    name="run_tests",
-                    description="Runs tests, lints, and formats a Python file.",
-                    parameters={
-                        "type": "object",
-                        "properties": {
-                            "filepath": {
-                                "type": "string",
-                                "description": "Path to the Python file to test, lint, and format"
-                            }
-                        },
-                        "required": ["filepath"],
-                    },
-                ),
-                genai.types.FunctionDeclaration(
-                    name="debug_failure",
-                    description="Intentionally raises an error for debugging purposes.",
-                    parameters={
-                        "type": "object",
-                        "properties": {
-                            "error_type": {
-                                "type": "string",
-                                "description": "Type of error to raise (ValueError, ZeroDivisionError, Timeout, RuntimeError)"
-                            }
-                        },
-                        "required": ["error_type"],
-                    },
-                ),
-                genai.types.FunctionDeclaration(
-                    name="debug_echo",
-                    description="Echoes the input content back.",
-                    parameters={
-                        "type": "object",
-                        "properties": {
-                            "content": {"type": "string"}
-                        },
-                        "required": ["content"],
-                    },
-                ),
-            ]
-        )
-    ]
+    return registry.tool_definitions(__name__)
+
 
-library = {
-    "run_tests": run_tests,
-    "debug_failure": debug_failure_task,
-    "debug_echo": debug_echo_task,
-}
+library = registry.library(__name__)
@@ -1,22 +1,22 @@
-from google.genai import types as genai_types
+from tools_mod.registry import tool
+from tools_mod import registry
 from utils.display import display_image
 
+@tool(
+    "display_image",
+    "Display an image.",
+    {
+        "type": "object",
+        "properties": {"path": {"type": "string"}},
+        "required": ["path"],
+    },
+)
 def display_image_task(path):
     return display_image(path)
 
+
 def tool_definitions():
-    return [
-        genai_types.Tool(
-            function_declarations=[
-                genai_types.FunctionDeclaration(
-                    name="display_image",
-                    description="Display an image.",
-                    parameters=genai_types.Schema(
-                        type=genai_types.Type.OBJECT,
-                        properties={"path": genai_types.Schema(type=genai_types.Type.STRING)},
-                        required=["path"],
-                    ),
-                )
-            ]
-        )
-    ]
+    return registry.tool_definitions(__name__)
+
+
+library = registry.library(__name__)
@@ -1,47 +1,169 @@
 import os
-import sys
-import shutil
+import glob
 import shlex
-import fnmatch
 import re
-import subprocess
-import google.genai as genai
 from utils.commands import run_command
+from utils import worker_pool, file_search, dir_listing, patching, archiver, native_ops, bulk_copy
+from utils.trigram_index import TrigramIndex
 from utils.file_system import save_to_file
-from tools_mod.core import read_file_task, execute_shell_command
+from tools_mod.registry import tool
+from tools_mod import registry
 
 
-def lint_python_file_task(filepath, linter="flake8"):
-    """Runs a linter on a file."""
-    cmd = f"{sys.executable} -m {linter} {shlex.quote(os.path.expanduser(filepath))}"
+def _batch_paths(filepath=None, filepaths=None):
+    """Expands a path, a list of paths and any glob patterns in them for one batched run."""
+    paths = []
+    for item in ([filepath] if filepath else []) + list(filepaths or []):
+        item = os.path.expanduser(item)
+        paths.extend(sorted(glob.glob(item, recursive=True)) if glob.has_magic(item) else [item])
+    if not paths:
+        raise ValueError("no files given (or the pattern matched nothing)")
+    return paths
+
+
+@tool(
+    "lint_python_file",
+    "Lint Python files. Pass several files or a glob in filepaths to lint them in one run.",
+    {
+        "type": "object",
+        "properties": {
+            "filepath": {"type": "string"},
+            "filepaths": {"type": "array", "items": {"type": "string"}, "description": "Files or glob patterns."},
+        },
+    },
+    arg_aliases={"filepath": ["path"], "filepaths": ["paths", "files"]},
+)
+def lint_python_file_task(filepath=None, filepaths=None, linter="flake8"):
+    """Runs a linter over a file or a batch of files."""
     try:
-        result = run_command(cmd, shell=True, check_output=True, ignore_errors=True)
-        return result if result.strip() else "No linting issues found."
+        result = worker_pool.run_module(linter, _batch_paths(filepath, filepaths))
+        output = (result.stdout + result.stderr).strip()
+        return output or "No linting issues found."
     except Exception as e:
         return f"Lint Error: {e}"
 
 
-def format_code_task(filepath, formatter="black"):
-    """Runs a formatter on a file."""
-    cmd = f"{sys.executable} -m {formatter} {shlex.quote(os.path.expanduser(filepath))}"
+@tool(
+    "format_code",
+    "Format Python files. Pass several files or a glob in filepaths to format them in one run.",
+    {
+        "type": "object",
+        "properties": {
+            "filepath": {"type": "string"},
+            "filepaths": {"type": "array", "items": {"type": "string"}, "description": "Files or glob patterns."},
+        },
+    },
+    arg_aliases={"filepath": ["path"], "filepaths": ["paths", "files"]},
+    invalidates=("files", "git"),
+)
+def format_code_task(filepath=None, filepaths=None, formatter="black"):
+    """Runs a formatter over a file or a batch of files."""
     try:
-        result = run_command(cmd, shell=True, check_output=True, ignore_errors=True)
-        return result or "Formatted successfully."
+        result = worker_pool.run_module(formatter, _batch_paths(filepath, filepaths))
+        output = (result.stderr or result.stdout).strip()
+        if result.returncode != 0:
+            return f"Format Error: {output}"
+        return output or "Formatted successfully."
     except Exception as e:
         return f"Format Error: {e}"
 
 
+@tool(
+    "apply_sed",
+    "Apply Sed",
+    {
+        "type": "object",
+        "properties": {
+            "filepath": {"type": "string"},
+            "sed_expression": {"type": "string"},
+        },
+        "required": ["filepath", "sed_expression"],
+    },
+    arg_aliases={"filepath": ["path"]},
+    invalidates=("files", "git"),
+)
 def apply_sed_task(filepath, sed_expression, in_place=True):
-    """Applies a SED command."""
+    """Applies a SED command; plain s/// commands run in-process."""
     expanded_filepath = os.path.expanduser(filepath)
+    commands = native_ops.parse_sed(sed_expression)
+    if commands is not None:
+        try:
+            with open(expanded_filepath, "r", encoding="utf-8", newline="") as f:
+                original = f.read()
+            updated = native_ops.apply_sed(commands, original)
+            if not in_place:
+                return updated
+            if updated != original:
+                patching.commit([(os.path.abspath(expanded_filepath), original, updated, {})])
+            return "Sed applied."
+        except Exception as e:
+            return f"Sed Error: {e}"
     full_cmd = f"sed {'-i' if in_place else ''} {shlex.quote(sed_expression)} {shlex.quote(expanded_filepath)}"
     try:
-        result = run_command(full_cmd, shell=True, check_output=True)
+        result = run_command(full_cmd, shell=True, check_output=True, ignore_errors=True)
         return result or "Sed applied."
     except Exception as e:
         return f"Sed Error: {e}"
 
 
+@tool(
+    "regex_replace",
+    "Replace a Python regular expression in every text file under a directory that matches a glob. "
+    "All files are rewritten or none; use dry_run to preview the diff first.",
+    {
+        "type": "object",
+        "properties": {
+            "pattern": {"type": "string", "description": "Python regex."},
+            "replacement": {"type": "string", "description": "Replacement; \\1 and \\g<name> refer to groups."},
+            "directory_path": {"type": "string", "description": "Directory (or a single file). Defaults to '.'."},
+            "file_glob": {"type": "string", "description": "e.g. '*.py' (any depth) or 'src/*.js' (relative path)."},
+            "ignore_case": {"type": "boolean"},
+            "multiline": {"type": "boolean", "description": "Let '.' match newlines."},
+            "dry_run": {"type": "boolean"},
+        },
+        "required": ["pattern", "replacement"],
+    },
+    arg_aliases={
+        "directory_path": ["path", "directory", "root"],
+        "file_glob": ["glob", "name_pattern", "include"],
+        "replacement": ["repl", "replace"],
+    },
+    names=("replace_in_files",),
+    invalidates=("files", "git"),
+)
+def regex_replace_task(pattern, replacement, directory_path=".", file_glob="*", ignore_case=False, multiline=False,
+                       dry_run=False):
+    try:
+        changes, scanned, diff = native_ops.regex_replace(
+            directory_path, pattern, replacement, file_glob, bool(ignore_case), bool(multiline), bool(dry_run)
+        )
+    except Exception as e:
+        return f"Error replacing: {e}"
+    total = sum(stats["replacements"] for _, _, _, stats in changes)
+    verb = "Would replace" if dry_run else "Replaced"
+    lines = [f"{verb} {total} matches in {len(changes)} of {scanned} files."]
+    if dry_run:
+        lines.append(diff)
+    else:
+        lines.extend(f"  {path}: {stats['replacements']}" for path, _, _, stats in changes[:50])
+        if len(changes) > 50:
+            lines.append(f"  ... and {len(changes) - 50} more files")
+    return "\n".join(line for line in lines if line)
+
+
+@tool(
+    "create_directory",
+    "Create Dir",
+    {
+        "type": "object",
+        "properties": {
+            "directory_path": {"type": "string"},
+        },
+        "required": ["directory_path"],
+    },
+    arg_aliases={"directory_path": ["path", "directory"]},
+    invalidates=("files", "git"),
+)
 def create_directory_task(directory_path):
     try:
         os.makedirs(os.path.expanduser(directory_path), exist_ok=True)
@@ -50,86 +172,300 @@ def create_directory_task(directory_path):
         return f"Error creating directory: {e}"
 
 
-def list_directory_recursive_task(directory_path):
+@tool(
+    "grep_index",
+    "Searches file contents through a persistent trigram index of the workspace (much faster than find_files on large trees). The index is refreshed incrementally before each query.",
+    {
+        "type": "object",
+        "properties": {
+            "pattern": {"type": "string", "description": "Regular expression, or literal text if literal is true."},
+            "directory_path": {"type": "string", "description": "Workspace root (default: current directory)."},
+            "literal": {"type": "boolean"},
+            "ignore_case": {"type": "boolean"},
+            "max_results": {"type": "integer", "description": "Stop after this many matches (default 200)."},
+        },
+        "required": ["pattern"],
+    },
+    arg_aliases={"pattern": ["query", "content_pattern", "regex"], "directory_path": ["path", "directory"]},
+)
+def grep_index_task(pattern, directory_path=".", literal=False, ignore_case=False, max_results=200):
     try:
-        listing = []
-        for root, dirs, files in os.walk(os.path.expanduser(directory_path)):
-            level = root.replace(os.path.expanduser(directory_path), "").count(os.sep)
-            indent = " " * 4 * (level)
-            listing.append(f"{indent}{os.path.basename(root)}/")
-            subindent = " " * 4 * (level + 1)
-            for f in files:
-                listing.append(f"{subindent}{f}")
-        return "\n".join(listing)
+        with TrigramIndex(directory_path) as index:
+            refreshed = index.refresh()
+            results, truncated, candidates = index.search(
+                pattern, literal=bool(literal), ignore_case=bool(ignore_case), max_results=int(max_results or 200)
+            )
+    except re.error as e:
+        return f"Error: Invalid pattern: {e}"
+    except Exception as e:
+        return f"Error searching index: {e}"
+    header = (
+        f"[{refreshed['files']} files indexed, {refreshed['added'] + refreshed['updated']} re-indexed; "
+        f"{candidates} candidates verified]"
+    )
+    if not results:
+        return f"{header}\nNo matches found."
+    lines = [header] + [f"{path}:{line_no}: {line}" for path, line_no, line in results]
+    if truncated:
+        lines.append(f"... (stopped after {len(results)} results; narrow the pattern or raise max_results)")
+    return "\n".join(lines)
+
+
+@tool(
+    "list_directory_recursive",
+    "List the files and directories under a path, depth first. Large trees are returned in pages; "
+    "pass the returned cursor to get the next page.",
+    {
+        "type": "object",
+        "properties": {
+            "directory_path": {"type": "string"},
+            "max_depth": {"type": "integer", "description": "0 lists only the directory itself; -1 (default) is unlimited."},
+            "sort": {"type": "string", "enum": ["name", "size", "mtime"], "description": "Order within each directory."},
+            "details": {"type": "boolean", "description": "Add size and modification time columns."},
+            "max_entries": {"type": "integer", "description": "Entries per page (default 200)."},
+            "cursor": {"type": "string", "description": "Continuation token from a previous page."},
+            "include_ignored": {"type": "boolean", "description": "Also list .git, node_modules, venv and .gitignore'd paths."},
+            "output_format": {"type": "string", "enum": ["text", "json"]},
+        },
+        "required": ["directory_path"],
+    },
+    arg_aliases={
+        "directory_path": ["path", "directory", "folder"],
+        "max_depth": ["depth"],
+        "max_entries": ["limit"],
+        "output_format": ["format"],
+    },
+    names=("list_files",),
+)
+def list_directory_recursive_task(directory_path, max_depth=-1, sort="name", details=False, max_entries=200,
+                                  cursor=None, include_ignored=False, output_format="text"):
+    try:
+        page = dir_listing.list_directory(
+            directory_path, int(max_depth), sort, max(1, int(max_entries)), cursor, bool(include_ignored)
+        )
+        if output_format == "json":
+            return dir_listing.format_json(page)
+        return dir_listing.format_text(page, details)
     except Exception as e:
         return f"Error listing directory: {e}"
 
 
+@tool(
+    "copy_file",
+    "Copy File",
+    {
+        "type": "object",
+        "properties": {
+            "source_path": {"type": "string"},
+            "destination_path": {"type": "string"},
+        },
+        "required": ["source_path", "destination_path"],
+    },
+    arg_aliases={"src": ["source_path", "source"], "dst": ["destination_path", "destination"]},
+    invalidates=("files", "git"),
+)
 def copy_file_task(src, dst):
     try:
-        shutil.copy2(os.path.expanduser(src), os.path.expanduser(dst))
+        [(_, _, _, error)] = bulk_copy.run([{"source": src, "destination": dst}], workers=1)
+        if error:
+            return f"Error copying: {error}"
         return f"Copied {src} to {dst}"
     except Exception as e:
         return f"Error copying: {e}"
 
 
+@tool(
+    "move_file",
+    "Move File",
+    {
+        "type": "object",
+        "properties": {
+            "source_path": {"type": "string"},
+            "destination_path": {"type": "string"},
+        },
+        "required": ["source_path", "destination_path"],
+    },
+    arg_aliases={"src": ["source_path", "source"], "dst": ["destination_path", "destination"]},
+    invalidates=("files", "git"),
+)
 def move_file_task(src, dst):
     try:
-        shutil.move(os.path.expanduser(src), os.path.expanduser(dst))
+        [(_, _, _, error)] = bulk_copy.run([{"source": src, "destination": dst}], move=True, workers=1)
+        if error:
+            return f"Error moving: {error}"
         return f"Moved {src} to {dst}"
     except Exception as e:
         return f"Error moving: {e}"
 
 
+_BATCH_PARAMETERS = {
+    "type": "object",
+    "properties": {
+        "items": {
+            "type": "array",
+            "description": "Pairs to process. A source may be a glob; its matches go into destination. "
+            "A destination that is a directory (or ends with '/') receives the source by name.",
+            "items": {
+                "type": "object",
+                "properties": {"source": {"type": "string"}, "destination": {"type": "string"}},
+                "required": ["source", "destination"],
+            },
+        },
+        "overwrite": {"type": "boolean", "description": "Replace existing destinations (default true)."},
+    },
+    "required": ["items"],
+}
+
+
+@tool(
+    "copy_files",
+    "Copy many files or directories in one call.",
+    _BATCH_PARAMETERS,
+    arg_aliases={"items": ["pairs", "files"]},
+    invalidates=("files", "git"),
+)
+def copy_files_task(items, overwrite=True):
+    try:
+        return bulk_copy.summary(bulk_copy.run(items, overwrite=bool(overwrite)), "Copied")
+    except Exception as e:
+        return f"Error copying: {e}"
+
+
+@tool(
+    "move_files",
+    "Move or rename many files or directories in one call.",
+    _BATCH_PARAMETERS,
+    arg_aliases={"items": ["pairs", "files"]},
+    invalidates=("files", "git"),
+)
+def move_files_task(items, overwrite=True):
+    try:
+        return bulk_copy.summary(bulk_copy.run(items, move=True, overwrite=bool(overwrite)), "Moved")
+    except Exception as e:
+        return f"Error moving: {e}"
+
+
+@tool(
+    "find_files",
+    "Finds files by name (glob) and/or content (regex). Skips ignored paths (.git, node_modules, .gitignore) and binary files; content matches are returned as path:line: text.",
+    {
+        "type": "object",
+        "properties": {
+            "directory_path": {"type": "string"},
+            "name_pattern": {"type": "string", "description": "Glob for file names, e.g. '*.py'."},
+            "content_pattern": {"type": "string", "description": "Regular expression to search for in file contents."},
+            "max_depth": {"type": "integer", "description": "0 searches only the directory itself; -1 (default) is unlimited."},
+            "max_results": {"type": "integer", "description": "Stop after this many results (default 200)."},
+            "ignore_case": {"type": "boolean"},
+        },
+        "required": ["directory_path"],
+    },
+    arg_aliases={"directory_path": ["path", "directory"], "content_pattern": ["pattern", "regex"]},
+)
 def find_files_task(
-    directory_path, name_pattern=None, content_pattern=None, max_depth=-1
+    directory_path, name_pattern=None, content_pattern=None, max_depth=-1, max_results=200, ignore_case=False
 ):
     print(f"Tool: Running find_files_task...")
-    expanded_path = os.path.expanduser(directory_path)
-    found_files = []
     try:
-        for root, _, files in os.walk(expanded_path):
-            for filename in files:
-                if name_pattern and not fnmatch.fnmatch(filename, name_pattern):
-                    continue
-                filepath = os.path.join(root, filename)
-                if content_pattern:
-                    try:
-                        with open(filepath, "r", errors="ignore") as f:
-                            if not re.search(content_pattern, f.read()):
-                                continue
-                    except:
-                        continue
-                found_files.append(filepath)
-        return "\n".join(found_files) if found_files else "No files found."
+        results, truncated = file_search.search(
+            directory_path,
+            content_pattern=content_pattern,
+            name_pattern=name_pattern,
+            max_depth=int(max_depth if max_depth is not None else -1),
+            max_results=int(max_results or 200),
+            ignore_case=bool(ignore_case),
+        )
+    except re.error as e:
+        return f"Error: Invalid content_pattern: {e}"
     except Exception as e:
         return f"Error finding files: {e}"
+    if not results:
+        return "No files found."
+    if content_pattern:
+        lines = [f"{path}:{line_no}: {line}" for path, line_no, line in results]
+    else:
+        lines = list(results)
+    if truncated:
+        lines.append(f"... (stopped after {len(results)} results; narrow the search or raise max_results)")
+    return "\n".join(lines)
 
 
-def compress_path_task(source_path, output_archive_path, format="zip"):
+@tool(
+    "compress_path",
+    "Compress a file or directory into a zip or tar (.tar, .tar.gz, .tar.bz2, .tar.xz) archive. "
+    "Ignored paths such as .git and node_modules are skipped, and a manifest is written next to the archive.",
+    {
+        "type": "object",
+        "properties": {
+            "source_path": {"type": "string"},
+            "output_archive_path": {"type": "string"},
+            "format": {"type": "string", "enum": ["zip", "tar", "gztar", "bztar", "xztar"],
+                       "description": "Defaults to the output path's extension."},
+            "since_manifest": {"type": "string",
+                               "description": "Manifest of an earlier archive; only files changed since then are stored."},
+            "include_ignored": {"type": "boolean"},
+            "level": {"type": "integer", "description": "Compression level, 1 (fast) to 9 (small)."},
+        },
+        "required": ["source_path", "output_archive_path"],
+    },
+    arg_aliases={"source_path": ["source", "path"], "output_archive_path": ["output", "archive_path", "destination"]},
+    invalidates=("files", "git"),
+)
+def compress_path_task(source_path, output_archive_path, format=None, since_manifest=None, include_ignored=False,
+                       level=6):
     try:
-        base_name = os.path.splitext(os.path.expanduser(output_archive_path))[0]
-        shutil.make_archive(
-            base_name,
-            format,
-            root_dir=os.path.dirname(os.path.expanduser(source_path)),
-            base_dir=os.path.basename(os.path.expanduser(source_path)),
+        summary = archiver.create(
+            source_path, output_archive_path, format, int(level),
+            since_manifest=since_manifest, ignore_rules=not include_ignored,
+        )
+        incremental = f", {summary['deleted']} deleted since the manifest" if since_manifest else ""
+        return (
+            f"Compressed {summary['files']} files ({summary['bytes'] / 1e6:.1f} MB) to {output_archive_path} "
+            f"({summary['size'] / 1e6:.1f} MB, {summary['format']}) in {summary['seconds']}s{incremental}. "
+            f"Manifest: {archiver.manifest_path(summary['archive'])}"
         )
-        return f"Compressed to {output_archive_path}"
     except Exception as e:
         return f"Error compressing: {e}"
 
 
+@tool(
+    "decompress_archive",
+    "Extract a zip or tar archive.",
+    {
+        "type": "object",
+        "properties": {
+            "archive_path": {"type": "string"},
+            "destination_path": {"type": "string"},
+        },
+        "required": ["archive_path", "destination_path"],
+    },
+    arg_aliases={"archive_path": ["archive", "path"], "destination_path": ["destination", "output"]},
+    invalidates=("files", "git"),
+)
 def decompress_archive_task(archive_path, destination_path):
     try:
-        shutil.unpack_archive(
-            os.path.expanduser(archive_path), os.path.expanduser(destination_path)
+        summary = archiver.extract(archive_path, destination_path)
+        return (
+            f"Extracted {summary['files']} entries ({summary['bytes'] / 1e6:.1f} MB) to {destination_path} "
+            f"in {summary['seconds']}s"
         )
-        return f"Extracted to {destination_path}"
     except Exception as e:
         return f"Error extracting: {e}"
 
 
+@tool(
+    "open_in_external_editor",
+    "Open Editor",
+    {
+        "type": "object",
+        "properties": {
+            "filepath": {"type": "string"},
+        },
+        "required": ["filepath"],
+    },
+    arg_aliases={"filepath": ["path"]},
+    invalidates=("files", "git"),
+)
 def open_in_external_editor_task(filepath):
     """
     Opens a file in an external editor, trying xdg-open first then termux-open.
@@ -157,255 +493,111 @@ def open_in_external_editor_task(filepath):
     except Exception as e:
         return f"Error opening file: {e}"
 
+@tool(
+    "stat",
+    "Get file or directory status.",
+    {
+        "type": "object",
+        "properties": {
+            "path": {"type": "string"},
+        },
+        "required": ["path"],
+    },
+)
 def stat_task(path):
     """Gets file or directory status."""
     try:
-        return run_command(f"stat {shlex.quote(os.path.expanduser(path))}", shell=True, check_output=True)
+        return native_ops.stat_text(os.path.expanduser(path))
     except Exception as e:
         return f"Error: {e}"
 
+
+@tool(
+    "chmod",
+    "Change file or directory permissions.",
+    {
+        "type": "object",
+        "properties": {
+            "path": {"type": "string"},
+            "mode": {"type": "string"},
+        },
+        "required": ["path", "mode"],
+    },
+    invalidates=("files", "git"),
+)
 def chmod_task(path, mode):
-    """Changes file or directory permissions."""
+    """Changes file or directory permissions (octal or symbolic modes)."""
     try:
-        # Sanitize mode just in case, but run via shell
-        safe_mode = shlex.quote(mode)
-        safe_path = shlex.quote(os.path.expanduser(path))
-        return run_command(f"chmod {safe_mode} {safe_path}", shell=True, check_output=True)
+        new_mode = native_ops.chmod(os.path.expanduser(path), str(mode))
+        return f"Mode of {path} set to {new_mode:04o}"
     except Exception as e:
         return f"Error: {e}"
 
+
+@tool(
+    "save_to_file",
+    "Save content to a file.",
+    {
+        "type": "object",
+        "properties": {
+            "filename": {"type": "string"},
+            "content": {"type": "string"},
+        },
+        "required": ["filename", "content"],
+    },
+    arg_aliases={"filename": ["path", "filepath"], "content": ["data"]},
+    names=("write_file",),
+    invalidates=("files", "git"),
+)
 def save_to_file_task(filename, content):
     """Wrapper for saving to file."""
     return save_to_file(filename, content)
 
-# Aliases for dispatcher compatibility
-list_files = list_directory_recursive_task
-read_file = read_file_task
-write_file = save_to_file_task
-run_command_alias = execute_shell_command
 
-from google.genai import types as genai_types
+@tool(
+    "apply_patch",
+    "Edit one or more files by applying a unified diff or SEARCH/REPLACE blocks instead of rewriting them. "
+    "Either every file is patched or none is.",
+    {
+        "type": "object",
+        "properties": {
+            "patch": {
+                "type": "string",
+                "description": "A unified diff (--- a/path, +++ b/path, @@ hunks), or blocks of: a file path line, "
+                "'<<<<<<< SEARCH', the exact old lines, '=======', the new lines, '>>>>>>> REPLACE'. "
+                "An empty SEARCH part creates the file or appends to it.",
+            },
+            "base_dir": {"type": "string", "description": "Directory the patch paths are relative to."},
+            "dry_run": {"type": "boolean", "description": "Check that the patch applies without writing."},
+        },
+        "required": ["patch"],
+    },
+    arg_aliases={"patch": ["diff", "changes"], "base_dir": ["directory", "cwd"]},
+    names=("patch_files",),
+    invalidates=("files", "git"),
+)
+def apply_patch_task(patch, base_dir=".", dry_run=False):
+    try:
+        changes = patching.apply(patch, base_dir, bool(dry_run))
+    except patching.PatchError as e:
+        return f"Error applying patch (no files were changed): {e}"
+    except Exception as e:
+        return f"Error applying patch: {e}"
+    lines = []
+    for path, original, updated, stats in changes:
+        rel = os.path.relpath(path, os.path.abspath(os.path.expanduser(base_dir)))
+        if updated is None:
+            lines.append(f"  {rel}: deleted")
+            continue
+        state = "created, " if original is None else ""
+        fuzzy = f", {stats['fuzzy']} fuzzy" if stats["fuzzy"] else ""
+        lines.append(f"  {rel}: {state}{stats['hunks']} hunk{'s' if stats['hunks'] != 1 else ''}{fuzzy} (+{stats['added']} -{stats['removed']})")
+    verb = "Patch applies cleanly to" if dry_run else "Patched"
+    return f"{verb} {len(changes)} file(s):\n" + "\n".join(lines)
+
 
 def tool_definitions():
-    return [
-        genai_types.Tool(
-            function_declarations=[
-                # ... existing tools ...
-                genai_types.FunctionDeclaration(
-                    name="list_files",
-                    description="List files in a directory.",
-                    parameters=genai_types.Schema(
-                        type=genai_types.Type.OBJECT,
-                        properties={"path": genai_types.Schema(type=genai_types.Type.STRING)},
-                        required=["path"],
-                    ),
-                ),
-                genai_types.FunctionDeclaration(
-                    name="read_file",
-                    description="Read file content.",
-                    parameters=genai_types.Schema(
-                        type=genai_types.Type.OBJECT,
-                        properties={"path": genai_types.Schema(type=genai_types.Type.STRING)},
-                        required=["path"],
-                    ),
-                ),
-                genai_types.FunctionDeclaration(
-                    name="write_file",
-                    description="Write content to a file.",
-                    parameters=genai_types.Schema(
-                        type=genai_types.Type.OBJECT,
-                        properties={
-                            "path": genai_types.Schema(type=genai_types.Type.STRING),
-                            "content": genai_types.Schema(type=genai_types.Type.STRING),
-                        },
-                        required=["path", "content"],
-                    ),
-                ),
-                genai_types.FunctionDeclaration(
-                    name="run_command",
-                    description="Run a shell command.",
-                    parameters=genai_types.Schema(
-                        type=genai_types.Type.OBJECT,
-                        properties={"command": genai_types.Schema(type=genai_types.Type.STRING)},
-                        required=["command"],
-                    ),
-                ),
-                # ... re-export existing ones if needed, but the prompt focused on these 4
-                genai_types.FunctionDeclaration(
-                genai.types.FunctionDeclaration(
-                    name="lint_python_file",
-                    description="Lint Python",
-                    parameters=genai_types.Schema(
-                        type=genai_types.Type.OBJECT,
-                        properties={"filepath": genai_types.Schema(type=genai_types.Type.STRING)},
-                        required=["filepath"],
-                    ),
-                ),
-                genai.types.FunctionDeclaration(
-                    name="format_code",
-                    description="Format Python",
-                    parameters=genai_types.Schema(
-                        type=genai_types.Type.OBJECT,
-                        properties={"filepath": genai_types.Schema(type=genai_types.Type.STRING)},
-                        required=["filepath"],
-                    ),
-                ),
-                genai.types.FunctionDeclaration(
-                    name="apply_sed",
-                    description="Apply Sed",
-                    parameters=genai_types.Schema(
-                        type=genai_types.Type.OBJECT,
-                        properties={
-                            "filepath": genai_types.Schema(type=genai_types.Type.STRING),
-                            "sed_expression": genai_types.Schema(type=genai_types.Type.STRING),
-                        },
-                        required=["filepath", "sed_expression"],
-                    ),
-                ),
-                genai.types.FunctionDeclaration(
-                    name="create_directory",
-                    description="Create Dir",
-                    parameters=genai_types.Schema(
-                        type=genai_types.Type.OBJECT,
-                        properties={"directory_path": genai_types.Schema(type=genai_types.Type.STRING)},
-                        required=["directory_path"],
-                    ),
-                ),
-                genai_types.FunctionDeclaration(
-                    name="list_directory_recursive",
-                    description="List Dir",
-                    parameters=genai_types.Schema(
-                        type=genai_types.Type.OBJECT,
-                        properties={"directory_path": genai_types.Schema(type=genai_types.Type.STRING)},
-                        required=["directory_path"],
-                    ),
-                ),
-                genai_types.FunctionDeclaration(
-                    name="copy_file",
-                    description="Copy File",
-                    parameters=genai_types.Schema(
-                        type=genai_types.Type.OBJECT,
-                        properties={
-                            "source_path": genai_types.Schema(type=genai_types.Type.STRING),
-                            "destination_path": genai_types.Schema(type=genai_types.Type.STRING),
-                        },
-                        required=["source_path", "destination_path"],
-                    ),
-                ),
-                genai_types.FunctionDeclaration(
-                    name="move_file",
-                    description="Move File",
-                    parameters=genai_types.Schema(
-                        type=genai_types.Type.OBJECT,
-                        properties={
-                            "source_path": genai_types.Schema(type=genai_types.Type.STRING),
-                            "destination_path": genai_types.Schema(type=genai_types.Type.STRING),
-                        },
-                        required=["source_path", "destination_path"],
-                    ),
-                ),
-                genai_types.FunctionDeclaration(
-                    name="find_files",
-                    description="Find Files",
-                    parameters=genai_types.Schema(
-                        type=genai_types.Type.OBJECT,
-                        properties={
-                            "directory_path": genai_types.Schema(type=genai_types.Type.STRING),
-                            "name_pattern": genai_types.Schema(type=genai_types.Type.STRING),
-                            "content_pattern": genai_types.Schema(type=genai_types.Type.STRING),
-                            "max_depth": genai_types.Schema(type=genai_types.Type.INTEGER),
-                        },
-                        required=["directory_path"],
-                    ),
-                ),
-                genai_types.FunctionDeclaration(
-                    name="compress_path",
-                    description="Compress",
-                    parameters=genai_types.Schema(
-                        type=genai_types.Type.OBJECT,
-                        properties={
-                            "source_path": genai_types.Schema(type=genai_types.Type.STRING),
-                            "output_archive_path": genai_types.Schema(type=genai_types.Type.STRING),
-                            "format": genai_types.Schema(type=genai_types.Type.STRING),
-                        },
-                        required=["source_path", "output_archive_path"],
-                    ),
-                ),
-                genai_types.FunctionDeclaration(
-                    name="decompress_archive",
-                    description="Decompress",
-                    parameters=genai_types.Schema(
-                        type=genai_types.Type.OBJECT,
-                        properties={
-                            "archive_path": genai_types.Schema(type=genai_types.Type.STRING),
-                            "destination_path": genai_types.Schema(type=genai_types.Type.STRING),
-                        },
-                        required=["archive_path", "destination_path"],
-                    ),
-                ),
-                genai_types.FunctionDeclaration(
-                    name="open_in_external_editor",
-                    description="Open Editor",
-                    parameters=genai_types.Schema(
-                        type=genai_types.Type.OBJECT,
-                        properties={"filepath": genai_types.Schema(type=genai_types.Type.STRING)},
-                        required=["filepath"],
-                    ),
-                ),
-                genai_types.FunctionDeclaration(
-                    name="stat",
-                    description="Get file or directory status.",
-                    parameters=genai_types.Schema(
-                        type=genai_types.Type.OBJECT,
-                        properties={"path": genai_types.Schema(type=genai_types.Type.STRING)},
-                        required=["path"],
-                    ),
-                ),
-                genai_types.FunctionDeclaration(
-                    name="chmod",
-                    description="Change file or directory permissions.",
-                    parameters=genai_types.Schema(
-                        type=genai_types.Type.OBJECT,
-                        properties={
-                            "path": genai_types.Schema(type=genai_types.Type.STRING),
-                            "mode": genai_types.Schema(type=genai_types.Type.STRING),
-                        },
-                        required=["path", "mode"],
-                    ),
-                ),
-                genai_types.FunctionDeclaration(
-                    name="save_to_file",
-                    description="Save content to a file.",
-                    parameters=genai_types.Schema(
-                        type=genai_types.Type.OBJECT,
-                        properties={
-                            "filename": genai_types.Schema(type=genai_types.Type.STRING),
-                            "content": genai_types.Schema(type=genai_types.Type.STRING),
-                        },
-                        required=["filename", "content"],
-                    ),
-                ),
-            ]
-        )
-    ]
-
-library = {
-    "list_files": list_files,
-    "read_file": read_file,
-    "write_file": write_file,
-    "run_command": run_command_alias,
-    "lint_python_file": lint_python_file_task,
-    "format_code": format_code_task,
-    "apply_sed": apply_sed_task,
-    "create_directory": create_directory_task,
-    "list_directory_recursive": list_directory_recursive_task,
-    "copy_file": copy_file_task,
-    "move_file": move_file_task,
-    "find_files": find_files_task,
-    "compress_path": compress_path_task,
-    "decompress_archive": decompress_archive_task,
-    "open_in_external_editor": open_in_external_editor_task,
-    "stat": stat_task,
-    "chmod": chmod_task,
-    "save_to_file": save_to_file_task,
-}
+    return registry.tool_definitions(__name__)
+
+
+library = registry.library(__name__)
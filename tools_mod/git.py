@@ -1,8 +1,11 @@
-import google.genai as genai
 import shlex
 from utils.commands import run_command
+from utils import tool_cache
+from tools_mod.registry import tool
+from tools_mod import registry
 
 
+@tool("git_status", "Git Status", {"type": "object", "properties": {}}, cache=tool_cache.git(worktree=True, ttl=10))
 def git_status_task():
     return (
         run_command("git status --short", shell=True, check_output=True)
@@ -10,16 +13,47 @@ def git_status_task():
     )
 
 
+@tool(
+    "git_pull",
+    "Git Pull",
+    {
+        "type": "object",
+        "properties": {"branch": {"type": "string"}},
+        "required": [],
+    },
+    invalidates=("files", "git"),
+)
 def git_pull_task(branch="main"):
     sanitized_branch = shlex.quote(branch)
-    return run_command(f"git pull origin {sanitized_branch}", shell=True, check_output=True)
+    return run_command(f"git pull origin {sanitized_branch}", shell=True, check_output=True, interactive=True)
 
 
+@tool(
+    "git_push",
+    "Git Push",
+    {
+        "type": "object",
+        "properties": {"branch": {"type": "string"}},
+        "required": [],
+    },
+    invalidates=("git",),
+)
 def git_push_task(branch="main"):
     sanitized_branch = shlex.quote(branch)
-    return run_command(f"git push origin {sanitized_branch}", shell=True, check_output=True)
+    return run_command(f"git push origin {sanitized_branch}", shell=True, check_output=True, interactive=True)
 
 
+@tool(
+    "git_branch",
+    "Git Branch",
+    {
+        "type": "object",
+        "properties": {"new_branch_name": {"type": "string"}},
+        "required": [],
+    },
+    arg_aliases={"new_branch_name": ["name", "branch"]},
+    invalidates=("files", "git"),
+)
 def git_branch_task(new_branch_name=None):
     if new_branch_name:
         sanitized_name = shlex.quote(new_branch_name)
@@ -28,100 +62,55 @@ def git_branch_task(new_branch_name=None):
         )
     return run_command("git branch", shell=True, check_output=True)
 
+@tool(
+    "git_commit",
+    "Git Commit (adds modified files)",
+    {
+        "type": "object",
+        "properties": {"message": {"type": "string"}},
+        "required": ["message"],
+    },
+    invalidates=("files", "git"),
+)
 def git_commit_task(message):
     sanitized_msg = shlex.quote(message)
     # Uses -am to add modified files automatically.
     return run_command(f"git commit -am {sanitized_msg}", shell=True, check_output=True)
 
+@tool("git_diff", "Git Diff", {"type": "object", "properties": {}}, cache=tool_cache.git(worktree=True, ttl=10))
 def git_diff_task():
     return run_command("git diff", shell=True, check_output=True)
 
+@tool(
+    "git_log",
+    "Git Log",
+    {
+        "type": "object",
+        "properties": {"limit": {"type": "integer"}},
+        "required": [],
+    },
+    cache=tool_cache.git(),
+)
 def git_log_task(limit=5):
     return run_command(f"git log -n {limit}", shell=True, check_output=True)
 
+@tool(
+    "git_add",
+    "Git Add",
+    {
+        "type": "object",
+        "properties": {"files": {"type": "string"}},
+        "required": ["files"],
+    },
+    invalidates=("git",),
+)
 def git_add_task(files):
     sanitized_files = shlex.quote(files)
     return run_command(f"git add {sanitized_files}", shell=True, check_output=True)
 
+
 def tool_definitions():
-    return [
-        genai.types.Tool(
-            function_declarations=[
-                genai.types.FunctionDeclaration(
-                    name="git_status",
-                    description="Git Status",
-                    parameters={"type": "object", "properties": {}},
-                ),
-                genai.types.FunctionDeclaration(
-                    name="git_pull",
-                    description="Git Pull",
-                    parameters={
-                        "type": "object",
-                        "properties": {"branch": {"type": "string"}},
-                        "required": [],
-                    },
-                ),
-                genai.types.FunctionDeclaration(
-                    name="git_push",
-                    description="Git Push",
-                    parameters={
-                        "type": "object",
-                        "properties": {"branch": {"type": "string"}},
-                        "required": [],
-                    },
-                ),
-                genai.types.FunctionDeclaration(
-                    name="git_branch",
-                    description="Git Branch",
-                    parameters={
-                        "type": "object",
-                        "properties": {"new_branch_name": {"type": "string"}},
-                        "required": [],
-                    },
-                ),
-                genai.types.FunctionDeclaration(
-                    name="git_commit",
-                    description="Git Commit (adds modified files)",
-                    parameters={
-                        "type": "object",
-                        "properties": {"message": {"type": "string"}},
-                        "required": ["message"],
-                    },
-                ),
-                genai.types.FunctionDeclaration(
-                    name="git_diff",
-                    description="Git Diff",
-                    parameters={"type": "object", "properties": {}},
-                ),
-                genai.types.FunctionDeclaration(
-                    name="git_log",
-                    description="Git Log",
-                    parameters={
-                        "type": "object",
-                        "properties": {"limit": {"type": "integer"}},
-                        "required": [],
-                    },
-                ),
-                genai.types.FunctionDeclaration(
-                    name="git_add",
-                    description="Git Add",
-                    parameters={
-                        "type": "object",
-                        "properties": {"files": {"type": "string"}},
-                        "required": ["files"],
-                    },
-                ),
-            ]
-        )
-    ]
-
-library = {
-    "git_status": git_status_task,
-    "git_pull": git_pull_task,
-    "git_push": git_push_task,
-    "git_branch": git_branch_task,
-    "git_commit": git_commit_task,
-    "git_diff": git_diff_task,
-    "git_log": git_log_task,
-    "git_add": git_add_task,
-}
+    return registry.tool_definitions(__name__)
+
+
+library = registry.library(__name__)
@@ -0,0 +1,53 @@
+from utils import jobs
+from tools_mod.registry import tool
+from tools_mod import registry
+
+
+@tool(
+    "job_status",
+    "Shows the progress of a background learning job, or lists recent jobs when no id is given.",
+    {
+        "type": "object",
+        "properties": {
+            "job_id": {"type": "string", "description": "The id returned when the job was started."},
+        },
+    },
+    arg_aliases={"job_id": ["id", "job"]},
+)
+def job_status_task(job_id=None):
+    manager = jobs.get_manager()
+    if job_id:
+        job = manager.jobs.get(job_id)
+        return job.describe(full=True) if job else f"Error: no job with id {job_id}"
+    listed = manager.list()
+    if not listed:
+        return "No background jobs."
+    return "\n".join(job.describe() for job in listed[:20])
+
+
+@tool(
+    "job_cancel",
+    "Cancels a queued or running background learning job. Sources it already learned are kept, "
+    "and starting the same job again resumes it.",
+    {
+        "type": "object",
+        "properties": {"job_id": {"type": "string"}},
+        "required": ["job_id"],
+    },
+    arg_aliases={"job_id": ["id", "job"]},
+)
+def job_cancel_task(job_id):
+    try:
+        job = jobs.get_manager().cancel(job_id)
+    except KeyError:
+        return f"Error: no job with id {job_id}"
+    if job.status in jobs.ACTIVE:
+        return f"Cancelling job {job_id}; it stops at its next checkpoint."
+    return f"Job {job_id} is {job.status}."
+
+
+def tool_definitions():
+    return registry.tool_definitions(__name__)
+
+
+library = registry.library(__name__)
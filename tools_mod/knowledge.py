@@ -1,4 +1,5 @@
-import google.genai as genai
+from tools_mod.registry import tool
+from tools_mod import registry
 from utils.database import (
     get_available_metadata_sources,
     search_and_delete_knowledge,
@@ -7,6 +8,7 @@ from utils.database import (
     get_collection_count
 )
 
+@tool("list_knowledge", "Lists available knowledge sources and statistics.", {"type": "object", "properties": {}})
 def list_knowledge_task():
     """Lists available knowledge sources and statistics."""
     sources = get_available_metadata_sources()
@@ -16,22 +18,81 @@ def list_knowledge_task():
 
     return f"Knowledge Base Stats:\nTotal Documents: {count}\nSources:\n" + "\n".join([f"- {s}" for s in sources])
 
+@tool(
+    "delete_knowledge",
+    "Deletes knowledge entries matching a query.",
+    {
+        "type": "object",
+        "properties": {"query": {"type": "string"}},
+        "required": ["query"],
+    },
+)
 def delete_knowledge_task(query):
     """Deletes knowledge entries matching the query."""
     return search_and_delete_knowledge(query)
 
-def search_knowledge_task(query):
+@tool(
+    "search_knowledge",
+    "Searches the knowledge base for relevant content. Code learned from Python files is "
+    "chunked per function/class; filter by symbol, kind or source to narrow the results.",
+    {
+        "type": "object",
+        "properties": {
+            "query": {"type": "string"},
+            "symbol": {
+                "type": "string",
+                "description": "Only chunks for this symbol name or qualified name (e.g. 'Report.add').",
+            },
+            "kind": {
+                "type": "string",
+                "enum": ["module", "class", "function", "method"],
+                "description": "Only chunks of this kind of definition.",
+            },
+            "source": {"type": "string", "description": "Only chunks learned from this file path or URL."},
+        },
+        "required": ["query"],
+    },
+    arg_aliases={"symbol": ["symbol_name", "qualname"], "source": ["path", "file"]},
+)
+def search_knowledge_task(query, symbol=None, kind=None, source=None):
     """Searches the knowledge base."""
-    results = query_embeddings(query)
-    if not results or not results['documents']:
+    filters = []
+    if symbol:
+        filters.append({"$or": [{"symbol": symbol}, {"qualname": symbol}]})
+    if kind:
+        filters.append({"kind": kind})
+    if source:
+        filters.append({"source": source})
+    where = filters[0] if len(filters) == 1 else ({"$and": filters} if filters else None)
+    results = query_embeddings(query, where=where)
+    if not results or not results['documents'] or not results['documents'][0]:
         return "No results found."
 
     output = []
     for i, doc in enumerate(results['documents'][0]):
         meta = results['metadatas'][0][i] if results['metadatas'] else {}
-        output.append(f"Source: {meta.get('source', 'Unknown')}\nContent: {doc[:200]}...")
+        location = meta.get('source', 'Unknown')
+        if meta.get('start_line'):
+            location += f":{meta['start_line']}-{meta.get('end_line', meta['start_line'])}"
+        if meta.get('qualname'):
+            location += f" ({meta.get('kind', 'symbol')} {meta['qualname']})"
+        output.append(f"Source: {location}\nContent: {doc[:200]}...")
     return "\n---\n".join(output)
 
+@tool(
+    "clear_knowledge",
+    "Clears the entire knowledge base.",
+    {
+        "type": "object",
+        "properties": {
+            "confirm": {
+                "type": "boolean",
+                "description": "Must be set to True to execute this destructive action."
+            }
+        },
+        "required": ["confirm"],
+    },
+)
 def clear_knowledge_task(confirm=False):
     """Clears all knowledge (Dangerous). Requires explicit confirmation."""
     if not confirm:
@@ -40,54 +101,9 @@ def clear_knowledge_task(confirm=False):
     delete_embeddings("agent_learning")
     return "Knowledge base cleared."
 
+
 def tool_definitions():
-    return [
-        genai.types.Tool(
-            function_declarations=[
-                genai.types.FunctionDeclaration(
-                    name="list_knowledge",
-                    description="Lists available knowledge sources and statistics.",
-                    parameters={"type": "object", "properties": {}},
-                ),
-                genai.types.FunctionDeclaration(
-                    name="delete_knowledge",
-                    description="Deletes knowledge entries matching a query.",
-                    parameters={
-                        "type": "object",
-                        "properties": {"query": {"type": "string"}},
-                        "required": ["query"],
-                    },
-                ),
-                genai.types.FunctionDeclaration(
-                    name="search_knowledge",
-                    description="Searches the knowledge base for relevant content.",
-                    parameters={
-                        "type": "object",
-                        "properties": {"query": {"type": "string"}},
-                        "required": ["query"],
-                    },
-                ),
-                genai.types.FunctionDeclaration(
-                    name="clear_knowledge",
-                    description="Clears the entire knowledge base.",
-                    parameters={
-                        "type": "object",
-                        "properties": {
-                            "confirm": {
-                                "type": "boolean",
-                                "description": "Must be set to True to execute this destructive action."
-                            }
-                        },
-                        "required": ["confirm"],
-                    },
-                ),
-            ]
-        )
-    ]
+    return registry.tool_definitions(__name__)
+
 
-library = {
-    "list_knowledge": list_knowledge_task,
-    "delete_knowledge": delete_knowledge_task,
-    "search_knowledge": search_knowledge_task,
-    "clear_knowledge": clear_knowledge_task,
-}
+library = registry.library(__name__)
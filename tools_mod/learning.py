@@ -1,112 +1,107 @@
+from tools_mod.registry import tool
+from tools_mod import registry
+from utils import repo_learning, jobs
+from utils.learning import learn_directory, learn_url, is_valid_url
 import os
-import subprocess
-import fnmatch
-from google.genai import types as genai_types
-from utils.database import store_embedding, store_embeddings
-import config
-from utils.learning import learn_directory, learn_url
 import logging
 
 logger = logging.getLogger(__name__)
 
-def _get_ignored_patterns():
-    """Helper to read patterns from .gitignore and config."""
-    ignored = set(config.PROJECT_CONTEXT_IGNORE)
+jobs.register("learn_repo", lambda path, full, **pipeline: repo_learning.learn_repo(
+    path, full=full, collection_name="agent_learning", **pipeline
+))
+jobs.register("learn_directory", learn_directory)
+jobs.register("learn_url", learn_url)
+
+BACKGROUND = {
+    "type": "boolean",
+    "description": "Run as a background job and return its id at once (see job_status/job_cancel).",
+}
+
+
+def _start(kind, **params):
     try:
-        # Find the repo root
-        repo_root = subprocess.check_output(["git", "rev-parse", "--show-toplevel"]).strip().decode('utf-8')
-        gitignore_path = os.path.join(repo_root, ".gitignore")
-        with open(gitignore_path, "r") as f:
-            for line in f:
-                line = line.strip()
-                if line and not line.startswith("#"):
-                    ignored.add(line)
-    except (subprocess.CalledProcessError, FileNotFoundError) as e:
-        logger.error(f"Error getting .gitignore: {e}", exc_info=True)
-        pass  # No .gitignore or not a git repo, no problem
-    return ignored
+        job, how = jobs.submit(kind, **params)
+    except Exception as e:
+        return f"Error starting {kind} job: {e}"
+    if how.startswith("already"):
+        return f"Job {job.id} ({kind}) is {how}. Use job_status to follow it."
+    note = f", skipping {job.checkpointed} sources learned before it stopped" if how == "resumed" else ""
+    return f"{how.capitalize()} job {job.id} ({kind}){note}. Use job_status to follow it or job_cancel to stop it."
 
-def learn_repo_task():
+@tool(
+    "learn_repo",
+    "Learn the entire repository by embedding its files. Later runs only re-learn files changed "
+    "since the last learned commit (plus uncommitted changes) and forget deleted ones.",
+    {
+        "type": "object",
+        "properties": {
+            "full": {"type": "boolean", "description": "Re-learn every file instead of only the changes."},
+            "background": dict(BACKGROUND, description=BACKGROUND["description"] + " Default true."),
+        },
+    },
+    names=("learn_repo_task",),
+)
+def learn_repo_task(full=False, background=True):
     """
-    Reads all files in the repository, respects .gitignore and PROJECT_CONTEXT_IGNORE,
-    and stores their content as embeddings in ChromaDB.
+    Learns the repository's tracked files, respecting .gitignore and
+    PROJECT_CONTEXT_IGNORE, incrementally from the last learned commit.
     """
-    ignored_patterns = _get_ignored_patterns()
-
-    # Use git to list all files, which respects .gitignore
+    if background:
+        return _start("learn_repo", path=os.getcwd(), full=full)
     try:
-        files = subprocess.check_output(["git", "ls-files"]).decode("utf-8").splitlines()
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        # Fallback to os.walk if git is not available or not a git repo
-        files = []
-        for root, _, filenames in os.walk("."):
-            for filename in filenames:
-                files.append(os.path.join(root, filename))
-
-    texts = []
-    metadatas = []
-    for filepath in files:
-        # Extra check for patterns not in .gitignore
-        if any(fnmatch.fnmatch(filepath, p) for p in ignored_patterns if p != ""):
-            continue
+        return repo_learning.learn_repo(".", full=full, collection_name="agent_learning")
+    except Exception as e:
+        return f"Error learning repository: {e}"
 
-        try:
-            with open(filepath, "r", errors="ignore") as f:
-                content = f.read()
-
-            # We use the filepath as 'source' metadata
-            metadatas.append({"source": filepath})
-            texts.append(content)
-        except FileNotFoundError:
-            logger.error(f"File not found: {filepath}", exc_info=True)
-        except PermissionError:
-            logger.error(f"Permission denied for file: {filepath}", exc_info=True)
-        except UnicodeDecodeError:
-            logger.error(f"Unicode decode error for file: {filepath}", exc_info=True)
-        except Exception as e:
-            logger.exception(f"An unexpected error occurred while processing {filepath}: {e}")
+@tool(
+    "learn_directory",
+    "Learn a directory by embedding its files.",
+    {
+        "type": "object",
+        "properties": {
+            "path": {"type": "string"},
+            "background": dict(BACKGROUND, description=BACKGROUND["description"] + " Default true."),
+        },
+        "required": ["path"],
+    },
+    arg_aliases={"path": ["directory_path", "directory"]},
+)
+def learn_directory_task(path, background=True):
+    if background:
+        path = os.path.abspath(os.path.expanduser(path))
+        if not os.path.isdir(path):
+            return f"Path is not a valid directory: {path}"
+        return _start("learn_directory", path=path)
+    return learn_directory(path)
 
-    if texts:
-        store_embeddings(texts, metadatas, collection_name="agent_learning")
+@tool(
+    "learn_url",
+    "Learn a URL by embedding its content. With crawl=true, also learns the pages it links to "
+    "(breadth first, same host by default); re-crawls only re-learn pages that changed.",
+    {
+        "type": "object",
+        "properties": {
+            "url": {"type": "string"},
+            "crawl": {"type": "boolean", "description": "Follow links from the page. Default false."},
+            "max_depth": {"type": "integer", "description": "Link levels to follow when crawling. Default 2."},
+            "max_pages": {"type": "integer", "description": "Maximum pages to fetch when crawling. Default 50."},
+            "same_host": {"type": "boolean", "description": "Only follow links to the URL's host. Default true."},
+            "background": dict(BACKGROUND, description=BACKGROUND["description"] + " Default: same as crawl."),
+        },
+        "required": ["url"],
+    },
+    arg_aliases={"max_depth": ["depth"], "max_pages": ["limit", "page_limit"]},
+)
+def learn_url_task(url, crawl=False, max_depth=None, max_pages=None, same_host=True, background=None):
+    if (crawl if background is None else background) and is_valid_url(url):
+        return _start("learn_url", url=url, crawl=crawl, max_depth=max_depth, max_pages=max_pages,
+                      same_host=same_host)
+    return learn_url(url, crawl=crawl, max_depth=max_depth, max_pages=max_pages, same_host=same_host)
 
-    return f"Successfully stored content from {len(texts)} files in the 'agent_learning' collection."
 
-def learn_directory_task(path):
-    return learn_directory(path)
+def tool_definitions():
+    return registry.tool_definitions(__name__)
 
-def learn_url_task(url):
-    return learn_url(url)
 
-def tool_definitions():
-    return [
-        genai_types.Tool(
-            function_declarations=[
-                genai_types.FunctionDeclaration(
-                    name="learn_repo",
-                    description="Learn the entire repository by embedding its files.",
-                    parameters=genai_types.Schema(
-                        type=genai_types.Type.OBJECT,
-                        properties={}, # No parameters
-                    ),
-                ),
-                genai_types.FunctionDeclaration(
-                    name="learn_directory",
-                    description="Learn a directory by embedding its files.",
-                    parameters=genai_types.Schema(
-                        type=genai_types.Type.OBJECT,
-                        properties={"path": genai_types.Schema(type=genai_types.Type.STRING)},
-                        required=["path"],
-                    ),
-                ),
-                genai_types.FunctionDeclaration(
-                    name="learn_url",
-                    description="Learn a URL by embedding its content.",
-                    parameters=genai_types.Schema(
-                        type=genai_types.Type.OBJECT,
-                        properties={"url": genai_types.Schema(type=genai_types.Type.STRING)},
-                        required=["url"],
-                    ),
-                ),
-            ]
-        )
-    ]
+library = registry.library(__name__)
@@ -1,44 +1,67 @@
 import sys
-from utils.database import get_relevant_history, search_and_delete_history
+from utils.database import get_relevant_history, get_relevant_context, search_and_delete_history
+from tools_mod.registry import tool
+from tools_mod import registry
 
-def tool_definitions():
-    return [
-        {
-            "name": "query_memory",
-            "description": "Retrieve relevant past conversation history based on a query.",
-            "parameters": {
-                "type": "OBJECT",
-                "properties": {
-                    "query": {"type": "STRING", "description": "The search term for past conversations"}
-                },
-                "required": ["query"]
-            }
+
+@tool(
+    "query_memory",
+    "Retrieve relevant past conversation history based on a query.",
+    {
+        "type": "OBJECT",
+        "properties": {
+            "query": {"type": "STRING", "description": "The search term for past conversations"}
+        },
+        "required": ["query"]
+    },
+)
+def query_memory_task(query):
+    results = get_relevant_history(query)
+    return results if results else "No relevant memories found."
+
+
+@tool(
+    "delete_memory_entry",
+    "Delete specific entries from the conversation history.",
+    {
+        "type": "OBJECT",
+        "properties": {
+            "query": {"type": "STRING", "description": "Search term to identify entries to delete"}
+        },
+        "required": ["query"]
+    },
+)
+def delete_memory_entry_task(query):
+    return search_and_delete_history(query)
+
+
+@tool(
+    "get_relevant_context",
+    "Retrieve stored context relevant to a query.",
+    {
+        "type": "OBJECT",
+        "properties": {
+            "query": {"type": "STRING", "description": "What to look up"}
         },
-        {
-            "name": "delete_memory_entry",
-            "description": "Delete specific entries from the conversation history.",
-            "parameters": {
-                "type": "OBJECT",
-                "properties": {
-                    "query": {"type": "STRING", "description": "Search term to identify entries to delete"}
-                },
-                "required": ["query"]
-            }
-        }
-    ]
+        "required": ["query"]
+    },
+)
+def get_relevant_context_task(query):
+    return get_relevant_context(query) or "No relevant context found."
+
+
+def tool_definitions():
+    return registry.tool_definitions(__name__)
+
+
+library = registry.library(__name__)
+
 
 def execute_memory_tool(name, args):
     """
     REQUIRED BY tools_mod/__init__.py
     Executes memory-specific operations.
     """
-    if name == "query_memory":
-        query = args.get("query")
-        results = get_relevant_history(query)
-        return results if results else "No relevant memories found."
-        
-    elif name == "delete_memory_entry":
-        query = args.get("query")
-        return search_and_delete_history(query)
-        
-    return f"Memory tool '{name}' not recognized."
\ No newline at end of file
+    if name in library:
+        return registry.dispatch(name, args)
+    return f"Memory tool '{name}' not recognized."
@@ -1,8 +1,24 @@
-import google.genai as genai
 import requests
 from config import HF_API_TOKEN
+from tools_mod.registry import tool
+from tools_mod import registry
 
 
+@tool(
+    "huggingface_sentence_similarity",
+    "Calculates sentence similarity using the Hugging Face Inference API.",
+    {
+        "type": "object",
+        "properties": {
+            "source_sentence": {"type": "string"},
+            "sentences_to_compare": {
+                "type": "array",
+                "items": {"type": "string"},
+            },
+        },
+        "required": ["source_sentence", "sentences_to_compare"],
+    },
+)
 def huggingface_sentence_similarity(source_sentence, sentences_to_compare):
     """
     Calculates sentence similarity using the Hugging Face Inference API.
@@ -49,28 +65,7 @@ def huggingface_sentence_similarity(source_sentence, sentences_to_compare):
 
 
 def tool_definitions():
-    return [
-        genai.types.Tool(
-            function_declarations=[
-                genai.types.FunctionDeclaration(
-                    name="huggingface_sentence_similarity",
-                    description="Calculates sentence similarity using the Hugging Face Inference API.",
-                    parameters={
-                        "type": "object",
-                        "properties": {
-                            "source_sentence": {"type": "string"},
-                            "sentences_to_compare": {
-                                "type": "array",
-                                "items": {"type": "string"},
-                            },
-                        },
-                        "required": ["source_sentence", "sentences_to_compare"],
-                    },
-                )
-            ]
-        )
-    ]
+    return registry.tool_definitions(__name__)
 
-library = {
-    "huggingface_sentence_similarity": huggingface_sentence_similarity,
-}
+
+library = registry.library(__name__)
@@ -0,0 +1,98 @@
+import os
+import re
+import sys
+import logging
+import threading
+from . import registry
+
+logger = logging.getLogger(__name__)
+
+# Runtime loader for tool modules. discover() finds the modules in tools_mod/
+# that declare tools; refresh() imports new ones and reloads changed ones,
+# swapping their tools into the live registry without a restart. It only
+# stats the directory when nothing changed, so the agent calls it every step.
+PACKAGE = __name__.rpartition(".")[0]
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+_TOOL_MARKER = re.compile(rb"^(?:@tool\(|library\s*=|registry\.register\()", re.M)
+
+_lock = threading.Lock()
+# module name -> (mtime_ns, size, declares_tools) of the source last seen
+_seen = {}
+
+
+def _scan():
+    """Yields (module name, path, stat signature) for every module in TOOLS_DIR."""
+    with os.scandir(TOOLS_DIR) as entries:
+        for entry in entries:
+            if not entry.name.endswith(".py") or entry.name.startswith("_"):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            yield f"{PACKAGE}.{entry.name[:-3]}", entry.path, (st.st_mtime_ns, st.st_size)
+
+
+def _declares_tools(path):
+    try:
+        with open(path, "rb") as f:
+            return bool(_TOOL_MARKER.search(f.read()))
+    except OSError:
+        return False
+
+
+def discover():
+    """Sorted names of the tool modules in tools_mod/, recording their current state."""
+    modules = []
+    with _lock:
+        for module_name, path, signature in _scan():
+            seen = _seen.get(module_name)
+            if seen is None or seen[:2] != signature:
+                seen = signature + (_declares_tools(path),)
+                _seen[module_name] = seen
+            if seen[2]:
+                modules.append(module_name)
+    return sorted(modules)
+
+
+def refresh():
+    """
+    Imports tool modules added since the last call and reloads changed ones.
+    Returns {"added": [...], "reloaded": [...], "failed": {module: error}}.
+    """
+    report = {"added": [], "reloaded": [], "failed": {}}
+    with _lock:
+        changed = []
+        for module_name, path, signature in _scan():
+            seen = _seen.get(module_name)
+            if seen is not None and seen[:2] == signature:
+                continue
+            declares = _declares_tools(path)
+            _seen[module_name] = signature + (declares,)
+            if declares:
+                changed.append((module_name, seen is None))
+
+    for module_name, is_new in sorted(changed):
+        try:
+            if module_name in sys.modules:
+                registry.reload_module(module_name)
+                report["reloaded"].append(module_name)
+            else:
+                # New modules, and changed ones still only known from the manifest
+                registry.import_module(module_name)
+                report["added" if is_new else "reloaded"].append(module_name)
+        except Exception as e:
+            logger.warning(f"Could not load tool module {module_name}: {e}")
+            report["failed"][module_name] = f"{type(e).__name__}: {e}"
+    return report
+
+
+def format_report(report):
+    lines = []
+    for module_name in report["added"]:
+        lines.append(f"🔌 Loaded tool module {module_name}")
+    for module_name in report["reloaded"]:
+        lines.append(f"🔄 Reloaded tool module {module_name}")
+    for module_name, error in report["failed"].items():
+        lines.append(f"❌ Could not load {module_name}: {error}")
+    return "\n".join(lines)
@@ -0,0 +1,390 @@
+import os
+import sys
+import json
+import hashlib
+import logging
+import importlib
+import importlib.util
+import threading
+import contextlib
+from utils import tracing, tool_cache
+
+logger = logging.getLogger(__name__)
+
+# Single name -> ToolSpec table shared by both dispatchers.
+# Tool modules register their functions with @tool at import time, so a
+# dispatch is one dict lookup plus argument normalization.
+_tools = {}
+_aliases = {}
+_definitions_cache = None
+
+# Declarations of tools whose module has not been imported yet, loaded from
+# MANIFEST_PATH. The module is imported on the first dispatch of one of them.
+MANIFEST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tool_manifest.json")
+MANIFEST_VERSION = 2
+_manifest = {}
+_manifest_aliases = {}
+
+# While a module is being reloaded its registrations are staged here and
+# swapped into the live table in one step once the reload succeeded.
+_lock = threading.RLock()
+_staging = None
+
+# Every tool accepts this; execute_tool pops it before dispatch
+# (supervisor.pop_timeout) and uses it as the call's deadline.
+TIMEOUT_PARAMETER = {
+    "type": "number",
+    "description": "Optional deadline for this call in seconds, overriding the tool's default. 0 disables it.",
+}
+
+
+class ToolSpec:
+    def __init__(self, name, func, description="", parameters=None, arg_aliases=None, module=None,
+                 cache=None, invalidates=()):
+        self.name = name
+        self.func = func
+        # tool_cache.Policy for idempotent tools, scopes dropped by mutating ones
+        self.cache = cache
+        self.invalidates = tuple(invalidates or ())
+        self.description = description
+        self.parameters = parameters or {"type": "object", "properties": {}}
+        self.module = module or func.__module__
+        # alternative argument name -> canonical parameter name
+        self.arg_aliases = {}
+        for canonical, alternatives in (arg_aliases or {}).items():
+            for alternative in alternatives:
+                self.arg_aliases[alternative] = canonical
+
+    def declaration(self):
+        properties = dict(self.parameters.get("properties", {}))
+        properties.setdefault("timeout_seconds", TIMEOUT_PARAMETER)
+        parameters = dict(self.parameters, properties=properties)
+        return {"name": self.name, "description": self.description, "parameters": parameters}
+
+    def manifest_entry(self, names=()):
+        arg_aliases = {}
+        for alternative, canonical in self.arg_aliases.items():
+            arg_aliases.setdefault(canonical, []).append(alternative)
+        entry = self.declaration()
+        entry.update({"module": self.module, "arg_aliases": arg_aliases, "names": list(names)})
+        return entry
+
+    def normalize(self, args):
+        """Maps the argument names models tend to guess onto the declared ones."""
+        if not args:
+            return {}
+        if not self.arg_aliases:
+            return dict(args)
+        normalized = {}
+        for key, value in args.items():
+            canonical = self.arg_aliases.get(key, key)
+            # An explicitly named canonical argument wins over an alias.
+            if canonical != key and canonical in args:
+                continue
+            normalized[canonical] = value
+        return normalized
+
+    def missing_arguments(self, normalized):
+        return [
+            name for name in self.parameters.get("required", [])
+            if name not in normalized and self.arg_aliases.get(name) not in normalized
+        ]
+
+    def __call__(self, args=None):
+        normalized = self.normalize(args)
+        missing = self.missing_arguments(normalized)
+        if missing:
+            return f"Error: '{missing[0]}' parameter is required for {self.name}."
+        if self.cache is not None:
+            return tool_cache.call(self, normalized)
+        try:
+            return self.func(**normalized)
+        finally:
+            tool_cache.invalidate(self.invalidates)
+
+
+def _invalidate():
+    global _definitions_cache
+    _definitions_cache = None
+
+
+def register(name, func, description="", parameters=None, arg_aliases=None, names=(), module=None,
+             cache=None, invalidates=()):
+    """Adds (or replaces) a tool. `names` are extra tool names that resolve to it."""
+    spec = ToolSpec(name, func, description, parameters, arg_aliases, module, cache, invalidates)
+    staging = _staging
+    if staging is not None and staging["module"] == spec.module:
+        staging["tools"][name] = spec
+        staging["aliases"].update((alias, name) for alias in names)
+        return spec
+    with _lock:
+        _tools[name] = spec
+        for alias in names:
+            _aliases[alias] = name
+        _invalidate()
+    return spec
+
+
+def tool(name, description="", parameters=None, arg_aliases=None, names=(), cache=None, invalidates=()):
+    """
+    Decorator registering the function as the tool `name`.
+    `cache` (a utils.tool_cache policy) memoizes an idempotent tool;
+    `invalidates` lists the cache scopes a mutating tool makes stale.
+    """
+    def decorator(func):
+        register(name, func, description, parameters, arg_aliases, names, cache=cache, invalidates=invalidates)
+        return func
+    return decorator
+
+
+def unregister_module(module_name):
+    """Drops every tool registered by `module_name`."""
+    with _lock:
+        for name in [n for n, spec in _tools.items() if spec.module == module_name]:
+            del _tools[name]
+        for alias in [a for a, target in _aliases.items() if target not in _tools]:
+            del _aliases[alias]
+        _invalidate()
+
+
+def register_module(module):
+    """
+    Registers a module that follows the older `library` + `tool_definitions()`
+    convention (e.g. tools written by create_new_tool). Returns the names added.
+    """
+    library = getattr(module, "library", None)
+    if not isinstance(library, dict):
+        return []
+    current = _module_specs(module.__name__)
+    pending = {
+        name: func for name, func in library.items()
+        if not (name in current and current[name].func is func)
+    }
+    if not pending:
+        return []
+    declarations = {}
+    definitions = getattr(module, "tool_definitions", None)
+    if callable(definitions):
+        try:
+            for decl in _flatten_declarations(definitions()):
+                declarations[decl["name"]] = decl
+        except Exception as e:
+            logger.warning(f"Could not read tool_definitions() of {module.__name__}: {e}")
+    added = []
+    for name, func in pending.items():
+        decl = declarations.get(name, {})
+        register(name, func, decl.get("description", ""), decl.get("parameters"), module=module.__name__)
+        added.append(name)
+    return added
+
+
+def _flatten_declarations(definitions):
+    """Turns a list of genai Tools / FunctionDeclarations / dicts into plain dicts."""
+    for item in definitions or []:
+        if isinstance(item, dict):
+            yield item
+            continue
+        declarations = getattr(item, "function_declarations", None)
+        for decl in declarations if declarations is not None else [item]:
+            if hasattr(decl, "model_dump"):
+                yield decl.model_dump(mode="json", exclude_none=True)
+            elif getattr(decl, "name", None):
+                yield {"name": decl.name, "description": getattr(decl, "description", "")}
+
+
+def get(name):
+    """Returns the ToolSpec for `name` (or one of its alternative names), or None."""
+    spec = _tools.get(name)
+    if spec is None and name in _aliases:
+        spec = _tools.get(_aliases[name])
+    if spec is None:
+        canonical = _manifest_aliases.get(name, name)
+        if canonical in _manifest:
+            import_module(_manifest[canonical]["module"])
+            return _tools.get(canonical)
+        # Pick up tool modules imported after load (e.g. via tool_creator).
+        for module_name, module in list(sys.modules.items()):
+            if module_name.startswith("tools_mod.") and module is not None:
+                library = getattr(module, "library", None)
+                if isinstance(library, dict) and name in library:
+                    register_module(module)
+                    return _tools.get(name)
+    return spec
+
+
+def dispatch(name, args=None):
+    spec = get(name)
+    if spec is None:
+        return f"Tool {name} not found."
+    return spec(args)
+
+
+def _module_specs(module):
+    """The specs registered by `module`, including ones staged by a running reload."""
+    staging = _staging
+    if staging is not None and staging["module"] == module:
+        return dict(staging["tools"])
+    return {name: spec for name, spec in _tools.items() if spec.module == module}
+
+
+def tool_names():
+    return list(_tools) + [name for name in _manifest if name not in _tools]
+
+
+def declarations(module=None):
+    if module is not None:
+        return [spec.declaration() for spec in _module_specs(module).values()]
+    decls = [spec.declaration() for spec in _tools.values()]
+    decls.extend(
+        {"name": name, "description": entry["description"], "parameters": entry["parameters"]}
+        for name, entry in _manifest.items()
+        if name not in _tools
+    )
+    return decls
+
+
+def library(module):
+    """The classic `library` dict for one module, derived from the registry."""
+    return {name: spec.func for name, spec in _module_specs(module).items()}
+
+
+def _build_tools(decls):
+    from google.genai import types as genai_types
+
+    return [
+        genai_types.Tool(
+            function_declarations=[genai_types.FunctionDeclaration(**decl) for decl in decls]
+        )
+    ]
+
+
+def tool_definitions(module=None):
+    """genai Tool list for one module or, cached, for every registered tool."""
+    global _definitions_cache
+    if module is not None:
+        return _build_tools(declarations(module))
+    if _definitions_cache is None:
+        _definitions_cache = _build_tools(declarations())
+    return _definitions_cache
+
+
+def import_module(module_name):
+    """Imports a tool module and moves its tools from the manifest into the live table."""
+    with tracing.span(module_name, category="import"):
+        module = importlib.import_module(module_name)
+    register_module(module)
+    for name in [n for n, entry in _manifest.items() if entry["module"] == module_name]:
+        del _manifest[name]
+    for alias in [a for a, target in _manifest_aliases.items() if target not in _manifest]:
+        del _manifest_aliases[alias]
+    return module
+
+
+def _source_hash(module_name):
+    spec = importlib.util.find_spec(module_name)
+    if spec is None or not spec.origin or not os.path.isfile(spec.origin):
+        return None
+    with open(spec.origin, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def build_manifest(module_names):
+    """Imports every module and returns the manifest describing their tools."""
+    for module_name in module_names:
+        import_module(module_name)
+    names_by_tool = {}
+    for alias, target in _aliases.items():
+        names_by_tool.setdefault(target, []).append(alias)
+    return {
+        "version": MANIFEST_VERSION,
+        "modules": {module_name: _source_hash(module_name) for module_name in module_names},
+        "tools": [
+            spec.manifest_entry(names_by_tool.get(spec.name, ()))
+            for spec in _tools.values()
+            if spec.module in module_names
+        ],
+    }
+
+
+def write_manifest(module_names, path=MANIFEST_PATH):
+    manifest = build_manifest(module_names)
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+            f.write("\n")
+    except OSError as e:
+        logger.warning(f"Could not write tool manifest {path}: {e}")
+    return manifest
+
+
+def load_manifest(module_names, path=MANIFEST_PATH):
+    """
+    Advertises the tools in the manifest without importing their modules.
+    Returns False (loading nothing) if the manifest is missing or does not
+    match the current source of `module_names`.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+    modules = manifest.get("modules", {})
+    if manifest.get("version") != MANIFEST_VERSION or sorted(modules) != sorted(module_names):
+        return False
+    for module_name, digest in modules.items():
+        if module_name not in sys.modules and _source_hash(module_name) != digest:
+            return False
+
+    for entry in manifest.get("tools", []):
+        if entry["module"] in sys.modules or entry["name"] in _tools:
+            continue
+        _manifest[entry["name"]] = entry
+        for alias in entry.get("names", []):
+            _manifest_aliases[alias] = entry["name"]
+    _invalidate()
+    return True
+
+
+def _drop_bytecode(module):
+    # The .pyc check only compares mtime seconds and size, so an edit made
+    # within the same second could otherwise reload the old code.
+    origin = getattr(module, "__file__", None)
+    if not origin or not origin.endswith(".py"):
+        return
+    try:
+        os.remove(importlib.util.cache_from_source(origin))
+    except OSError:
+        pass
+
+
+@contextlib.contextmanager
+def _staged(module_name):
+    global _staging
+    with _lock:
+        _staging = {"module": module_name, "tools": {}, "aliases": {}}
+        try:
+            yield _staging
+        finally:
+            _staging = None
+
+
+def reload_module(module_name):
+    """
+    Re-executes an imported tool module and atomically replaces its tools.
+    If the reload raises, the previously registered tools stay in place.
+    """
+    with _lock:
+        module = sys.modules[module_name]
+        _drop_bytecode(module)
+        with tracing.span(module_name, category="reload"), _staged(module_name) as staged:
+            module = importlib.reload(module)
+            register_module(module)
+        for name in [n for n, spec in _tools.items() if spec.module == module_name]:
+            del _tools[name]
+        for alias in [a for a, target in _aliases.items() if target not in _tools]:
+            del _aliases[alias]
+        _tools.update(staged["tools"])
+        _aliases.update(staged["aliases"])
+        _invalidate()
+        tool_cache.clear()
+    return module
@@ -0,0 +1,28 @@
+from utils import result_store
+from tools_mod.registry import tool
+from tools_mod import registry
+
+
+@tool(
+    "fetch_result",
+    "Reads part of a large tool result that was stored under a handle instead of being returned in full.",
+    {
+        "type": "object",
+        "properties": {
+            "handle": {"type": "string", "description": "The handle named in the truncated tool output."},
+            "offset": {"type": "integer", "description": "Character offset to start reading from."},
+            "length": {"type": "integer", "description": "Number of characters to read."},
+        },
+        "required": ["handle"],
+    },
+    arg_aliases={"handle": ["id", "result_id"], "offset": ["start"]},
+)
+def fetch_result_task(handle, offset=0, length=None):
+    return result_store.fetch(handle, offset, length)
+
+
+def tool_definitions():
+    return registry.tool_definitions(__name__)
+
+
+library = registry.library(__name__)
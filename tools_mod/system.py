@@ -1,8 +1,22 @@
-import google.genai as genai
 import shutil
 import fnmatch
 from utils.commands import run_command
+from utils import tool_cache
+from tools_mod.registry import tool
+from tools_mod import registry
 
+@tool(
+    "list_installed_packages",
+    "Lists installed system packages (optionally matching a glob pattern).",
+    {
+        "type": "object",
+        "properties": {
+            "pattern": {"type": "string", "description": "Glob pattern to filter package names (e.g., 'python*')"}
+        },
+        "required": [],
+    },
+    cache=tool_cache.packages(),
+)
 def list_installed_packages_task(pattern=None):
     """
     Lists installed packages using dpkg (on Linux/Termux).
@@ -35,6 +49,19 @@ def list_installed_packages_task(pattern=None):
     except Exception as e:
         return f"Error: {e}"
 
+@tool(
+    "check_tool_installed",
+    "Checks if a specific CLI tool is available.",
+    {
+        "type": "object",
+        "properties": {
+            "tool_name": {"type": "string", "description": "Name of the tool to check"}
+        },
+        "required": ["tool_name"],
+    },
+    arg_aliases={"tool_name": ["name", "tool"]},
+    cache=tool_cache.executables(),
+)
 def check_tool_installed_task(tool_name):
     """
     Checks if a CLI tool is installed using the shell.
@@ -55,37 +82,9 @@ def check_tool_installed_task(tool_name):
         # If command fails (exit code != 0), it's not found
         return f"Tool '{tool_name}' is NOT installed."
 
+
 def tool_definitions():
-    return [
-        genai.types.Tool(
-            function_declarations=[
-                genai.types.FunctionDeclaration(
-                    name="list_installed_packages",
-                    description="Lists installed system packages (optionally matching a glob pattern).",
-                    parameters={
-                        "type": "object",
-                        "properties": {
-                            "pattern": {"type": "string", "description": "Glob pattern to filter package names (e.g., 'python*')"}
-                        },
-                        "required": [],
-                    },
-                ),
-                genai.types.FunctionDeclaration(
-                    name="check_tool_installed",
-                    description="Checks if a specific CLI tool is available.",
-                    parameters={
-                        "type": "object",
-                        "properties": {
-                            "tool_name": {"type": "string", "description": "Name of the tool to check"}
-                        },
-                        "required": ["tool_name"],
-                    },
-                ),
-            ]
-        )
-    ]
+    return registry.tool_definitions(__name__)
+
 
-library = {
-    "list_installed_packages": list_installed_packages_task,
-    "check_tool_installed": check_tool_installed_task,
-}
+library = registry.library(__name__)
@@ -1,11 +1,25 @@
-import google.genai as genai
 from googleapiclient.discovery import build
 import requests
 import os
 import config
 from utils.web_scraper import scrape_text
+from utils import supervisor
+from tools_mod.registry import tool
+from tools_mod import registry
 
-
+@tool(
+    "google_search",
+    "Performs a Google search.",
+    {
+        "type": "object",
+        "properties": {
+            "query": {"type": "string", "description": "The search query."}
+        },
+        "required": ["query"],
+    },
+    arg_aliases={"query": ["q"]},
+    names=("search_web",),
+)
 def google_search(
     query: str,
     api_key: str = config.GOOGLE_API_KEY,
@@ -37,85 +51,73 @@ def google_search(
         ]
     )
 
+@tool(
+    "download_file",
+    "Downloads a file from a URL to a local path.",
+    {
+        "type": "object",
+        "properties": {
+            "url": {"type": "string"},
+            "filepath": {"type": "string"}
+        },
+        "required": ["url", "filepath"],
+    },
+    arg_aliases={"filepath": ["path", "destination"]},
+    invalidates=("files", "git"),
+)
 def download_file_task(url, filepath):
     try:
-        response = requests.get(url, stream=True, timeout=30)
+        response = requests.get(url, stream=True, timeout=supervisor.remaining(30))
         response.raise_for_status()
         expanded_path = os.path.expanduser(filepath)
         with open(expanded_path, 'wb') as f:
             for chunk in response.iter_content(chunk_size=8192):
+                supervisor.check_cancelled()
                 f.write(chunk)
         return f"Downloaded {url} to {filepath}"
     except Exception as e:
         return f"Error downloading file: {e}"
 
+@tool(
+    "visit_page",
+    "Visits a webpage and returns the raw HTML content.",
+    {
+        "type": "object",
+        "properties": {
+            "url": {"type": "string"}
+        },
+        "required": ["url"],
+    },
+)
 def visit_page_task(url):
     try:
-        response = requests.get(url, timeout=30)
+        response = requests.get(url, timeout=supervisor.remaining(30))
         response.raise_for_status()
         return response.text
     except Exception as e:
         return f"Error visiting page: {e}"
 
+
+registry.register(
+    "scrape_text",
+    scrape_text,
+    "Scrapes the text content from a given URL.",
+    {
+        "type": "object",
+        "properties": {
+            "url": {
+                "type": "string",
+                "description": "The URL to scrape.",
+            }
+        },
+        "required": ["url"],
+    },
+    module=__name__,
+)
+
+
 def tool_definitions():
-    return [
-        genai.types.Tool(
-            function_declarations=[
-                genai.types.FunctionDeclaration(
-                    name="google_search",
-                    description="Performs a Google search.",
-                    parameters={
-                        "type": "object",
-                        "properties": {
-                            "query": {"type": "string", "description": "The search query."}
-                        },
-                        "required": ["query"],
-                    },
-                ),
-                genai.types.FunctionDeclaration(
-                    name="scrape_text",
-                    description="Scrapes the text content from a given URL.",
-                    parameters={
-                        "type": "object",
-                        "properties": {
-                            "url": {
-                                "type": "string",
-                                "description": "The URL to scrape.",
-                            }
-                        },
-                        "required": ["url"],
-                    },
-                ),
-                genai.types.FunctionDeclaration(
-                    name="download_file",
-                    description="Downloads a file from a URL to a local path.",
-                    parameters={
-                        "type": "object",
-                        "properties": {
-                            "url": {"type": "string"},
-                            "filepath": {"type": "string"}
-                        },
-                        "required": ["url", "filepath"],
-                    },
-                ),
-                genai.types.FunctionDeclaration(
-                    name="visit_page",
-                    description="Visits a webpage and returns the raw HTML content.",
-                    parameters={
-                        "type": "object",
-                        "properties": {
-                            "url": {"type": "string"}
-                        },
-                        "required": ["url"],
-                    },
-                ),
-            ]
-        )
-    ]
+    return registry.tool_definitions(__name__)
+
 
-library = {
-    "google_search": google_search,
-    "scrape_text": scrape_text,
-    "download_file": download_file_task,
-    "visit_page": visit_page_task,
-}
+library = registry.library(__name__)
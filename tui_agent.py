@@ -9,6 +9,7 @@ from tools_mod import charm
 import threading
 import time
 from utils.model_wrapper import GenerativeModelWrapper
+from utils import tracing, metrics, worker_pool
 
 def main(initial_agent_prompt=None):
     load_dotenv()
@@ -20,7 +21,7 @@ def main(initial_agent_prompt=None):
             "tools": GenerativeModelWrapper(
                 config.MODEL_NAME,
                 safety_settings=config.SAFETY_SETTINGS,
-                tools=list(tool_definitions.values()),
+                tools=tool_definitions,
             ),
         }
     except Exception as e:
@@ -33,6 +34,8 @@ def main(initial_agent_prompt=None):
 
     history = []
     user_id = "tui_user"
+    metrics.start_session(user_id)
+    worker_pool.prewarm()
 
     if initial_agent_prompt:
         prompt = initial_agent_prompt
@@ -60,5 +63,11 @@ def main(initial_agent_prompt=None):
         # Get next input
         prompt = charm.gum_input("Enter your reply (or leave empty to exit)...", value="")
 
+    metrics.dump_session()
+    worker_pool.shutdown()
+    print(charm.glow_render(metrics.format_summary()))
+
 if __name__ == "__main__":
+    # --profile / --profile=PATH records a trace of every agent step
+    tracing.enable_from_argv(sys.argv[1:])
     main()
@@ -0,0 +1,333 @@
+import os
+import bz2
+import json
+import lzma
+import stat
+import time
+import zlib
+import zipfile
+import tarfile
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from utils import supervisor, file_search
+from utils.ignore import IgnoreRules
+
+# Archive creation and extraction for compress_path / decompress_archive.
+# Zip members are read ahead on a thread pool and written in order through
+# zipfile's public API, which deflates them on the writer thread. Compressed
+# tars are written through a ParallelCompressor that cuts the tar stream
+# into blocks and compresses each block as an independent gzip/bz2/xz
+# member on the pool; concatenated members are valid for gzip/bzip2/xz, GNU
+# tar and tarfile's "r:*" mode. Inputs are walked with the shared ignore
+# rules (empty directories are kept), progress is reported at most once per
+# second, and an archive can be made incremental against the manifest of an
+# earlier one.
+BLOCK_BYTES = 1024 * 1024
+# Files up to this size are read whole on a worker; larger ones are streamed
+# through zipfile on the writer thread.
+ZIP_PARALLEL_MAX = 16 * 1024 * 1024
+PROGRESS_INTERVAL = 1.0
+# The earliest timestamp a zip entry can hold
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+
+FORMATS = {
+    "zip": (".zip",),
+    "tar": (".tar",),
+    "gztar": (".tar.gz", ".tgz"),
+    "bztar": (".tar.bz2", ".tbz2"),
+    "xztar": (".tar.xz", ".txz"),
+}
+
+
+def detect_format(path, requested=None):
+    if requested:
+        requested = {"gz": "gztar", "tgz": "gztar", "tar.gz": "gztar", "bz2": "bztar", "xz": "xztar"}.get(
+            requested, requested
+        )
+        if requested not in FORMATS:
+            raise ValueError(f"unsupported archive format {requested!r}; use one of {', '.join(FORMATS)}")
+        return requested
+    lower = path.lower()
+    for name, suffixes in FORMATS.items():
+        if lower.endswith(suffixes):
+            return name
+    return "zip"
+
+
+def manifest_path(archive_path):
+    return archive_path + ".manifest.json"
+
+
+def _workers(workers):
+    return workers or max(2, os.cpu_count() or 2)
+
+
+class Progress:
+    def __init__(self, label, total_files=None, report=print):
+        self.label = label
+        self.total = total_files
+        self.files = 0
+        self.bytes = 0
+        self.started = time.monotonic()
+        self._last = self.started
+        self._report = report
+
+    def add(self, size):
+        self.files += 1
+        self.bytes += size
+        now = time.monotonic()
+        if self._report and now - self._last >= PROGRESS_INTERVAL:
+            self._last = now
+            of = f"/{self.total}" if self.total else ""
+            self._report(f"📦 {self.label}: {self.files}{of} files, {self.bytes / 1e6:.1f} MB")
+
+    def summary(self):
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        return {
+            "files": self.files, "bytes": self.bytes, "seconds": round(elapsed, 3),
+            "mb_per_s": round(self.bytes / 1e6 / elapsed, 1),
+        }
+
+
+class ParallelCompressor:
+    """
+    File-like writer that compresses BLOCK_BYTES blocks concurrently and
+    writes the resulting members to `fileobj` in order.
+    """
+
+    def __init__(self, fileobj, kind, level=6, workers=None, block=None):
+        self.fileobj = fileobj
+        self.compress = {
+            "gz": lambda data: _gzip_member(data, level),
+            "bz2": lambda data: bz2.compress(data, max(1, min(level, 9))),
+            "xz": lambda data: lzma.compress(data, preset=level),
+        }[kind]
+        self.block = block or BLOCK_BYTES
+        self.pool = ThreadPoolExecutor(max_workers=_workers(workers))
+        self.pending = []
+        self.buffer = bytearray()
+        self.depth = _workers(workers) * 2
+
+    def write(self, data):
+        self.buffer += data
+        while len(self.buffer) >= self.block:
+            chunk = bytes(self.buffer[:self.block])
+            del self.buffer[:self.block]
+            self._submit(chunk)
+        return len(data)
+
+    def _submit(self, chunk):
+        self.pending.append(self.pool.submit(self.compress, chunk))
+        # Bounded read-ahead: wait for the oldest block once enough are in flight
+        while len(self.pending) >= self.depth:
+            self.fileobj.write(self.pending.pop(0).result())
+
+    def close(self):
+        if self.buffer:
+            self._submit(bytes(self.buffer))
+            self.buffer = bytearray()
+        for future in self.pending:
+            self.fileobj.write(future.result())
+        self.pending = []
+        self.pool.shutdown()
+
+
+def _gzip_member(data, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    return compressor.compress(data) + compressor.flush()
+
+
+def _collect(source, ignore_rules, previous):
+    """
+    Returns (members to archive as (path, arcname, stat)), full manifest,
+    deleted arcnames). Empty directories are members too, named with a
+    trailing "/".
+    """
+    source = os.path.abspath(os.path.expanduser(source))
+    parent = os.path.dirname(source)
+    prefix = len(parent) + 1
+    if os.path.isdir(source):
+        ignore = IgnoreRules(source) if ignore_rules else None
+        paths = file_search.walk_files(source, ignore=ignore, empty_dirs=True)
+    else:
+        paths = [source]
+    members, manifest = [], {}
+    for path in paths:
+        try:
+            st = os.lstat(path)
+        except OSError:
+            continue
+        arcname = path[prefix:].replace(os.sep, "/")
+        if stat.S_ISDIR(st.st_mode):
+            arcname += "/"
+        manifest[arcname] = [st.st_size, st.st_mtime_ns]
+        if previous is not None and previous.get(arcname) == manifest[arcname]:
+            continue
+        members.append((path, arcname, st))
+    deleted = sorted(set(previous) - set(manifest)) if previous is not None else []
+    return members, manifest, deleted
+
+
+def _read_file(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _write_zip(out, members, level, workers, progress):
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED, compresslevel=level) as zf:
+        with ThreadPoolExecutor(max_workers=_workers(workers)) as pool:
+            depth = _workers(workers) * 2
+            queue = []
+
+            def drain(limit):
+                while len(queue) > limit:
+                    path, arcname, st, future = queue.pop(0)
+                    if future is None:
+                        zf.write(path, arcname)
+                    else:
+                        info = zipfile.ZipInfo(arcname, max(time.localtime(st.st_mtime)[:6], ZIP_EPOCH))
+                        info.external_attr = (st.st_mode & 0xFFFF) << 16
+                        info.compress_type = zipfile.ZIP_DEFLATED
+                        zf.writestr(info, future.result(), compresslevel=level)
+                    progress.add(0 if arcname.endswith("/") else st.st_size)
+                    supervisor.check_cancelled()
+
+            for path, arcname, st in members:
+                if stat.S_ISDIR(st.st_mode):
+                    queue.append((path, arcname, st, None))
+                elif stat.S_ISREG(st.st_mode):
+                    small = st.st_size <= ZIP_PARALLEL_MAX
+                    queue.append((path, arcname, st, pool.submit(_read_file, path) if small else None))
+                else:
+                    continue
+                drain(depth)
+            drain(0)
+
+
+def _write_tar(out, fmt, members, level, workers, progress):
+    kind = {"gztar": "gz", "bztar": "bz2", "xztar": "xz"}.get(fmt)
+    stream = ParallelCompressor(out, kind, level, workers) if kind else out
+    with tarfile.open(fileobj=stream, mode="w|", format=tarfile.PAX_FORMAT) as tar:
+        for path, arcname, st in members:
+            try:
+                tar.add(path, arcname.rstrip("/"), recursive=False)
+            except OSError:
+                continue
+            progress.add(0 if arcname.endswith("/") else st.st_size)
+            supervisor.check_cancelled()
+    if kind:
+        stream.close()
+
+
+def create(source, archive_path, fmt=None, level=6, workers=None, since_manifest=None, ignore_rules=True,
+           report=print):
+    """
+    Archives source (a file or directory, stored under its own name) into
+    archive_path and writes the archive's manifest next to it. With
+    since_manifest only files added or changed since that manifest are
+    stored. Returns a summary dict.
+    """
+    archive_path = os.path.abspath(os.path.expanduser(archive_path))
+    fmt = detect_format(archive_path, fmt)
+    previous = None
+    if since_manifest:
+        with open(os.path.expanduser(since_manifest), "r", encoding="utf-8") as f:
+            previous = json.load(f)["files"]
+    members, manifest, deleted = _collect(source, ignore_rules, previous)
+    progress = Progress("archiving", len(members), report)
+
+    directory = os.path.dirname(archive_path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".archive-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            if fmt == "zip":
+                _write_zip(out, members, level, workers, progress)
+            else:
+                _write_tar(out, fmt, members, level, workers, progress)
+        os.replace(tmp, archive_path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    with open(manifest_path(archive_path), "w", encoding="utf-8") as f:
+        json.dump({"format": fmt, "incremental": previous is not None, "files": manifest, "deleted": deleted}, f)
+    summary = progress.summary()
+    summary.update(format=fmt, archive=archive_path, size=os.path.getsize(archive_path), deleted=len(deleted))
+    return summary
+
+
+def _safe_target(destination, name):
+    target = os.path.abspath(os.path.join(destination, name))
+    if target != destination and not target.startswith(destination + os.sep):
+        raise ValueError(f"archive member escapes the destination: {name}")
+    return target
+
+
+def _extract_zip(archive_path, destination, workers, progress):
+    with zipfile.ZipFile(archive_path) as zf:
+        infos = zf.infolist()
+    # Parent directories are made up front; zipfile's own makedirs races
+    # between threads
+    parents = set()
+    for info in infos:
+        target = _safe_target(destination, info.filename)
+        parents.add(target if info.is_dir() else os.path.dirname(target))
+    for directory in sorted(parents):
+        os.makedirs(directory, exist_ok=True)
+    progress.total = len(infos)
+    local = threading.local()
+    lock = threading.Lock()
+    handles = []
+
+    def extract(info):
+        # ZipFile handles are not safe to share between threads
+        if not hasattr(local, "zf"):
+            local.zf = zipfile.ZipFile(archive_path)
+            with lock:
+                handles.append(local.zf)
+        local.zf.extract(info, destination)
+        # Permission bits only: no setuid/setgid/sticky from an archive
+        mode = info.external_attr >> 16 & 0o777
+        if mode and not info.is_dir():
+            os.chmod(os.path.join(destination, info.filename), mode)
+        with lock:
+            progress.add(info.file_size)
+
+    try:
+        with ThreadPoolExecutor(max_workers=_workers(workers)) as pool:
+            for _ in pool.map(extract, infos):
+                supervisor.check_cancelled()
+    finally:
+        for zf in handles:
+            zf.close()
+
+
+def _extract_tar(archive_path, destination, progress):
+    # Not the "r|*" stream mode: its decompressor stops after the first
+    # gzip/bz2/xz member, and ParallelCompressor writes many
+    with tarfile.open(archive_path, mode="r:*") as tar:
+        for member in tar:
+            _safe_target(destination, member.name)
+            if hasattr(tarfile, "data_filter"):
+                tar.extract(member, destination, filter="data")
+            else:
+                tar.extract(member, destination)
+            progress.add(member.size)
+            supervisor.check_cancelled()
+
+
+def extract(archive_path, destination, workers=None, report=print):
+    """Extracts a zip or (compressed) tar archive into destination; returns a summary dict."""
+    archive_path = os.path.abspath(os.path.expanduser(archive_path))
+    destination = os.path.abspath(os.path.expanduser(destination))
+    os.makedirs(destination, exist_ok=True)
+    progress = Progress("extracting", report=report)
+    if zipfile.is_zipfile(archive_path):
+        _extract_zip(archive_path, destination, workers, progress)
+    elif tarfile.is_tarfile(archive_path):
+        _extract_tar(archive_path, destination, progress)
+    else:
+        raise ValueError(f"not a zip or tar archive: {archive_path}")
+    return progress.summary()
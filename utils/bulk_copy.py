@@ -0,0 +1,205 @@
+import os
+import glob
+import errno
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from utils import supervisor
+
+# Batch copy/move for copy_files and move_files. File data is copied inside
+# the kernel with copy_file_range (which can reflink or copy server-side on
+# filesystems that support it), then sendfile, then a plain read/write loop;
+# moves are renames when source and destination share a filesystem. Items
+# run on a thread pool since the copies release the GIL.
+CHUNK_BYTES = 64 * 1024 * 1024
+BATCH_ITEMS = 16
+# errnos meaning "this syscall cannot do this copy", not a real failure
+_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP, errno.EBADF}
+
+
+def _copy_range(src_fd, dst_fd, size):
+    copied = 0
+    while copied < size:
+        sent = os.copy_file_range(src_fd, dst_fd, min(CHUNK_BYTES, size - copied))
+        if sent == 0:
+            break
+        copied += sent
+    return copied
+
+
+def _send(src_fd, dst_fd, size):
+    copied = 0
+    while copied < size:
+        sent = os.sendfile(dst_fd, src_fd, copied, min(CHUNK_BYTES, size - copied))
+        if sent == 0:
+            break
+        copied += sent
+    return copied
+
+
+def copy_file(src, dst):
+    """Copies one file's data and metadata; returns the method that moved the bytes."""
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        size = os.fstat(fsrc.fileno()).st_size
+        method = "copy"
+        for name, func in (("copy_file_range", _copy_range), ("sendfile", _send)):
+            if not hasattr(os, name) or size == 0:
+                continue
+            try:
+                # Some filesystems report 0 bytes copied instead of failing;
+                # a short copy is redone by the next method
+                if func(fsrc.fileno(), fdst.fileno(), size) == size:
+                    method = name
+                    break
+            except OSError as e:
+                if e.errno not in _UNSUPPORTED:
+                    raise
+            fsrc.seek(0)
+            fdst.seek(0)
+            fdst.truncate()
+        if method == "copy":
+            shutil.copyfileobj(fsrc, fdst, 1024 * 1024)
+    shutil.copystat(src, dst)
+    return method
+
+
+def _copy_tree(src, dst, overwrite):
+    methods = set()
+    for directory, dirs, files in os.walk(src):
+        target = os.path.join(dst, os.path.relpath(directory, src))
+        os.makedirs(target, exist_ok=True)
+        for name in files:
+            source, destination = os.path.join(directory, name), os.path.join(target, name)
+            if os.path.lexists(destination) and not overwrite:
+                raise FileExistsError(f"{destination} exists")
+            if os.path.islink(source):
+                if os.path.lexists(destination):
+                    os.remove(destination)
+                os.symlink(os.readlink(source), destination)
+            else:
+                methods.add(copy_file(source, destination))
+        supervisor.check_cancelled()
+    shutil.copystat(src, dst)
+    return "+".join(sorted(methods)) or "mkdir"
+
+
+def _target(src, dst):
+    """Copies into dst when it is a directory (or ends with a separator), like cp."""
+    if dst.endswith(("/", os.sep)) or os.path.isdir(dst):
+        return os.path.join(dst, os.path.basename(src.rstrip("/" + os.sep)))
+    return dst
+
+
+def expand(items):
+    """
+    Turns [{"source", "destination"}] items into concrete (src, dst) pairs.
+    A glob source expands to every match, each placed inside destination.
+    """
+    pairs = []
+    for item in items:
+        src = os.path.expanduser(item.get("source") or item.get("src") or "")
+        dst = os.path.expanduser(item.get("destination") or item.get("dst") or "")
+        if not src or not dst:
+            pairs.append((src, dst, "missing source or destination"))
+            continue
+        if glob.has_magic(src):
+            matches = sorted(glob.glob(src, recursive=True))
+            if not matches:
+                pairs.append((src, dst, "pattern matched nothing"))
+            for match in matches:
+                pairs.append((match, os.path.join(dst, os.path.basename(match)), None))
+            continue
+        pairs.append((src, _target(src, dst), None))
+    return pairs
+
+
+def _check_distinct(src, dst):
+    # Opening dst for writing would truncate src before it is read
+    try:
+        same = os.path.samefile(src, dst)
+    except OSError:
+        return
+    if same:
+        raise shutil.SameFileError(f"{src} and {dst} are the same file")
+
+
+def _copy_one(src, dst, overwrite):
+    if not os.path.lexists(src):
+        raise FileNotFoundError(f"{src} does not exist")
+    _check_distinct(src, dst)
+    if os.path.lexists(dst) and not overwrite and not os.path.isdir(src):
+        raise FileExistsError(f"{dst} exists")
+    parent = os.path.dirname(os.path.abspath(dst))
+    os.makedirs(parent, exist_ok=True)
+    if os.path.isdir(src) and not os.path.islink(src):
+        return _copy_tree(src, dst, overwrite)
+    if os.path.islink(src):
+        if os.path.lexists(dst):
+            os.remove(dst)
+        os.symlink(os.readlink(src), dst)
+        return "symlink"
+    return copy_file(src, dst)
+
+
+def _move_one(src, dst, overwrite):
+    if not os.path.lexists(src):
+        raise FileNotFoundError(f"{src} does not exist")
+    _check_distinct(src, dst)
+    if os.path.lexists(dst) and not overwrite:
+        raise FileExistsError(f"{dst} exists")
+    os.makedirs(os.path.dirname(os.path.abspath(dst)), exist_ok=True)
+    try:
+        os.replace(src, dst)
+        return "rename"
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+    # Another filesystem: copy, then remove the source
+    method = _copy_one(src, dst, overwrite)
+    if os.path.isdir(src) and not os.path.islink(src):
+        shutil.rmtree(src)
+    else:
+        os.remove(src)
+    return f"{method}+unlink"
+
+
+def run(items, move=False, overwrite=True, workers=None):
+    """Copies or moves every item; returns [(src, dst, method or None, error or None)]."""
+    pairs = expand(items)
+    action = _move_one if move else _copy_one
+
+    def one(pair):
+        src, dst, problem = pair
+        if problem:
+            return src, dst, None, problem
+        try:
+            return src, dst, action(src, dst, overwrite), None
+        except Exception as e:
+            return src, dst, None, str(e)
+
+    # Small files cost less to copy than an executor task, so items go to
+    # the pool in batches
+    batches = [pairs[i:i + BATCH_ITEMS] for i in range(0, len(pairs), BATCH_ITEMS)]
+    if len(batches) <= 1:
+        return [one(pair) for pair in pairs]
+    results = []
+    with ThreadPoolExecutor(max_workers=workers or min(8, (os.cpu_count() or 2) * 2)) as pool:
+        for done in pool.map(lambda batch: [one(pair) for pair in batch], batches):
+            results.extend(done)
+            supervisor.check_cancelled()
+    return results
+
+
+def summary(results, verb, max_ok_lines=50):
+    """Per-item lines; every failure is listed, successes up to max_ok_lines."""
+    done = [r for r in results if r[3] is None]
+    lines = [f"{verb} {len(done)} of {len(results)} items."]
+    shown = 0
+    for src, dst, method, error in results:
+        if error is None:
+            shown += 1
+            if shown > max_ok_lines:
+                continue
+        lines.append(f"  {'ok ' if error is None else 'ERR'} {src} -> {dst}: {method or error}")
+    if shown > max_ok_lines:
+        lines.append(f"  ... and {shown - max_ok_lines} more ok")
+    return "\n".join(lines)
@@ -0,0 +1,117 @@
+import ast
+import os
+import re
+import config
+
+# Chunkers for the ingestion pipeline. Python sources are split on module,
+# class and function boundaries with ast, so a retrieved chunk is one
+# definition and carries its symbol, kind and qualified name; classes too
+# large for one chunk are split into a header chunk and one chunk per
+# method. Other files and sources that do not parse are cut into
+# overlapping line windows, as are single definitions longer than
+# SYMBOL_CHUNKS windows (each part keeps the definition's metadata).
+# Chunks are (text, first line, last line) or (text, first, last, metadata).
+SYMBOL_CHUNKS = 3
+# Line breaks as the Python tokenizer counts them (str.splitlines also
+# breaks on form feeds and other separators, which would shift ast's line numbers)
+_SOURCE_LINE = re.compile(r"[^\r\n]*(?:\r\n|[\r\n])|[^\r\n]+\Z")
+
+
+def _windows(lines, first=1):
+    """Line windows of about config.CHUNK_CHARS over lines numbered from first."""
+    chunks = []
+    start = 0
+    while start < len(lines):
+        size, end = 0, start
+        while end < len(lines) and (size < config.CHUNK_CHARS or end == start):
+            size += len(lines[end])
+            end += 1
+        chunks.append(("".join(lines[start:end]), start + first, end + first - 1))
+        if end >= len(lines):
+            break
+        start = max(end - config.CHUNK_OVERLAP_LINES, start + 1)
+    return chunks
+
+
+def chunk_text(text, source=None):
+    """
+    Splits text on line boundaries into pieces of about config.CHUNK_CHARS
+    that overlap by config.CHUNK_OVERLAP_LINES lines. Returns
+    [(chunk text, first line, last line)].
+    """
+    return _windows(text.splitlines(keepends=True))
+
+
+def _start(node, lines):
+    """First line of a definition, including decorators and the comments right above it."""
+    start = min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])])
+    while start > 1 and lines[start - 2].lstrip().startswith("#"):
+        start -= 1
+    return start
+
+
+def _emit(chunks, lines, start, end, meta):
+    text = "".join(lines[start - 1:end])
+    if len(text) <= SYMBOL_CHUNKS * config.CHUNK_CHARS:
+        chunks.append((text, start, end, meta))
+        return
+    for part, (piece, first, last) in enumerate(_windows(lines[start - 1:end], start)):
+        chunks.append((piece, first, last, dict(meta, part=part)))
+
+
+def _definitions(body, lines, prefix, module, chunks, header=None):
+    """Chunks a statement list; runs of other statements become one "module" (or "class") chunk each."""
+    pending = [header] if header else []  # (start, end) of statements between definitions
+
+    def flush():
+        if pending:
+            kind, symbol = ("class", prefix[-1]) if prefix else ("module", module)
+            qualname = ".".join(prefix) if prefix else module
+            _emit(chunks, lines, pending[0][0], pending[-1][1], {
+                "symbol": symbol, "kind": kind, "qualname": qualname,
+            })
+            pending.clear()
+
+    for node in body:
+        start, end = _start(node, lines), node.end_lineno
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            flush()
+            qualname = ".".join(prefix + [node.name])
+            is_class = isinstance(node, ast.ClassDef)
+            size = sum(len(line) for line in lines[start - 1:end])
+            if is_class and size > config.CHUNK_CHARS and len(node.body) > 1:
+                # Header (signature, docstring, attributes) and members separately
+                header_end = _start(node.body[0], lines) - 1
+                header = (start, header_end) if header_end >= start else None
+                _definitions(node.body, lines, prefix + [node.name], module, chunks, header)
+                continue
+            kind = "class" if is_class else ("method" if prefix else "function")
+            _emit(chunks, lines, start, end, {"symbol": node.name, "kind": kind, "qualname": qualname})
+        else:
+            pending.append((start, end))
+    flush()
+
+
+def chunk_python(text, source=None):
+    """AST chunks of a Python source, or None if it does not parse."""
+    try:
+        tree = ast.parse(text)
+    except (SyntaxError, ValueError):
+        return None
+    lines = _SOURCE_LINE.findall(text)
+    module = os.path.splitext(os.path.basename(source))[0] if source else "<module>"
+    chunks = []
+    _definitions(tree.body, lines, [], module, chunks)
+    chunks.sort(key=lambda chunk: chunk[1])
+    for chunk in chunks:
+        chunk[3]["language"] = "python"
+    return chunks
+
+
+def chunk_source(text, source=None):
+    """The default ingestion chunker: AST chunks for Python, line windows otherwise."""
+    if source and source.endswith((".py", ".pyi")):
+        chunks = chunk_python(text, source)
+        if chunks:
+            return chunks
+    return chunk_text(text, source)
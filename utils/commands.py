@@ -1,18 +1,19 @@
 import subprocess
 import sys
+from utils import supervisor
 
 
-def run_command(command, shell=False, check_output=False, ignore_errors=False):
-    """Runs a shell command. Supports capturing output via check_output=True."""
+def run_command(command, shell=False, check_output=False, ignore_errors=False, interactive=False):
+    """
+    Runs a shell command. Supports capturing output via check_output=True.
+    Pass interactive=True for commands that may prompt on the terminal (sudo, git credentials).
+    """
     try:
-        # Construct arguments for subprocess.run
-        kwargs = {"check": True, "text": True, "shell": shell}
-
         # Only capture output if requested, otherwise let it print to screen
-        if check_output:
-            kwargs["capture_output"] = True
-
-        result = subprocess.run(command, **kwargs)
+        result = supervisor.run_process(
+            command, shell=shell, capture_output=check_output, text=True, interactive=interactive
+        )
+        result.check_returncode()
 
         if check_output:
             return result.stdout.strip()
@@ -38,7 +39,9 @@ def user_confirm(question):
         try:
             # Use print with end='' to ensure prompt appears before input wait
             print(f"{question} [y/n]: ", end="", flush=True)
-            res = sys.stdin.readline().lower().strip()
+            # Time spent waiting on the user does not count against the tool's deadline
+            with supervisor.paused():
+                res = sys.stdin.readline().lower().strip()
             if res in ["y", "yes"]:
                 return True
             if res in ["n", "no"]:
@@ -0,0 +1,296 @@
+import os
+import re
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from collections import deque
+from urllib import robotparser
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import requests
+from bs4 import BeautifulSoup
+import config
+from utils import file_search
+
+# Breadth-first crawler behind learn_url. Pages are fetched on a thread pool
+# with at most CRAWL_PER_HOST requests in flight and CRAWL_HOST_DELAY seconds
+# between requests to any one host, and robots.txt is honoured. URLs are
+# normalized before the seen-check, so fragments, default ports, host case
+# and query order do not cause refetches. Each page's ETag/Last-Modified and
+# outgoing links are kept in a per-host cache file; a re-crawl sends
+# conditional GETs and follows the cached links of pages that answer
+# 304 Not Modified without downloading or re-learning them. With
+# deferred=True a fetched page's entry is only recorded once confirm(url) is
+# called (learn_url does so when its chunks are stored), so a page that
+# failed to embed or store is fetched again next time.
+TEXT_TYPES = ("text/html", "application/xhtml+xml", "text/plain", "text/markdown")
+_BLANK_LINES = re.compile(r"\n\s*\n+")
+
+
+def normalize(url, base=None):
+    """Absolute URL without fragment, default port or dot segments; None if not http(s)."""
+    url = urljoin(base, url.strip()) if base else url.strip()
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in ("http", "https") or not parts.hostname:
+        return None
+    host = parts.hostname.lower()
+    if parts.port and parts.port != {"http": 80, "https": 443}[scheme]:
+        host = f"{host}:{parts.port}"
+    path = urlsplit(urljoin(f"{scheme}://{host}/", parts.path or "/")).path or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def html_text(html, base_url):
+    """(title, visible text, links) of an HTML page."""
+    soup = BeautifulSoup(html, "html.parser")
+    links = [a["href"] for a in soup.find_all("a", href=True)]
+    for tag in soup(["script", "style", "noscript", "template"]):
+        tag.decompose()
+    title = soup.title.get_text(strip=True) if soup.title else ""
+    text = _BLANK_LINES.sub("\n\n", soup.get_text("\n")).strip()
+    return title, text, [link for link in (normalize(href, base_url) for href in links) if link]
+
+
+class PageCache:
+    """ETag, Last-Modified and links of crawled pages, one JSON file per host."""
+
+    def __init__(self, host, directory=None):
+        directory = directory or config.CRAWL_CACHE_DIR
+        self.path = os.path.join(directory, re.sub(r"[^\w.-]", "_", host) + ".json")
+        self.lock = threading.Lock()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.pages = json.load(f)
+        except (OSError, ValueError):
+            self.pages = {}
+
+    def get(self, url):
+        with self.lock:
+            return self.pages.get(url)
+
+    def put(self, url, entry):
+        with self.lock:
+            self.pages[url] = entry
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=".crawl-", dir=os.path.dirname(self.path))
+        with os.fdopen(fd, "w", encoding="utf-8") as f, self.lock:
+            json.dump(self.pages, f)
+        os.replace(tmp, self.path)
+
+
+class _HostGate:
+    """Per-host concurrency limit plus a minimum delay between requests."""
+
+    def __init__(self, per_host, delay):
+        self.per_host = per_host
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.hosts = {}  # host -> [semaphore, time of the next allowed request]
+
+    def __call__(self, host):
+        with self.lock:
+            state = self.hosts.setdefault(host, [threading.Semaphore(self.per_host), 0.0])
+        return _Slot(self, state)
+
+
+class _Slot:
+    def __init__(self, gate, state):
+        self.gate = gate
+        self.state = state
+
+    def __enter__(self):
+        self.state[0].acquire()
+        with self.gate.lock:
+            now = time.monotonic()
+            start = max(now, self.state[1])
+            self.state[1] = start + self.gate.delay
+        if start > now:
+            time.sleep(start - now)
+
+    def __exit__(self, *exc):
+        self.state[0].release()
+
+
+class Crawler:
+    def __init__(self, max_depth=None, max_pages=None, same_host=True, workers=None, per_host=None,
+                 delay=None, cache_dir=None, respect_robots=True, conditional=True, deferred=False):
+        self.max_depth = config.CRAWL_MAX_DEPTH if max_depth is None else max_depth
+        self.max_pages = max_pages or config.CRAWL_MAX_PAGES
+        self.same_host = same_host
+        self.workers = workers or config.CRAWL_WORKERS
+        self.gate = _HostGate(per_host or config.CRAWL_PER_HOST,
+                              config.CRAWL_HOST_DELAY if delay is None else delay)
+        self.cache_dir = cache_dir
+        self.respect_robots = respect_robots
+        self.conditional = conditional
+        self.deferred = deferred
+        self._pending = {}  # url -> (cache, entry) awaiting confirm()
+        self.stats = {"fetched": 0, "not_modified": 0, "skipped": 0, "errors": 0}
+        self.errors = {}
+        self._local = threading.local()
+        self._caches = {}
+        self._robots = {}
+        self._lock = threading.Lock()
+
+    def _session(self):
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+            self._local.session.headers["User-Agent"] = config.CRAWL_USER_AGENT
+        return self._local.session
+
+    def _cache(self, host):
+        with self._lock:
+            if host not in self._caches:
+                self._caches[host] = PageCache(host, self.cache_dir)
+            return self._caches[host]
+
+    def _allowed(self, url):
+        if not self.respect_robots:
+            return True
+        parts = urlsplit(url)
+        with self._lock:
+            parser = self._robots.get(parts.netloc)
+        if parser is None:
+            parser = robotparser.RobotFileParser()
+            try:
+                with self.gate(parts.netloc):
+                    response = self._session().get(
+                        f"{parts.scheme}://{parts.netloc}/robots.txt", timeout=config.CRAWL_TIMEOUT
+                    )
+                parser.parse(response.text.splitlines() if response.status_code == 200 else [])
+            except requests.RequestException:
+                parser.parse([])
+            with self._lock:
+                parser = self._robots.setdefault(parts.netloc, parser)
+        return parser.can_fetch(config.CRAWL_USER_AGENT, url)
+
+    def fetch(self, url):
+        """
+        Returns (status, title, text, links, validators): status is
+        "fetched", "not_modified" (unchanged since the last crawl; no text)
+        or "skipped".
+        """
+        if not self._allowed(url):
+            return "skipped", "", None, [], {}
+        host = urlsplit(url).netloc
+        cache = self._cache(host)
+        cached = cache.get(url)
+        headers = {}
+        if self.conditional and cached:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        session = self._session()
+        with self.gate(host), session.get(
+            url, headers=headers, timeout=config.CRAWL_TIMEOUT, stream=True
+        ) as response:
+            if response.status_code == 304 and cached:
+                return "not_modified", cached.get("title", ""), None, cached.get("links", []), {}
+            response.raise_for_status()
+            kind = response.headers.get("Content-Type", "").split(";")[0].strip().lower()
+            if kind not in TEXT_TYPES:
+                return "skipped", "", None, [], {}
+            body = b""
+            for block in response.iter_content(64 * 1024):
+                body += block
+                if len(body) > config.CRAWL_MAX_BYTES:
+                    return "skipped", "", None, [], {}
+            final = normalize(response.url) or url
+            validators = {
+                "etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified"),
+            }
+            # requests assumes ISO-8859-1 for text/* without a charset; UTF-8 is likelier
+            charset = response.encoding if "charset" in response.headers.get("Content-Type", "") else "utf-8"
+        text = body.decode(charset or "utf-8", errors="replace")
+        if kind in ("text/plain", "text/markdown"):
+            title, links = "", []
+        else:
+            title, text, links = html_text(text, final)
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        entry = dict(validators, title=title, links=links, digest=digest)
+        if cached and cached.get("digest") == digest:
+            # Served again without validators, but the text has not changed
+            cache.put(url, entry)
+            return "not_modified", title, None, links, validators
+        if self.deferred:
+            with self._lock:
+                self._pending[url] = (cache, entry)
+        else:
+            cache.put(url, entry)
+        return "fetched", title, text, links, validators
+
+    def confirm(self, url):
+        """Records a deferred page's cache entry (its content has been stored)."""
+        with self._lock:
+            pending = self._pending.pop(url, None)
+        if pending is not None:
+            cache, entry = pending
+            cache.put(url, entry)
+
+    def save(self):
+        with self._lock:
+            caches = list(self._caches.values())
+        for cache in caches:
+            cache.save()
+
+    def _in_scope(self, url, root_host):
+        if self.same_host and urlsplit(url).netloc != root_host:
+            return False
+        return not file_search.binary_extension(urlsplit(url).path)
+
+    def crawl(self, start_url, stop=None):
+        """
+        Yields (url, text, metadata) for each page fetched, breadth first,
+        while fetches continue in the background. Pages that were not
+        modified since the last crawl are followed but not yielded.
+        """
+        start = normalize(start_url)
+        if start is None:
+            raise ValueError(f"not an http(s) URL: {start_url}")
+        root_host = urlsplit(start).netloc
+        seen = {start}
+        frontier = deque([(start, 0)])
+        scheduled = 0
+        try:
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                pending = {}
+                while frontier or pending:
+                    while frontier and len(pending) < self.workers * 2 and scheduled < self.max_pages:
+                        if stop is not None and stop.is_set():
+                            frontier.clear()
+                            break
+                        url, depth = frontier.popleft()
+                        pending[pool.submit(self.fetch, url)] = (url, depth)
+                        scheduled += 1
+                    if scheduled >= self.max_pages:
+                        frontier.clear()
+                    if not pending:
+                        break
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        url, depth = pending.pop(future)
+                        try:
+                            status, title, text, links, _ = future.result()
+                        except Exception as e:
+                            self.stats["errors"] += 1
+                            self.errors[url] = str(e)[:200]
+                            continue
+                        self.stats[status] += 1
+                        if depth < self.max_depth:
+                            for link in links:
+                                if link not in seen and self._in_scope(link, root_host):
+                                    seen.add(link)
+                                    frontier.append((link, depth + 1))
+                        if status == "fetched" and text and text.strip():
+                            yield url, text, {"title": title, "depth": depth}
+                        elif status == "fetched":
+                            self.confirm(url)  # nothing to store
+        finally:
+            self.save()
@@ -90,10 +90,27 @@ def store_embeddings(texts, metadatas, collection_name="agent_learning"):
         logger.error(f"Error storing embeddings: {e}")
         return False
 
-def query_embeddings(query_text, n_results=10, collection_name="agent_learning"):
+def get_embedding_function(collection_name="agent_learning"):
+    """The collection's embedding function, or None to let upserts embed."""
+    try:
+        return db_client.get_or_create_collection(collection_name)._embedding_function
+    except Exception:
+        return None
+
+def upsert_documents(ids, texts, metadatas, embeddings=None, collection_name="agent_learning"):
+    """Upserts one batch; unlike store_embeddings it raises, so callers can retry."""
+    collection = db_client.get_or_create_collection(collection_name)
+    collection.upsert(ids=ids, documents=texts, metadatas=metadatas, embeddings=embeddings)
+
+def delete_sources(sources, collection_name="agent_learning"):
+    """Drops every document whose metadata source is one of `sources`."""
+    collection = db_client.get_or_create_collection(collection_name)
+    collection.delete(where={"source": {"$in": list(sources)}})
+
+def query_embeddings(query_text, n_results=10, collection_name="agent_learning", where=None):
     try:
         collection = db_client.get_or_create_collection(collection_name)
-        return collection.query(query_texts=[query_text], n_results=n_results, include=["documents", "metadatas", "distances"])
+        return collection.query(query_texts=[query_text], n_results=n_results, where=where or None, include=["documents", "metadatas", "distances"])
     except Exception: return None
 
 def search_and_delete_knowledge(query_text, collection_name="agent_learning"):
@@ -0,0 +1,185 @@
+import os
+import json
+import time
+import base64
+import bisect
+import hashlib
+from utils import supervisor
+from utils.ignore import IgnoreRules
+
+# Bounded directory listing for list_directory_recursive. The tree is walked
+# with an os.scandir stack, depth first with each directory's entries sorted,
+# so the order is deterministic. A cursor carries the last path a page
+# returned plus a fingerprint of the listing options, so it cannot be
+# replayed against a different listing; the next page rebuilds the stack
+# along that path instead of walking everything before it again.
+SORT_KEYS = ("name", "size", "mtime")
+
+
+def _fingerprint(root, max_depth, sort, include_ignored):
+    raw = json.dumps([root, max_depth, sort, include_ignored])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:10]
+
+
+def encode_cursor(last, count, fingerprint):
+    raw = json.dumps({"p": last, "n": count, "f": fingerprint}, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor, fingerprint):
+    """
+    Returns (last relative path, entries listed so far) from cursor; raises
+    ValueError if it belongs to another listing.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        last, count, owner = data["p"], int(data["n"]), data["f"]
+        if not isinstance(last, str) or not last:
+            raise ValueError(last)
+    except Exception:
+        raise ValueError(f"invalid cursor {cursor!r}")
+    if owner != fingerprint:
+        raise ValueError("cursor belongs to a listing with different options")
+    return last, count
+
+
+def _children(directory, sort, ignore):
+    entries = []
+    try:
+        with os.scandir(directory) as it:
+            for entry in it:
+                try:
+                    if entry.is_symlink():
+                        kind = "l"
+                    elif entry.is_dir():
+                        kind = "d"
+                    else:
+                        kind = "f"
+                    st = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                if ignore is not None and ignore.ignored(entry.path, kind == "d"):
+                    continue
+                entries.append((entry.name, entry.path, kind, st.st_size if kind == "f" else 0, st.st_mtime))
+    except OSError:
+        return []
+    if sort == "size":
+        entries.sort(key=lambda e: (-e[3], e[0]))
+    elif sort == "mtime":
+        entries.sort(key=lambda e: (-e[4], e[0]))
+    else:
+        entries.sort()
+    return entries
+
+
+def _position(children, name, sort):
+    """Index of name among a directory's sorted children, or where it would be."""
+    for index, child in enumerate(children):
+        if child[0] == name:
+            return index
+    if sort != "name":
+        # Without its size or mtime there is no telling where it stood
+        raise ValueError("the listing changed since this cursor was made; list again without a cursor")
+    return bisect.bisect_left([child[0] for child in children], name)
+
+
+def walk_entries(root, max_depth=-1, sort="name", ignore=None, after=None):
+    """
+    Yields (relative path, kind, size, mtime) depth first, each directory
+    followed by its subtree; kind is "d", "f" or "l" (symlink, not followed).
+    max_depth 0 lists only root's own entries, -1 is unlimited. With after
+    (a relative path) the walk starts with the entry that follows it.
+    """
+    if sort not in SORT_KEYS:
+        raise ValueError(f"sort must be one of {', '.join(SORT_KEYS)}")
+    prefix = len(root.rstrip(os.sep)) + 1
+    stack = []
+    directory, depth = root, 0
+    resume = after.split(os.sep) if after else []
+    while True:
+        # Each level along the resume path continues after the entry it was at
+        children = _children(directory, sort, ignore)
+        if not resume:
+            stack.append((iter(children), depth))
+            break
+        at = _position(children, resume[0], sort)
+        found = at < len(children) and children[at][0] == resume[0]
+        stack.append((iter(children[at + 1 if found else at:]), depth))
+        if not found or children[at][2] != "d" or 0 <= max_depth <= depth:
+            break
+        directory, depth, resume = children[at][1], depth + 1, resume[1:]
+    while stack:
+        entries, depth = stack[-1]
+        item = next(entries, None)
+        if item is None:
+            stack.pop()
+            continue
+        _, path, kind, size, mtime = item
+        yield path[prefix:], kind, size, mtime
+        if kind == "d" and (max_depth < 0 or depth < max_depth):
+            supervisor.check_cancelled()
+            stack.append((iter(_children(path, sort, ignore)), depth + 1))
+
+
+def list_directory(root, max_depth=-1, sort="name", max_entries=200, cursor=None, include_ignored=False):
+    """
+    Returns one page of the listing as a dict with the root, the entries as
+    (relative path, kind, size, mtime) tuples and next_cursor (None on the last page).
+    """
+    root = os.path.abspath(os.path.expanduser(root))
+    if not os.path.isdir(root):
+        raise NotADirectoryError(f"not a directory: {root}")
+    fingerprint = _fingerprint(root, max_depth, sort, include_ignored)
+    after, offset = decode_cursor(cursor, fingerprint) if cursor else (None, 0)
+    ignore = None if include_ignored else IgnoreRules(root)
+
+    entries = []
+    next_cursor = None
+    for entry in walk_entries(root, max_depth, sort, ignore, after):
+        if len(entries) >= max_entries:
+            next_cursor = encode_cursor(entries[-1][0], offset + len(entries), fingerprint)
+            break
+        entries.append(entry)
+    return {"root": root, "offset": offset, "entries": entries, "next_cursor": next_cursor}
+
+
+def _size(n):
+    for unit in ("B", "K", "M", "G"):
+        if n < 1024 or unit == "G":
+            return f"{n}{unit}" if unit == "B" else f"{n:.1f}{unit}"
+        n /= 1024
+
+
+def format_text(page, details=False):
+    """Indented tree of relative names; details adds size and mtime columns."""
+    lines = [f"{page['root']}/"]
+    for rel, kind, size, mtime in page["entries"]:
+        depth = rel.count(os.sep)
+        name = os.path.basename(rel) + ("/" if kind == "d" else " -> " if kind == "l" else "")
+        if kind == "l":
+            try:
+                name += os.readlink(os.path.join(page["root"], rel))
+            except OSError:
+                name += "?"
+        line = "    " * (depth + 1) + name
+        if details:
+            stamp = time.strftime("%Y-%m-%d %H:%M", time.localtime(mtime))
+            line = f"{_size(size) if kind == 'f' else '-':>8}  {stamp}  {line}"
+        lines.append(line)
+    if page["offset"] and page["entries"]:
+        # A continued page starts mid-tree; say where so the indentation reads right
+        lines.insert(1, f"    ... (continuing after {page['offset']} entries, at {page['entries'][0][0]})")
+    if page["next_cursor"]:
+        lines.append(f"... more entries; call again with cursor=\"{page['next_cursor']}\"")
+    return "\n".join(lines)
+
+
+def format_json(page):
+    """Compact JSON: entries as [path, kind, size, mtime] arrays."""
+    return json.dumps({
+        "root": page["root"],
+        "columns": ["path", "kind", "size", "mtime"],
+        "entries": [[rel.replace(os.sep, "/"), kind, size, int(mtime)] for rel, kind, size, mtime in page["entries"]],
+        "next_cursor": page["next_cursor"],
+    }, separators=(",", ":"))
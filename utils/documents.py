@@ -0,0 +1,117 @@
+import os
+import gzip
+import json
+import hashlib
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import config
+
+# Text extraction for documents the plain-text reader cannot use (PDF). The
+# extraction runs in a process pool, since parsing PDFs is CPU-bound Python,
+# and each worker writes the text page by page into a cache file named after
+# the document's SHA-256, so an unchanged document is never parsed twice.
+# The ingestion pipeline then streams pages out of the cache file into the
+# chunker instead of holding a whole document's text in memory.
+HASH_BLOCK = 1024 * 1024
+
+
+def _pdf_pages(path):
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    for page in reader.pages:
+        yield page.extract_text() or ""
+
+
+EXTRACTORS = {".pdf": _pdf_pages}
+
+
+def is_document(path):
+    return os.path.splitext(path)[1].lower() in EXTRACTORS
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(HASH_BLOCK), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_path(digest, cache_dir=None):
+    return os.path.join(cache_dir or config.DOCUMENT_CACHE_DIR, digest[:2], digest + ".jsonl.gz")
+
+
+def extract(path, cache_dir=None, max_bytes=None):
+    """
+    Extracts a document's pages into the cache unless they are already
+    there. Returns (cache file, True if it was cached). Runs in a worker
+    process.
+    """
+    if os.path.getsize(path) > (max_bytes or config.INGEST_MAX_DOCUMENT_BYTES):
+        raise ValueError("too large")
+    target = cache_path(file_hash(path), cache_dir)
+    if os.path.exists(target):
+        return target, True
+    directory = os.path.dirname(target)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".extract-", dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as raw:
+            with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=3) as out:
+                for text in EXTRACTORS[os.path.splitext(path)[1].lower()](path):
+                    out.write(json.dumps(text).encode("utf-8") + b"\n")
+        os.replace(tmp, target)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return target, False
+
+
+def pages(cache_file):
+    """Yields the text of each page of an extracted document."""
+    with gzip.open(cache_file, "rt", encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def extract_all(paths, workers=None, cache_dir=None, stop=None):
+    """
+    Extracts documents on a process pool, yielding (path, cache file, cached)
+    or (path, None, error) as they finish. At most twice the worker count
+    are in flight; set the `stop` event to stop early.
+    """
+    paths = list(paths)
+    if not paths:
+        return
+    workers = min(workers or config.INGEST_DOCUMENT_WORKERS, len(paths))
+    # Resolved here: spawned workers import a fresh config
+    cache_dir = cache_dir or config.DOCUMENT_CACHE_DIR
+    max_bytes = config.INGEST_MAX_DOCUMENT_BYTES
+    # Not fork: the parent runs threads (pipeline stages, the database
+    # client) that a forked child would inherit in an undefined state. A
+    # forkserver re-imports the main module once rather than per worker.
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        pending = {}
+        queued = iter(paths)
+        while True:
+            while len(pending) < workers * 2 and not (stop is not None and stop.is_set()):
+                path = next(queued, None)
+                if path is None:
+                    break
+                pending[pool.submit(extract, path, cache_dir, max_bytes)] = path
+            if not pending:
+                return
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = pending.pop(future)
+                try:
+                    target, cached = future.result()
+                except Exception as e:
+                    yield path, None, str(e) or type(e).__name__
+                else:
+                    yield path, target, cached
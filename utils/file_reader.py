@@ -0,0 +1,159 @@
+import os
+import re
+import mmap
+import array
+import bisect
+import threading
+from collections import OrderedDict
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Partial reads for read_file: line ranges, head/tail, byte ranges and
+# windows around a pattern, served by seeking or mmap instead of loading the
+# whole file. Line ranges use an index of line start offsets that is built
+# once per file version (mtime, size, inode) and kept in a small LRU, so
+# repeated reads of the same file cost only the window itself.
+MAX_INDEXED_FILES = 32
+TAIL_BLOCK = 64 * 1024
+
+_lock = threading.Lock()
+_indexes = OrderedDict()
+
+
+def _version(st):
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def _build_offsets(f, size):
+    offsets = array.array("Q", [0])
+    if size == 0:
+        return offsets
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if np is not None:
+            starts = np.flatnonzero(np.frombuffer(mm, dtype=np.uint8) == 10) + 1
+            offsets.frombytes(starts.astype(np.uint64).tobytes())
+            del starts
+        else:
+            pos = mm.find(b"\n")
+            while pos != -1:
+                offsets.append(pos + 1)
+                pos = mm.find(b"\n", pos + 1)
+    if offsets[-1] == size:
+        offsets.pop()  # a trailing newline does not start another line
+    return offsets
+
+
+def line_offsets(path):
+    """Start offset of every line of path, cached until the file changes."""
+    path = os.path.abspath(path)
+    with open(path, "rb") as f:
+        version = _version(os.fstat(f.fileno()))
+        with _lock:
+            cached = _indexes.get(path)
+            if cached is not None and cached[0] == version:
+                _indexes.move_to_end(path)
+                return cached[1]
+        offsets = _build_offsets(f, version[1])
+    with _lock:
+        _indexes[path] = (version, offsets)
+        _indexes.move_to_end(path)
+        while len(_indexes) > MAX_INDEXED_FILES:
+            _indexes.popitem(last=False)
+    return offsets
+
+
+def _decode(data):
+    return data.decode("utf-8", errors="replace")
+
+
+def read_lines(path, start, end=None):
+    """
+    Lines start..end (1-based, inclusive; negative counts from the end).
+    Returns (text, first line, last line, total lines).
+    """
+    offsets = line_offsets(path)
+    size = os.path.getsize(path)
+    total = len(offsets) if size else 0
+    if start < 0:
+        start = total + start + 1
+    if end is None:
+        end = total
+    elif end < 0:
+        end = total + end + 1
+    start, end = max(start, 1), min(end, total)
+    if start > end:
+        return "", start, end, total
+    begin = offsets[start - 1]
+    stop = offsets[end] if end < total else size
+    with open(path, "rb") as f:
+        f.seek(begin)
+        data = f.read(stop - begin)
+    return _decode(data).rstrip("\n"), start, end, total
+
+
+def head(path, count):
+    """The first `count` lines, read sequentially without an index."""
+    lines = []
+    with open(path, "rb") as f:
+        for line in f:
+            if len(lines) >= count:
+                break
+            lines.append(line)
+    return _decode(b"".join(lines)).rstrip("\n")
+
+
+def tail(path, count):
+    """The last `count` lines, read backwards from the end in blocks."""
+    with open(path, "rb") as f:
+        pos = os.fstat(f.fileno()).st_size
+        data = b""
+        # Once the data holds `count` newlines (besides trailing ones) the last count lines are complete
+        while pos > 0 and data.rstrip(b"\n").count(b"\n") < count:
+            step = min(TAIL_BLOCK, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    lines = data.rstrip(b"\n").split(b"\n")
+    return _decode(b"\n".join(lines[-count:])) if count > 0 else ""
+
+
+def read_bytes(path, offset, length):
+    with open(path, "rb") as f:
+        f.seek(offset if offset >= 0 else max(0, os.fstat(f.fileno()).st_size + offset))
+        return _decode(f.read(length))
+
+
+def windows(path, pattern, context=10, max_matches=5, ignore_case=False):
+    """
+    Line windows around the first max_matches matches of a regex, with
+    overlapping windows merged. Returns ([(first, last, text, matched line numbers)], match count, total lines).
+    """
+    regex = re.compile(pattern.encode("utf-8"), re.MULTILINE | (re.IGNORECASE if ignore_case else 0))
+    offsets = line_offsets(path)
+    size = os.path.getsize(path)
+    total = len(offsets) if size else 0
+    hits = []
+    if size:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for match in regex.finditer(mm):
+                line_no = bisect.bisect_right(offsets, match.start())
+                if not hits or hits[-1] != line_no:
+                    hits.append(line_no)
+                    if len(hits) >= max_matches:
+                        break
+    spans = []
+    for line_no in hits:
+        first, last = max(1, line_no - context), min(total, line_no + context)
+        if spans and first <= spans[-1][1] + 1:
+            spans[-1][1] = max(spans[-1][1], last)
+            spans[-1][2].append(line_no)
+        else:
+            spans.append([first, last, [line_no]])
+    result = []
+    for first, last, matched in spans:
+        text, _, _, _ = read_lines(path, first, last)
+        result.append((first, last, text, matched))
+    return result, len(hits), total
@@ -0,0 +1,209 @@
+import os
+import re
+import mmap
+import fnmatch
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from utils import supervisor
+from utils.ignore import IgnoreRules
+
+# Parallel file/content search used by find_files. The walk is an explicit
+# os.scandir stack that honours max_depth and the ignore rules; contents are
+# scanned (through mmap for large files) with a pattern compiled once, binary files are
+# skipped, and the search stops as soon as max_results matches were found.
+SNIFF_BYTES = 8192
+# Skipped on their name alone, without opening them
+BINARY_EXTENSIONS = frozenset((
+    ".png", ".jpg", ".jpeg", ".gif", ".bmp", ".ico", ".webp", ".tif", ".tiff", ".psd",
+    ".mp3", ".mp4", ".wav", ".ogg", ".flac", ".avi", ".mov", ".mkv", ".webm",
+    ".zip", ".gz", ".tgz", ".bz2", ".xz", ".7z", ".rar", ".tar", ".zst", ".jar", ".whl", ".egg",
+    ".pdf", ".doc", ".docx", ".xls", ".xlsx", ".ppt", ".pptx", ".odt",
+    ".so", ".dll", ".dylib", ".exe", ".o", ".a", ".lib", ".bin", ".class", ".pyc", ".pyo", ".wasm",
+    ".sqlite", ".sqlite3", ".db", ".parquet", ".npy", ".npz", ".pkl", ".pickle", ".h5", ".onnx",
+    ".pt", ".ckpt", ".safetensors", ".ttf", ".otf", ".woff", ".woff2", ".eot",
+))
+MAX_LINE_CHARS = 200
+# Files handed to a worker thread at a time; per-file tasks cost more in
+# executor overhead than scanning a small file does.
+BATCH_FILES = 32
+# Smaller files are read in one call, which beats mmap setup for them
+MMAP_MIN_BYTES = 256 * 1024
+
+
+def walk_files(root, max_depth=-1, ignore=None, name_pattern=None, empty_dirs=False):
+    """
+    Yields file paths under root; max_depth 0 means only root's own files, -1
+    unlimited. With empty_dirs, directories with nothing left in them after
+    the ignore rules are yielded as well.
+    """
+    stack = [(root, 0)]
+    while stack:
+        directory, depth = stack.pop()
+        supervisor.check_cancelled()
+        try:
+            with os.scandir(directory) as entries:
+                entries = sorted(entries, key=lambda e: e.name)
+        except OSError:
+            continue
+        subdirs = []
+        kept = 0
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir(follow_symlinks=False)
+            except OSError:
+                continue
+            if ignore is not None and ignore.ignored(entry.path, is_dir):
+                continue
+            kept += 1
+            if is_dir:
+                if max_depth < 0 or depth < max_depth:
+                    subdirs.append((entry.path, depth + 1))
+            elif name_pattern is None or fnmatch.fnmatch(entry.name, name_pattern):
+                yield entry.path
+        if empty_dirs and not kept:
+            yield directory
+        stack.extend(reversed(subdirs))
+
+
+def is_binary(head):
+    return b"\0" in head
+
+
+def binary_extension(path):
+    return os.path.splitext(path)[1].lower() in BINARY_EXTENSIONS
+
+
+def sniff(path, max_bytes=None, extensions=None):
+    """
+    Cheap checks made before a file is read in full: a known binary
+    extension, an extension outside the `extensions` allowlist (files
+    without one are let through to the content check), a size over
+    max_bytes, then a NUL byte in the first SNIFF_BYTES. Returns
+    (open file positioned after the sniffed head, head) or (None, reason
+    the file was rejected); the caller closes the file.
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext in BINARY_EXTENSIONS:
+        return None, "binary"
+    if extensions is not None and ext and ext not in extensions:
+        return None, "extension"
+    try:
+        f = open(path, "rb")
+    except OSError:
+        return None, "unreadable"
+    try:
+        if max_bytes is not None and os.fstat(f.fileno()).st_size > max_bytes:
+            f.close()
+            return None, "too large"
+        head = f.read(SNIFF_BYTES)
+    except OSError:
+        f.close()
+        return None, "unreadable"
+    if is_binary(head):
+        f.close()
+        return None, "binary"
+    return f, head
+
+
+def _scan(data, size, regex, limit):
+    matches = []
+    line_no, counted_to, pos = 1, 0, 0
+    while len(matches) < limit and pos <= size:
+        match = regex.search(data, pos)
+        if match is None:
+            break
+        start = match.start()
+        line_no += data[counted_to:start].count(b"\n")
+        counted_to = start
+        line_start = data.rfind(b"\n", 0, start) + 1
+        line_end = data.find(b"\n", start)
+        if line_end == -1:
+            line_end = size
+        line = data[line_start:line_end].decode("utf-8", errors="replace")
+        matches.append((line_no, line[:MAX_LINE_CHARS]))
+        # One result per line
+        pos = line_end + 1
+    return matches
+
+
+def search_file(path, regex, limit):
+    """Returns up to `limit` (line number, line) matches of the bytes regex in path."""
+    if binary_extension(path):
+        return []
+    try:
+        with open(path, "rb") as f:
+            head = f.read(SNIFF_BYTES)
+            if is_binary(head):
+                return []
+            size = os.fstat(f.fileno()).st_size
+            if size <= MMAP_MIN_BYTES:
+                data = head + f.read() if len(head) == SNIFF_BYTES else head
+                return _scan(data, len(data), regex, limit)
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return _scan(mm, size, regex, limit)
+    except (OSError, ValueError):
+        return []
+
+
+def search(root, content_pattern=None, name_pattern=None, max_depth=-1, max_results=200,
+           ignore_case=False, workers=None):
+    """
+    Returns (results, truncated). Without content_pattern results are paths;
+    with it they are (path, line number, line) tuples.
+    """
+    root = os.path.abspath(os.path.expanduser(root))
+    ignore = IgnoreRules(root)
+    files = walk_files(root, max_depth, ignore, name_pattern)
+    if not content_pattern:
+        results = []
+        for path in files:
+            if len(results) >= max_results:
+                return results, True
+            results.append(path)
+        return results, False
+
+    flags = re.IGNORECASE if ignore_case else 0
+    regex = re.compile(content_pattern.encode("utf-8"), flags | re.MULTILINE)
+    return search_paths(files, regex, max_results, workers)
+
+
+def search_paths(files, regex, max_results=200, workers=None):
+    """Scans an iterable of paths with a compiled bytes regex; returns (results, truncated)."""
+    workers = workers or min(8, (os.cpu_count() or 2) * 2)
+    results = []
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def scan(paths):
+        for path in paths:
+            if done.is_set():
+                return
+            found = search_file(path, regex, max_results)
+            if not found:
+                continue
+            with lock:
+                for line_no, line in found:
+                    if len(results) >= max_results:
+                        done.set()
+                        return
+                    results.append((path, line_no, line))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        batch = []
+        for path in files:
+            if done.is_set():
+                break
+            batch.append(path)
+            if len(batch) < BATCH_FILES:
+                continue
+            pending.add(pool.submit(scan, batch))
+            batch = []
+            if len(pending) >= workers * 2:
+                _, pending = wait(pending, return_when=FIRST_COMPLETED)
+            supervisor.check_cancelled()
+        if batch and not done.is_set():
+            pool.submit(scan, batch)
+    truncated = done.is_set()
+    results.sort(key=lambda r: (r[0], r[1]))
+    return results, truncated
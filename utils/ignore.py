@@ -0,0 +1,176 @@
+import os
+import re
+import config
+
+# Ignore rules shared by every tool that walks a project (search, indexing,
+# listings, archives, learning). Besides the names in
+# config.PROJECT_CONTEXT_IGNORE, .gitignore files are honoured with git's
+# semantics: nested .gitignore files (loaded once per directory), negation,
+# anchoring, directory-only patterns and "**". Each file's patterns are
+# compiled to regexes once; a combined regex answers the common "nothing
+# matches" case in a single call.
+
+
+def _translate(pattern):
+    """Regex source for a gitignore glob (without "!" or a trailing "/")."""
+    out = []
+    i = 0
+    while i < len(pattern):
+        c = pattern[i]
+        if c == "*":
+            if pattern[i:i + 2] == "**":
+                at_start = i == 0 or pattern[i - 1] == "/"
+                after = pattern[i + 2:i + 3]
+                if at_start and after == "/":
+                    out.append("(?:.*/)?")  # "**/": zero or more directories
+                    i += 3
+                    continue
+                if at_start and after == "":
+                    out.append(".*")  # trailing "/**": everything inside
+                    i += 2
+                    continue
+            out.append("[^/]*")
+            while i < len(pattern) and pattern[i] == "*":
+                i += 1
+            continue
+        if c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            end = pattern.find("]", i + 2 if pattern[i + 1:i + 2] in ("!", "^") else i + 1)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:end]
+                if body[:1] in ("!", "^"):
+                    body = "^" + body[1:]
+                out.append("[" + body.replace("\\", "\\\\") + "]")
+                i = end
+        elif c == "\\" and i + 1 < len(pattern):
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+def parse_line(line):
+    """(regex source, negated, dir_only) for one .gitignore line, or None."""
+    line = line.rstrip("\n").rstrip("\r")
+    # Trailing spaces are ignored unless escaped
+    while line.endswith(" ") and not line.endswith("\\ "):
+        line = line[:-1]
+    if not line or line.startswith("#"):
+        return None
+    negated = line.startswith("!")
+    if negated:
+        line = line[1:]
+    elif line.startswith(("\\#", "\\!")):
+        line = line[1:]
+    dir_only = line.endswith("/")
+    line = line.rstrip("/")
+    if not line:
+        return None
+    # A slash anywhere but the end anchors the pattern to the file's directory
+    anchored = "/" in line
+    line = line.lstrip("/")
+    source = _translate(line)
+    if not anchored:
+        source = "(?:.*/)?" + source
+    return source, negated, dir_only
+
+
+class RuleSet:
+    """The patterns of one ignore file, matched against paths relative to its directory."""
+
+    def __init__(self, lines):
+        self.rules = []  # (compiled regex, negated, dir_only)
+        for line in lines:
+            parsed = parse_line(line)
+            if parsed is not None:
+                source, negated, dir_only = parsed
+                self.rules.append((re.compile(source + r"\Z", re.DOTALL), negated, dir_only))
+        sources = [rule.pattern for rule, _, _ in self.rules]
+        self.any = re.compile("|".join(f"(?:{s})" for s in sources), re.DOTALL) if sources else None
+
+    def match(self, rel, is_dir):
+        """True if ignored, False if re-included by a "!" pattern, None if no pattern matches."""
+        if self.any is None or not self.any.match(rel):
+            return None
+        # Last matching pattern wins
+        for regex, negated, dir_only in reversed(self.rules):
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel):
+                return not negated
+        return None
+
+    @classmethod
+    def from_file(cls, path):
+        try:
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                return cls(f.readlines())
+        except OSError:
+            return None
+
+
+class IgnoreRules:
+    """
+    Ignore rules for walking a project: the names in config.PROJECT_CONTEXT_IGNORE
+    plus .git/info/exclude and every .gitignore from root down to the path.
+    """
+
+    def __init__(self, root, extra=()):
+        self.root = os.path.abspath(root)
+        self.names = set(config.PROJECT_CONTEXT_IGNORE) | set(extra)
+        self._chains = {}  # directory relative to root ("" for root) -> _chain()
+        exclude = RuleSet.from_file(os.path.join(self.root, ".git", "info", "exclude"))
+        self._exclude = exclude if exclude is not None and exclude.rules else None
+
+    def _chain(self, rel_dir):
+        """[(offset of the path within rel_dir's subtree, RuleSet)] for rel_dir and its parents, deepest first."""
+        chain = self._chains.get(rel_dir)
+        if chain is None:
+            chain = list(self._chain(rel_dir.rpartition("/")[0])) if rel_dir else []
+            rules = RuleSet.from_file(os.path.join(self.root, rel_dir, ".gitignore"))
+            if rules is not None and rules.rules:
+                chain.insert(0, (len(rel_dir) + 1 if rel_dir else 0, rules))
+            self._chains[rel_dir] = chain
+        return chain
+
+    def _relative(self, path):
+        if path.startswith(self.root + os.sep):
+            rel = path[len(self.root) + 1:]
+        else:
+            rel = os.path.relpath(os.path.abspath(path), self.root)
+        return rel.replace(os.sep, "/")
+
+    def ignored(self, path, is_dir=False):
+        """
+        Whether path is ignored, assuming its parent directories are not
+        (which holds for walks that skip ignored directories).
+        """
+        if os.path.basename(path) in self.names:
+            return True
+        rel = self._relative(path)
+        if rel.startswith("../"):
+            return False
+        # Deeper .gitignore files take precedence over shallower ones
+        for offset, rules in self._chain(rel.rpartition("/")[0]):
+            decision = rules.match(rel[offset:], is_dir)
+            if decision is not None:
+                return decision
+        if self._exclude is not None:
+            return bool(self._exclude.match(rel, is_dir))
+        return False
+
+    def ignored_path(self, path):
+        """Like ignored(), but also checks every parent directory up to root."""
+        rel = self._relative(path)
+        if rel.startswith("../"):
+            return False
+        parts = rel.split("/")
+        for depth in range(1, len(parts)):
+            if self.ignored(os.path.join(self.root, *parts[:depth]), is_dir=True):
+                return True
+        return self.ignored(os.path.join(self.root, *parts), os.path.isdir(path))
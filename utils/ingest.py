@@ -0,0 +1,386 @@
+import time
+import queue
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import config
+from utils import supervisor, file_search, documents
+from utils.chunking import chunk_source
+
+# Staged ingestion for the learn_* tools: read -> filter -> chunk -> embed ->
+# upsert. Reader threads read, filter and chunk files and hand them over
+# through a bounded queue, so at most INGEST_QUEUE_SIZE files' chunks are in
+# memory at once. One thread packs chunks into batches capped by count and
+# characters and embeds them, and another upserts them. Failed embeds and
+# upserts are retried with backoff; an upsert batch that keeps failing is
+# split in half until the failing files are isolated and reported, so one
+# bad file does not lose the rest. Documents (PDF) skip the readers: they
+# are extracted on a process pool and streamed into the queue page by page.
+# Texts that are not files (crawled pages) are streamed in the same way.
+_DONE = object()
+PROGRESS_INTERVAL = 2.0
+
+
+class Report:
+    def __init__(self, total=None):
+        self.lock = threading.Lock()
+        self.total = total
+        self.counts = {"files": 0, "read": 0, "skipped": 0, "chunks": 0, "stored": 0, "batches": 0,
+                       "documents": 0, "cached": 0, "removed": 0,
+                       "resumed": 0}
+        self.skipped = {}
+        self.failed = {}  # source -> error
+        self.started = time.monotonic()
+
+    def add(self, key, n=1):
+        with self.lock:
+            self.counts[key] += n
+
+    def skip(self, path, reason):
+        with self.lock:
+            self.counts["skipped"] += 1
+            self.skipped[reason] = self.skipped.get(reason, 0) + 1
+
+    def fail(self, sources, error):
+        with self.lock:
+            for source in sources:
+                self.failed[source] = str(error)[:200]
+
+    def as_dict(self):
+        with self.lock:
+            return dict(
+                self.counts, skipped_reasons=dict(self.skipped), failed=dict(self.failed),
+                seconds=round(time.monotonic() - self.started, 2),
+            )
+
+
+def read_text(path, max_bytes=None):
+    """Returns (text, None) or (None, reason the file was skipped)."""
+    f, head = file_search.sniff(
+        path, max_bytes or config.INGEST_MAX_FILE_BYTES, config.INGEST_EXTENSIONS
+    )
+    if f is None:
+        return None, head
+    try:
+        with f:
+            data = head + f.read()
+    except OSError:
+        return None, "unreadable"
+    text = data.decode("utf-8", errors="replace")
+    if not text.strip():
+        return None, "empty"
+    return text, None
+
+
+def _doc_id(source, index):
+    return hashlib.md5(f"{source}#{index}".encode("utf-8")).hexdigest()
+
+
+def _retry(func, attempts):
+    delay = 0.5
+    for attempt in range(attempts):
+        try:
+            return func()
+        except Exception:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(delay)
+            delay *= 2
+
+
+def _default_backend(collection_name):
+    from utils import database
+
+    embed = database.get_embedding_function(collection_name)
+
+    def upsert(ids, texts, metadatas, embeddings):
+        database.upsert_documents(ids, texts, metadatas, embeddings, collection_name=collection_name)
+
+    def delete(sources):
+        database.delete_sources(sources, collection_name=collection_name)
+    return embed, upsert, delete
+
+
+def ingest(paths, collection_name="agent_learning", chunker=chunk_source, embed=None, upsert=None,
+           delete_sources=None, readers=None, report=print, texts=None, removed=(), skip=(), on_done=None):
+    """
+    Runs the pipeline over an iterable of file paths and/or `texts`, an
+    iterable of (source, text, metadata) consumed as it is produced, and
+    returns a Report dict. embed(texts) -> vectors, upsert(ids, texts,
+    metadatas, vectors) and delete_sources(sources) default to the ChromaDB
+    collection; embed may be None to let the store embed on upsert. The
+    chunks of the `removed` sources are deleted first. Sources in `skip`
+    are left alone, and on_done(source) is called once all of a source's
+    chunks are stored (resumable jobs checkpoint with these two).
+    """
+    if upsert is None:
+        embed, upsert, delete_sources = _default_backend(collection_name)
+    skip = set(skip)
+    paths = list(paths)
+    stats = Report(len(paths))
+    if skip:
+        kept = [path for path in paths if path not in skip]
+        stats.add("resumed", len(paths) - len(kept))
+        paths = kept
+    stop = threading.Event()
+    docs_q = queue.Queue(maxsize=config.INGEST_QUEUE_SIZE)
+    batch_q = queue.Queue(maxsize=2)
+    removed = list(removed)
+    if removed and delete_sources is not None:
+        try:
+            _retry(lambda: delete_sources(removed), config.INGEST_RETRIES)
+            stats.add("removed", len(removed))
+        except Exception as e:
+            stats.fail(removed, f"delete failed: {e}")
+
+    def read(path):
+        if stop.is_set():
+            return
+        stats.add("files")
+        text, reason = read_text(path)
+        if text is None:
+            stats.skip(path, reason)
+            return
+        stats.add("read")
+        try:
+            chunks = chunker(text, path)
+        except Exception as e:
+            stats.fail([path], f"chunking failed: {e}")
+            return
+        stats.add("chunks", len(chunks))
+        docs_q.put((path, chunks, 0, True))
+
+    errors = []
+
+    def extract_documents(doc_paths):
+        try:
+            for path, cache_file, outcome in documents.extract_all(doc_paths, stop=stop):
+                if stop.is_set():
+                    return
+                stats.add("files")
+                if cache_file is None:
+                    if outcome == "too large":
+                        stats.skip(path, outcome)
+                    else:
+                        stats.fail([path], f"extraction failed: {outcome}")
+                    continue
+                stats.add("documents")
+                stats.add("cached", int(outcome))
+                index = 0
+                for number, text in enumerate(documents.pages(cache_file), 1):
+                    if stop.is_set():
+                        return
+                    chunks = []
+                    for chunk in chunker(text, path) if text.strip() else []:
+                        meta = dict(chunk[3]) if len(chunk) > 3 else {}
+                        meta["page"] = number
+                        chunks.append(chunk[:3] + (meta,))
+                    if chunks:
+                        stats.add("chunks", len(chunks))
+                        docs_q.put((path, chunks, index, False))
+                        index += len(chunks)
+                if index:
+                    docs_q.put((path, [], index, True))
+                    stats.add("read")
+                else:
+                    stats.skip(path, "no text")
+        except BaseException as e:
+            errors.append(e)
+
+    def consume_texts():
+        try:
+            for source, text, extra in texts:
+                if stop.is_set():
+                    break
+                if source in skip:
+                    stats.add("resumed")
+                    continue
+                stats.add("files")
+                stats.add("read")
+                try:
+                    chunks = [
+                        chunk[:3] + (dict(chunk[3] if len(chunk) > 3 else {}, **extra),)
+                        for chunk in chunker(text, source)
+                    ]
+                except Exception as e:
+                    stats.fail([source], f"chunking failed: {e}")
+                    continue
+                stats.add("chunks", len(chunks))
+                docs_q.put((source, chunks, 0, True))
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            if hasattr(texts, "close"):
+                texts.close()  # stops a generator (a crawl) early
+
+    # Chunks of each source not stored yet, and the sources whose last chunk
+    # has been queued
+    remaining = {}
+    closed = set()
+    track = threading.Lock()
+
+    def finished(source):
+        if on_done is not None:
+            try:
+                on_done(source)
+            except Exception:
+                pass
+
+    def batcher():
+        batch, chars = [], 0
+
+        def flush():
+            texts = [text for _, text, _ in batch]
+            vectors = None
+            if embed is not None:
+                try:
+                    vectors = _retry(lambda: embed(texts), config.INGEST_RETRIES)
+                except Exception as e:
+                    stats.fail(sorted({meta["source"] for _, _, meta in batch}), f"embedding failed: {e}")
+                    return
+            batch_q.put((list(batch), vectors))
+
+        while True:
+            item = docs_q.get()
+            if item is _DONE:
+                break
+            if stop.is_set():
+                continue
+            source, chunks, offset, final = item
+            with track:
+                remaining[source] = remaining.get(source, 0) + len(chunks)
+                if final:
+                    closed.add(source)
+                complete = final and remaining[source] == 0
+            if complete:
+                finished(source)
+            for index, chunk in enumerate(chunks, offset):
+                text, first, last = chunk[:3]
+                meta = {"source": source, "chunk": index, "start_line": first, "end_line": last}
+                if len(chunk) > 3:
+                    meta.update(chunk[3])  # symbol or page metadata
+                batch.append((_doc_id(source, index), text, meta))
+                chars += len(text)
+                if len(batch) >= config.INGEST_BATCH_DOCS or chars >= config.INGEST_BATCH_CHARS:
+                    flush()
+                    batch, chars = [], 0
+        if batch and not stop.is_set():
+            flush()
+        batch_q.put(_DONE)
+
+    cleared = set()
+
+    def store(batch, vectors):
+        sources = sorted({meta["source"] for _, _, meta in batch})
+        try:
+            # A re-ingested file may now have fewer chunks than before
+            fresh = [s for s in sources if s not in cleared]
+            if fresh and delete_sources is not None:
+                _retry(lambda: delete_sources(fresh), config.INGEST_RETRIES)
+                cleared.update(fresh)
+            _retry(lambda: upsert(
+                [d for d, _, _ in batch], [t for _, t, _ in batch], [m for _, _, m in batch], vectors
+            ), config.INGEST_RETRIES)
+            stats.add("batches")
+            stats.add("stored", len(batch))
+            complete = []
+            with track:
+                for _, _, meta in batch:
+                    remaining[meta["source"]] -= 1
+                for source in sources:
+                    if remaining[source] == 0 and source in closed:
+                        complete.append(source)
+            for source in complete:
+                finished(source)
+        except Exception as e:
+            if len(batch) == 1 or len(sources) == 1:
+                stats.fail(sources, e)
+                return
+            half = len(batch) // 2
+            store(batch[:half], vectors[:half] if vectors is not None else None)
+            store(batch[half:], vectors[half:] if vectors is not None else None)
+
+    def writer():
+        while True:
+            item = batch_q.get()
+            if item is _DONE:
+                break
+            if not stop.is_set():
+                store(*item)
+
+    threads = [threading.Thread(target=batcher, daemon=True), threading.Thread(target=writer, daemon=True)]
+    for thread in threads:
+        thread.start()
+    doc_paths = [path for path in paths if documents.is_document(path)]
+    producers = []
+    if doc_paths:
+        producers.append(threading.Thread(target=extract_documents, args=(doc_paths,), daemon=True))
+    if texts is not None:
+        producers.append(threading.Thread(target=consume_texts, daemon=True))
+    for thread in producers:
+        thread.start()
+    workers = readers or config.INGEST_READERS
+    last = time.monotonic()
+
+    def progress():
+        nonlocal last
+        supervisor.check_cancelled()
+        if report and time.monotonic() - last >= PROGRESS_INTERVAL:
+            last = time.monotonic()
+            counts = stats.as_dict()
+            of = "" if texts is not None else f"/{len(paths)}"
+            report(f"📚 Ingest: {counts['files']}{of} files read, {counts['stored']} chunks stored")
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            for path in paths:
+                if doc_paths and documents.is_document(path):
+                    continue
+                pending.add(pool.submit(read, path))
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                progress()
+            for future in pending:
+                future.result()
+        for thread in producers:
+            while thread.is_alive():
+                thread.join(0.2)
+                progress()
+        if errors:
+            raise errors[0]
+    except BaseException:
+        stop.set()
+        raise
+    finally:
+        for thread in producers:
+            thread.join()
+        docs_q.put(_DONE)
+        for thread in threads:
+            thread.join()
+    return stats.as_dict()
+
+
+def format_report(result, collection_name="agent_learning"):
+    lines = [
+        f"Stored {result['stored']} chunks from {result['read'] - len(result['failed'])} files in the "
+        f"'{collection_name}' collection ({result['batches']} batches, {result['seconds']}s)."
+    ]
+    if result.get("resumed"):
+        lines.append(f"Resumed: {result['resumed']} files were already learned before the interruption.")
+    if result.get("removed"):
+        lines.append(f"Removed the chunks of {result['removed']} deleted or renamed files.")
+    if result.get("documents"):
+        lines.append(f"Extracted {result['documents']} documents ({result['cached']} from the text cache).")
+    if result["skipped"]:
+        reasons = ", ".join(f"{n} {reason}" for reason, n in sorted(result["skipped_reasons"].items()))
+        lines.append(f"Skipped {result['skipped']} files ({reasons}).")
+    if result["failed"]:
+        lines.append(f"Failed {len(result['failed'])} files:")
+        for source, error in list(result["failed"].items())[:20]:
+            lines.append(f"  {source}: {error}")
+        if len(result["failed"]) > 20:
+            lines.append(f"  ... and {len(result['failed']) - 20} more")
+    return "\n".join(lines)
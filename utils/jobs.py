@@ -0,0 +1,233 @@
+import os
+import json
+import time
+import uuid
+import queue
+import threading
+import config
+from utils import supervisor
+
+# Background jobs for long ingestion runs (learn_repo, learn_directory,
+# learn_url). submit() returns at once and the job runs on one of
+# config.JOB_WORKERS threads under its own supervisor call, so job_cancel
+# reaches the pipeline's cancellation points. Every source a job finishes
+# storing is appended to <id>.done next to the job's <id>.json record; jobs
+# that were queued or running when the agent exited are marked interrupted,
+# and submitting the same job again resumes it, skipping checkpointed
+# sources. Runners are registered by the tool modules with register().
+ACTIVE = ("queued", "running")
+_runners = {}
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def register(kind, runner):
+    """runner(**params, skip=set, on_done=callable, report=callable) -> result text"""
+    _runners[kind] = runner
+
+
+class Job:
+    def __init__(self, job_id, kind, params, status="queued", created=None, **fields):
+        self.id = job_id
+        self.kind = kind
+        self.params = params
+        self.status = status
+        self.created = created or time.time()
+        self.started = fields.get("started")
+        self.finished = fields.get("finished")
+        self.progress = fields.get("progress", "")
+        self.result = fields.get("result")
+        self.error = fields.get("error")
+        self.attempts = fields.get("attempts", 0)
+        self.checkpointed = fields.get("checkpointed", 0)
+        self.call = None
+        self.cancel_requested = False
+        # report() and the worker both save the record
+        self.save_lock = threading.Lock()
+
+    @property
+    def key(self):
+        return json.dumps([self.kind, self.params], sort_keys=True)
+
+    def to_dict(self):
+        return {
+            "id": self.id, "kind": self.kind, "params": self.params, "status": self.status,
+            "created": self.created, "started": self.started, "finished": self.finished,
+            "progress": self.progress, "result": self.result, "error": self.error,
+            "attempts": self.attempts, "checkpointed": self.checkpointed,
+        }
+
+    def describe(self, full=False):
+        clock = (self.finished or time.time()) - (self.started or self.created)
+        target = ", ".join(f"{k}={v}" for k, v in self.params.items() if v not in (None, False))
+        lines = [f"Job {self.id} ({self.kind} {target}): {self.status}, {clock:.0f}s, "
+                 f"{self.checkpointed} sources checkpointed"]
+        if self.status in ACTIVE and self.progress:
+            lines.append(f"  {self.progress}")
+        if self.error:
+            lines.append(f"  Error: {self.error}")
+        if full and self.result:
+            lines.append(self.result)
+        return "\n".join(lines)
+
+
+class JobManager:
+    def __init__(self, directory=None, workers=None):
+        self.directory = directory or config.JOBS_DIR
+        self.workers = workers or config.JOB_WORKERS
+        self.jobs = {}
+        self.lock = threading.Lock()
+        self.queue = queue.Queue()
+        self.threads = []
+        os.makedirs(self.directory, exist_ok=True)
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(".json"):
+                continue
+            try:
+                with open(os.path.join(self.directory, name), "r", encoding="utf-8") as f:
+                    record = json.load(f)
+                job = Job(record.pop("id"), **record)
+            except (OSError, ValueError, TypeError, KeyError):
+                continue
+            if job.status in ACTIVE:
+                job.status = "interrupted"  # the process it ran in is gone
+                self._save(job)
+            self.jobs[job.id] = job
+
+    def _path(self, job, suffix):
+        return os.path.join(self.directory, job.id + suffix)
+
+    def _save(self, job):
+        path = self._path(job, ".json")
+        with job.save_lock:
+            with open(path + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(job.to_dict(), f)
+            os.replace(path + ".tmp", path)
+
+    def _prune(self):
+        finished = sorted((j for j in self.jobs.values() if j.status == "done"), key=lambda j: j.created)
+        for job in finished[:max(0, len(finished) - config.JOBS_KEEP)]:
+            del self.jobs[job.id]
+            for suffix in (".json", ".done"):
+                try:
+                    os.remove(self._path(job, suffix))
+                except OSError:
+                    pass
+
+    def submit(self, kind, params):
+        """
+        Queues a job, or resumes the unfinished job with the same kind and
+        params. Returns (job, "started" | "resumed" | "already queued" |
+        "already running").
+        """
+        if kind not in _runners:
+            raise ValueError(f"unknown job kind: {kind}")
+        with self.lock:
+            key = Job(None, kind, params).key
+            for job in sorted(self.jobs.values(), key=lambda j: j.created, reverse=True):
+                if job.key != key or job.status == "done":
+                    continue
+                if job.status in ACTIVE:
+                    return job, "already " + job.status
+                job.status, job.error, job.cancel_requested = "queued", None, False
+                break
+            else:
+                job = Job(uuid.uuid4().hex[:8], kind, params)
+                self.jobs[job.id] = job
+            how = "resumed" if job.attempts else "started"
+            self._save(job)
+            self._prune()
+        self.queue.put(job)
+        while len(self.threads) < self.workers:
+            thread = threading.Thread(target=self._work, name=f"job-worker-{len(self.threads)}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+        return job, how
+
+    def _work(self):
+        while True:
+            job = self.queue.get()
+            # A job cancelled while queued and then resubmitted is in the
+            # queue twice; whichever worker claims it first runs it
+            with self.lock:
+                if job.cancel_requested or job.status != "queued":
+                    continue
+                job.status = "running"
+            self._run(job)
+
+    def _run(self, job):
+        checkpoint = self._path(job, ".done")
+        try:
+            with open(checkpoint, "r", encoding="utf-8") as f:
+                done = {line.rstrip("\n") for line in f if line.strip()}
+        except OSError:
+            done = set()
+        job.started, job.finished = time.time(), None
+        job.attempts += 1
+        job.checkpointed = len(done)
+        job.call = supervisor.ToolCall(f"job {job.id}", None)
+        if job.cancel_requested:
+            job.call.cancel()
+        self._save(job)
+        log_lock = threading.Lock()
+        with open(checkpoint, "a", encoding="utf-8") as log:
+            def on_done(source):
+                with log_lock:
+                    log.write(source + "\n")
+                    log.flush()
+                    job.checkpointed += 1
+
+            def report(message):
+                job.progress = message
+                self._save(job)
+
+            try:
+                with supervisor.bound(job.call):
+                    job.result = _runners[job.kind](**job.params, skip=done, on_done=on_done, report=report)
+                job.status = "done"
+            except supervisor.ToolCancelled:
+                job.status = "cancelled"
+            except Exception as e:
+                job.status, job.error = "failed", f"{type(e).__name__}: {e}"
+        job.finished = time.time()
+        job.call = None
+        if job.status == "done":
+            os.remove(checkpoint)
+        self._save(job)
+
+    def cancel(self, job_id):
+        job = self.jobs.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+        with self.lock:
+            if job.status not in ACTIVE:
+                return job
+            job.cancel_requested = True
+            if job.call is not None:
+                job.call.cancel()
+            elif job.status == "queued":
+                job.status = "cancelled"
+                self._save(job)
+        return job
+
+    def wait(self, job_id, timeout=None):
+        deadline = time.monotonic() + timeout if timeout else None
+        job = self.jobs[job_id]
+        while job.status in ACTIVE and (deadline is None or time.monotonic() < deadline):
+            time.sleep(0.05)
+        return job
+
+    def list(self):
+        return sorted(self.jobs.values(), key=lambda j: j.created, reverse=True)
+
+
+def get_manager():
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
+
+
+def submit(kind, **params):
+    return get_manager().submit(kind, params)
@@ -1,7 +1,8 @@
 import os
-from utils.database import store_embedding, store_embeddings
+from utils.database import store_embedding
 from urllib.parse import urlparse
-import config
+from utils import file_search, ingest, supervisor
+from utils.ignore import IgnoreRules
 
 def learn_file_content(file_path, content):
     """
@@ -20,76 +21,70 @@ def is_valid_url(url):
     except ValueError:
         return False
 
-def learn_url(url):
+def learn_url(url, crawl=False, max_depth=None, max_pages=None, same_host=True, **pipeline):
     """
-    Learns the content of a URL and stores its embeddings.
+    Learns the content of a URL and stores its embeddings. With crawl, also
+    follows its links breadth first up to max_depth levels and max_pages pages.
+    `pipeline` is passed to ingest.ingest.
     """
-    from utils.web_scraper import scrape_text
+    from utils.crawler import Crawler
 
     if not is_valid_url(url):
         return f"Invalid URL: {url}"
 
+    crawler = Crawler(
+        max_depth=max_depth if crawl else 0, max_pages=max_pages if crawl else 1, same_host=same_host,
+        deferred=True,
+    )
+    on_done = pipeline.pop("on_done", None)
+    skip = set(pipeline.get("skip", ()))
+
+    def stored(source):
+        # Only pages whose chunks were stored get cached validators, so a
+        # failed or cancelled page is fetched and learned again next time
+        crawler.confirm(source)
+        if on_done is not None:
+            on_done(source)
+
     try:
-        content = scrape_text(url)
-        if content:
-            # We could chunk this for larger pages
-            store_embedding(content, {"source": url}, collection_name="agent_learning")
-            return f"Successfully learned content from {url}"
-        else:
-            return f"Could not retrieve content from {url}"
+        result = ingest.ingest(
+            [], collection_name="agent_learning", texts=crawler.crawl(url), on_done=stored, **pipeline
+        )
+    except supervisor.ToolCancelled:
+        raise
     except Exception as e:
         return f"An error occurred while learning from URL {url}: {e}"
-
-
-def learn_directory(path):
+    finally:
+        for source in skip:
+            crawler.confirm(source)  # stored by an earlier, interrupted run
+        crawler.save()
+    stats = crawler.stats
+    if not crawl and not result["stored"] and not result["failed"] and not result["resumed"]:
+        if stats["not_modified"]:
+            return f"{url} has not changed since it was last learned."
+        if crawler.errors:
+            return f"Could not retrieve content from {url}: {crawler.errors.get(url, '')}"
+        return f"Could not retrieve content from {url}"
+    lines = [
+        f"Learned {url}: {stats['fetched']} pages fetched, {stats['not_modified']} unchanged, "
+        f"{stats['skipped']} skipped, {stats['errors']} errors.",
+        ingest.format_report(result, "agent_learning"),
+    ]
+    for failed, error in list(crawler.errors.items())[:10]:
+        lines.append(f"  {failed}: {error}")
+    return "\n".join(lines)
+
+
+def learn_directory(path, **pipeline):
     """
     Recursively learns files in a directory and stores their embeddings.
+    `pipeline` is passed to ingest.ingest.
     """
     path = os.path.expanduser(path)
 
     if not os.path.isdir(path):
         return f"Path is not a valid directory: {path}"
 
-    batch_contents = []
-    batch_metadatas = []
-    batch_size = 50
-
-    for root, _, files in os.walk(path):
-        # Skip ignored directories
-        if any(f"/{ignored}/" in root.replace(path, "") for ignored in config.PROJECT_CONTEXT_IGNORE) or any(root.endswith(ignored) for ignored in config.PROJECT_CONTEXT_IGNORE):
-            continue
-
-        for file in files:
-            # Skip ignored files
-            if file in config.PROJECT_CONTEXT_IGNORE:
-                continue
-
-            file_path = os.path.join(root, file)
-            try:
-                with open(file_path, "r", errors="ignore") as f:
-                    content = f.read()
-
-                batch_contents.append(content)
-                batch_metadatas.append({"source": file_path})
-                print(f"  - Reading {file_path}")
-
-            except Exception as e:
-                print(f"  - Error reading {file_path}: {e}")
-                continue
-
-            if len(batch_contents) >= batch_size:
-                if store_embeddings(batch_contents, batch_metadatas, collection_name="agent_learning"):
-                    print(f"  - Stored batch of {len(batch_contents)} files")
-                else:
-                    print(f"  - Error storing batch of {len(batch_contents)} files")
-                batch_contents = []
-                batch_metadatas = []
-
-    # Process remaining items
-    if batch_contents:
-        if store_embeddings(batch_contents, batch_metadatas, collection_name="agent_learning"):
-            print(f"  - Stored final batch of {len(batch_contents)} files")
-        else:
-            print(f"  - Error storing final batch of {len(batch_contents)} files")
-
-    return f"Finished learning directory: {path}"
+    files = file_search.walk_files(path, ignore=IgnoreRules(path))
+    result = ingest.ingest(files, collection_name="agent_learning", **pipeline)
+    return f"Finished learning directory: {path}\n" + ingest.format_report(result, "agent_learning")
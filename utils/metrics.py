@@ -0,0 +1,141 @@
+import os
+import json
+import time
+import threading
+import config
+from utils import tool_cache
+
+# Aggregates token usage and wall-clock time for the running session.
+# Model calls are recorded by GenerativeModelWrapper, tool calls by the
+# dispatchers; get_usage_stats and the entry points read it back.
+_lock = threading.RLock()
+_session = None
+
+
+def _empty_bucket():
+    return {
+        "calls": 0,
+        "prompt_tokens": 0,
+        "candidate_tokens": 0,
+        "cached_tokens": 0,
+        "total_tokens": 0,
+        "seconds": 0.0,
+    }
+
+
+def start_session(user_id="default_user"):
+    """Begins a fresh accounting session and returns its id."""
+    global _session
+    started = time.time()
+    with _lock:
+        _session = {
+            "session_id": f"{user_id}-{int(started)}",
+            "user_id": user_id,
+            "started": started,
+            "totals": _empty_bucket(),
+            "models": {},
+            "tools": {},
+            "calls": [],
+        }
+    return _session["session_id"]
+
+
+def _current():
+    if _session is None:
+        start_session()
+    return _session
+
+
+def _usage_value(usage, name):
+    return (getattr(usage, name, None) or 0) if usage is not None else 0
+
+
+def record_model_call(model, usage_metadata, seconds):
+    """Adds one generate_content call and its usage metadata."""
+    entry = {
+        "kind": "model",
+        "name": model,
+        "prompt_tokens": _usage_value(usage_metadata, "prompt_token_count"),
+        "candidate_tokens": _usage_value(usage_metadata, "candidates_token_count"),
+        "cached_tokens": _usage_value(usage_metadata, "cached_content_token_count"),
+        "total_tokens": _usage_value(usage_metadata, "total_token_count"),
+        "seconds": seconds,
+    }
+    with _lock:
+        session = _current()
+        for bucket in (session["totals"], session["models"].setdefault(model, _empty_bucket())):
+            bucket["calls"] += 1
+            for key in ("prompt_tokens", "candidate_tokens", "cached_tokens", "total_tokens", "seconds"):
+                bucket[key] += entry[key]
+        entry["index"] = len(session["calls"])
+        session["calls"].append(entry)
+
+
+def record_tool_call(name, seconds, result=None):
+    """Adds one tool execution. The result size hints at the tokens it will cost later."""
+    result_chars = len(result) if isinstance(result, str) else len(str(result or ""))
+    with _lock:
+        session = _current()
+        bucket = session["tools"].setdefault(name, {"calls": 0, "seconds": 0.0, "result_chars": 0})
+        bucket["calls"] += 1
+        bucket["seconds"] += seconds
+        bucket["result_chars"] += result_chars
+        session["calls"].append({
+            "kind": "tool",
+            "name": name,
+            "seconds": seconds,
+            "result_chars": result_chars,
+            "index": len(session["calls"]),
+        })
+
+
+def get_stats(top=5):
+    """Returns the session aggregates plus the most expensive calls."""
+    with _lock:
+        session = _current()
+        calls = list(session["calls"])
+        model_calls = [c for c in calls if c["kind"] == "model"]
+        return {
+            "session_id": session["session_id"],
+            "elapsed_seconds": round(time.time() - session["started"], 3),
+            "totals": dict(session["totals"]),
+            "models": {k: dict(v) for k, v in session["models"].items()},
+            "tools": {k: dict(v) for k, v in session["tools"].items()},
+            "tool_cache": tool_cache.stats(),
+            "top_by_tokens": sorted(model_calls, key=lambda c: c["total_tokens"], reverse=True)[:top],
+            "top_by_time": sorted(calls, key=lambda c: c["seconds"], reverse=True)[:top],
+        }
+
+
+def format_summary(stats=None):
+    stats = stats or get_stats()
+    totals = stats["totals"]
+    lines = [
+        f"📊 Session {stats['session_id']}: {totals['calls']} model calls, "
+        f"{totals['prompt_tokens']} prompt / {totals['candidate_tokens']} candidate / "
+        f"{totals['cached_tokens']} cached tokens, {totals['seconds']:.2f}s in the model",
+    ]
+    cache = stats.get("tool_cache") or {}
+    if cache.get("hits") or cache.get("misses"):
+        lines.append(f"   ♻️ tool cache: {cache['hits']} hits / {cache['misses']} misses")
+    for name, bucket in sorted(stats["tools"].items(), key=lambda kv: kv[1]["seconds"], reverse=True):
+        lines.append(
+            f"   🛠️ {name}: {bucket['calls']} calls, {bucket['seconds']:.2f}s, "
+            f"{bucket['result_chars']} result chars"
+        )
+    return "\n".join(lines)
+
+
+def dump_session(path=None):
+    """Appends the session stats as one JSON line to the metrics log and returns them."""
+    stats = get_stats()
+    path = os.path.expanduser(path or config.METRICS_LOG_PATH)
+    try:
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(stats) + "\n")
+    except OSError as e:
+        print(f"⚠️ Could not write metrics to {path}: {e}")
+    return stats
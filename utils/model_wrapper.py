@@ -1,10 +1,15 @@
+import time
 from google.genai import types
 import google.genai as genai
 import config
+from utils import tracing, metrics
 
 class GenerativeModelWrapper:
     def __init__(self, model_name, system_instruction=None, safety_settings=None, tools=None):
-        self.client = genai.Client(api_key=config.API_KEY)
+        http_options = None
+        if config.GEMINI_BASE_URL:
+            http_options = types.HttpOptions(base_url=config.GEMINI_BASE_URL)
+        self.client = genai.Client(api_key=config.API_KEY, http_options=http_options)
         self.model_id = model_name
         self.system_instruction = system_instruction
         self.safety_settings = None # Ensure no old-style lists cause 'values' errors
@@ -84,14 +89,20 @@ class GenerativeModelWrapper:
         # Explicitly prepare tools by checking for callables
         sdk_tools = self._prepare_tools(tools or self.tools)
 
-        return self.client.models.generate_content(
-            model=self.model_id,
-            contents=formatted_history,
-            config=types.GenerateContentConfig(
-                system_instruction=self.system_instruction,
-                tools=sdk_tools
+        start = time.perf_counter()
+        with tracing.span("generate_content", category="model", model=self.model_id):
+            response = self.client.models.generate_content(
+                model=self.model_id,
+                contents=formatted_history,
+                config=types.GenerateContentConfig(
+                    system_instruction=self.system_instruction,
+                    tools=sdk_tools
+                )
             )
+        metrics.record_model_call(
+            self.model_id, getattr(response, "usage_metadata", None), time.perf_counter() - start
         )
+        return response
 
     def count_tokens(self, text):
         return self.client.models.count_tokens(model=self.model_id, contents=text)
\ No newline at end of file
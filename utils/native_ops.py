@@ -0,0 +1,328 @@
+import os
+import re
+import pwd
+import grp
+import stat
+import time
+import fnmatch
+import difflib
+from concurrent.futures import ThreadPoolExecutor
+from utils import supervisor, file_search, patching
+from utils.ignore import IgnoreRules
+
+# In-process versions of the file tools that used to shell out to stat,
+# chmod and sed (a /bin/sh plus a child per call), and the batched
+# regex_replace. Only the common forms are handled here; callers fall back
+# to the external command when parse_sed() returns None.
+DIFF_LINES = 200
+
+_WHO = {"u": stat.S_IRWXU | stat.S_ISUID, "g": stat.S_IRWXG | stat.S_ISGID, "o": stat.S_IRWXO | stat.S_ISVTX}
+_PERM = {
+    "r": stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH,
+    "w": stat.S_IWUSR | stat.S_IWGRP | stat.S_IWOTH,
+    "x": stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH,
+    "s": stat.S_ISUID | stat.S_ISGID,
+    "t": stat.S_ISVTX,
+}
+_CLAUSE = re.compile(r"^([ugoa]*)([-+=])([rwxXst]*)$")
+
+
+def _name(table, key):
+    try:
+        return table(key)[0]
+    except KeyError:
+        return str(key)
+
+
+def _stamp(ns):
+    seconds, frac = divmod(ns, 10**9)
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(seconds)) + f".{frac:09d} " + time.strftime(
+        "%z", time.localtime(seconds)
+    )
+
+
+def _kind(mode):
+    for test, label in (
+        (stat.S_ISREG, "regular file"), (stat.S_ISDIR, "directory"), (stat.S_ISLNK, "symbolic link"),
+        (stat.S_ISFIFO, "fifo"), (stat.S_ISSOCK, "socket"), (stat.S_ISCHR, "character special file"),
+        (stat.S_ISBLK, "block special file"),
+    ):
+        if test(mode):
+            return label
+    return "unknown"
+
+
+def stat_text(path):
+    """The fields of coreutils `stat PATH`, without spawning it."""
+    st = os.lstat(path)
+    name = f"{path} -> {os.readlink(path)}" if stat.S_ISLNK(st.st_mode) else path
+    if stat.S_ISREG(st.st_mode) and st.st_size == 0:
+        kind = "regular empty file"
+    else:
+        kind = _kind(st.st_mode)
+    return "\n".join([
+        f"  File: {name}",
+        f"  Size: {st.st_size:<15} Blocks: {getattr(st, 'st_blocks', 0):<10} "
+        f"IO Block: {getattr(st, 'st_blksize', 0):<6} {kind}",
+        f"Device: {os.major(st.st_dev)},{os.minor(st.st_dev)}\tInode: {st.st_ino:<11} Links: {st.st_nlink}",
+        f"Access: ({stat.S_IMODE(st.st_mode):04o}/{stat.filemode(st.st_mode)})  "
+        f"Uid: ({st.st_uid:5}/{_name(pwd.getpwuid, st.st_uid):>8})   "
+        f"Gid: ({st.st_gid:5}/{_name(grp.getgrgid, st.st_gid):>8})",
+        f"Access: {_stamp(st.st_atime_ns)}",
+        f"Modify: {_stamp(st.st_mtime_ns)}",
+        f"Change: {_stamp(st.st_ctime_ns)}",
+    ])
+
+
+def parse_mode(spec, current, is_dir=False):
+    """New permission bits for an octal ("755") or symbolic ("u+x,go-w") chmod mode."""
+    spec = spec.strip()
+    if re.fullmatch(r"(0o)?[0-7]{1,4}", spec):
+        return int(spec[2:] if spec.startswith("0o") else spec, 8)
+    mode = stat.S_IMODE(current)
+    umask = os.umask(0)
+    os.umask(umask)
+    for clause in spec.split(","):
+        match = _CLAUSE.match(clause)
+        if not match:
+            raise ValueError(f"invalid mode: {spec!r}")
+        who, op, perms = match.groups()
+        # No "who" means "a", limited by the umask like chmod(1) does
+        mask = 0
+        for letter in who.replace("a", "ugo") or "ugo":
+            mask |= _WHO[letter]
+        bits = 0
+        for letter in perms:
+            if letter == "X":
+                if is_dir or mode & (stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH):
+                    bits |= _PERM["x"]
+            else:
+                bits |= _PERM[letter]
+        bits &= mask
+        if not who:
+            bits &= ~umask
+        if op == "+":
+            mode |= bits
+        elif op == "-":
+            mode &= ~bits
+        else:
+            mode = (mode & ~mask) | bits
+    return mode
+
+
+def chmod(path, spec):
+    st = os.stat(path)
+    mode = parse_mode(spec, st.st_mode, stat.S_ISDIR(st.st_mode))
+    os.chmod(path, mode)
+    return mode
+
+
+# GNU word and buffer anchors, which Python would read as literal characters
+_GNU_ANCHORS = {"<": r"\b(?=\w)", ">": r"\b(?<=\w)", "`": r"\A", "'": r"\Z"}
+
+
+def _bre_to_python(pattern):
+    """
+    Translates a sed basic regular expression to Python re syntax, or returns
+    None for POSIX [:class:], [.coll.] and [=equiv=] brackets, which re lacks.
+    """
+    out = []
+    i = 0
+    in_class = False
+    while i < len(pattern):
+        c = pattern[i]
+        if in_class:
+            if c == "[" and pattern[i + 1:i + 2] in (":", ".", "="):
+                return None
+            if c == "]" and out[-1] not in ("[", "^"):
+                in_class = False
+            elif c == "\\":
+                c = "\\\\"  # backslash is literal inside POSIX brackets
+            out.append(c)
+        elif c == "\\" and i + 1 < len(pattern):
+            nxt = pattern[i + 1]
+            if nxt in _GNU_ANCHORS:
+                out.append(_GNU_ANCHORS[nxt])
+            else:
+                out.append(nxt if nxt in "(){}+?|" else c + nxt)
+            i += 1
+        elif c in "(){}+?|":
+            out.append("\\" + c)
+        else:
+            if c == "[":
+                in_class = True
+            out.append(c)
+        i += 1
+    return "".join(out)
+
+
+def _sed_replacement(text):
+    """
+    sed replacement syntax (&, \\1, \\n) as a function usable with re.sub, or
+    None if it changes case with GNU's \\U, \\L, \\u, \\l or \\E.
+    """
+    parts = []
+    i = 0
+    while i < len(text):
+        c = text[i]
+        if c == "&":
+            parts.append(0)
+        elif c == "\\" and i + 1 < len(text):
+            nxt = text[i + 1]
+            i += 1
+            if nxt in "ULulE":
+                return None
+            if nxt.isdigit():
+                parts.append(int(nxt))
+            else:
+                parts.append({"n": "\n", "t": "\t"}.get(nxt, nxt))
+        else:
+            parts.append(c)
+        i += 1
+
+    def expand(match):
+        return "".join(match.group(p) or "" if isinstance(p, int) else p for p in parts)
+    return expand
+
+
+def _split_sed(expression, delim, start):
+    """Splits the s///flags fields, honouring escaped delimiters."""
+    fields, current = [], []
+    i = start
+    while i < len(expression) and len(fields) < 2:
+        c = expression[i]
+        if c == "\\" and i + 1 < len(expression):
+            nxt = expression[i + 1]
+            current.append(nxt if nxt == delim else c + nxt)
+            i += 2
+            continue
+        if c == delim:
+            fields.append("".join(current))
+            current = []
+        else:
+            current.append(c)
+        i += 1
+    if len(fields) < 2:
+        return None
+    return fields[0], fields[1], expression[i:]
+
+
+def _matches_empty(regex):
+    return any(m.start() == m.end() for probe in ("", "a", "a_ 1") for m in regex.finditer(probe))
+
+
+def parse_sed(expression):
+    """
+    Parses `s/regex/replacement/[gIi<n>]` commands separated by ";" or
+    newlines into (compiled regex, replace function, count) tuples, or
+    returns None if the expression uses anything else.
+    """
+    commands = []
+    rest = expression.strip()
+    while rest:
+        if len(rest) < 2 or rest[0] != "s" or rest[1].isalnum() or rest[1] in "\\\n ":
+            return None
+        parsed = _split_sed(rest, rest[1], 2)
+        if parsed is None:
+            return None
+        pattern, replacement, tail = parsed
+        flags_match = re.match(r"([gIi0-9]*)\s*(?:[;\n]\s*|$)", tail)
+        if not flags_match:
+            return None
+        flags = flags_match.group(1)
+        occurrence = int("".join(c for c in flags if c.isdigit()) or 0)
+        if occurrence > 1:
+            return None  # "replace the Nth match" is left to sed
+        translated = _bre_to_python(pattern)
+        replace = _sed_replacement(replacement)
+        if translated is None or replace is None:
+            return None
+        try:
+            regex = re.compile(translated, re.IGNORECASE if set(flags) & {"I", "i"} else 0)
+        except re.error:
+            return None
+        # re and sed place empty matches differently (s/a*/X/g), so only the
+        # bare line anchors may match nothing
+        if pattern not in ("^", "$", "^$") and _matches_empty(regex):
+            return None
+        commands.append((regex, replace, 0 if "g" in flags else 1))
+        rest = tail[flags_match.end():]
+    return commands or None
+
+
+def apply_sed(commands, text):
+    """Runs parsed s commands over each line of text, like sed does."""
+    # Only "\n" ends a line for sed; the text after a final newline is not a line
+    lines = text.split("\n")
+    last = len(lines) - 1 if lines[-1] == "" else len(lines)
+    for index in range(last):
+        line = lines[index]
+        for regex, replace, count in commands:
+            line = regex.sub(replace, line, count=count)
+        lines[index] = line
+    return "\n".join(lines)
+
+
+def _matches(rel, name, file_glob):
+    # Patterns with a slash match the relative path; bare ones match any depth
+    return fnmatch.fnmatch(rel if "/" in file_glob else name, file_glob)
+
+
+def select_files(root, file_glob="*", include_ignored=False):
+    root = os.path.abspath(os.path.expanduser(root))
+    if os.path.isfile(root):
+        return [root]
+    ignore = None if include_ignored else IgnoreRules(root)
+    prefix = len(root) + 1
+    return [
+        path for path in file_search.walk_files(root, ignore=ignore)
+        if _matches(path[prefix:].replace(os.sep, "/"), os.path.basename(path), file_glob)
+    ]
+
+
+def _replace_in(path, regex, replacement):
+    try:
+        with open(path, "rb") as f:
+            head = f.read(file_search.SNIFF_BYTES)
+            if file_search.is_binary(head):
+                return None
+            data = head + f.read()
+        original = data.decode("utf-8")
+    except (OSError, UnicodeDecodeError):
+        return None
+    updated, count = regex.subn(replacement, original)
+    if not count or updated == original:
+        return None
+    return path, original, updated, {"replacements": count}
+
+
+def regex_replace(root, pattern, replacement, file_glob="*", ignore_case=False, multiline=False, dry_run=False,
+                  include_ignored=False, workers=None):
+    """
+    Substitutes a Python regex across every matching text file under root,
+    all files or none. Returns (changes, files scanned, diff text).
+    """
+    root = os.path.abspath(os.path.expanduser(root))
+    flags = (re.IGNORECASE if ignore_case else 0) | (re.MULTILINE | re.DOTALL if multiline else re.MULTILINE)
+    regex = re.compile(pattern, flags)
+    files = select_files(root, file_glob, include_ignored)
+    changes = []
+    with ThreadPoolExecutor(max_workers=workers or min(8, (os.cpu_count() or 2) * 2)) as pool:
+        for result in pool.map(lambda path: _replace_in(path, regex, replacement), files):
+            if result is not None:
+                changes.append(result)
+            supervisor.check_cancelled()
+    diff = []
+    if dry_run:
+        base = root if os.path.isdir(root) else os.path.dirname(root)
+        for path, original, updated, _ in changes:
+            rel = os.path.relpath(path, base)
+            diff.extend(difflib.unified_diff(
+                original.splitlines(), updated.splitlines(), f"a/{rel}", f"b/{rel}", n=1, lineterm=""
+            ))
+            if len(diff) > DIFF_LINES:
+                diff = diff[:DIFF_LINES] + ["... (diff truncated)"]
+                break
+    else:
+        patching.commit(changes)
+    return changes, len(files), "\n".join(diff)
@@ -0,0 +1,334 @@
+import os
+import re
+import stat
+import difflib
+import tempfile
+
+# Multi-file patches for apply_patch. A patch is either a unified diff or a
+# set of search/replace blocks:
+#
+#     path/to/file.py
+#     <<<<<<< SEARCH
+#     old lines
+#     =======
+#     new lines
+#     >>>>>>> REPLACE
+#
+# Every hunk is located first (exactly, then ignoring whitespace, then with
+# up to FUZZ context lines trimmed from each end), and nothing is written
+# unless all files apply. The files are then swapped in with os.replace and
+# restored if any swap fails, so a patch lands completely or not at all.
+FUZZ = 2
+
+_HUNK_HEADER = re.compile(r"^@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@")
+_SEARCH = re.compile(r"^<{5,9} ?SEARCH\s*$")
+_DIVIDER = re.compile(r"^={5,9}\s*$")
+_REPLACE = re.compile(r"^>{5,9} ?REPLACE\s*$")
+# Extended header lines git puts between the files of a diff
+_GIT_HEADERS = (
+    "diff ", "index ", "new file mode", "deleted file mode", "old mode", "new mode", "similarity index",
+    "dissimilarity index", "rename from", "rename to", "copy from", "copy to", "Binary files",
+)
+
+
+class PatchError(Exception):
+    pass
+
+
+class FilePatch:
+    def __init__(self, path):
+        self.path = path
+        self.hunks = []  # (old lines, new lines, line hint or None)
+        self.create = False
+        self.delete = False
+
+
+def _strip_prefix(path):
+    path = path.split("\t")[0].strip()
+    if path.startswith(("a/", "b/")):
+        path = path[2:]
+    return path
+
+
+def _is_file_header(lines, i):
+    # A removed "-- comment" line followed by an added "++ ..." one looks the
+    # same, so a file header also needs a hunk header right after it
+    return (
+        lines[i].startswith("--- ") and i + 2 < len(lines) and lines[i + 1].startswith("+++ ")
+        and lines[i + 2].startswith("@@")
+    ) or (lines[i].startswith("--- ") and i + 1 < len(lines) and lines[i + 1] == "+++ /dev/null")
+
+
+def parse_unified(text):
+    """
+    Hunk bodies run up to the next hunk or file header; the @@ line counts
+    are only a hint, as models often get them wrong or leave them out.
+    """
+    patches = []
+    lines = text.splitlines()
+    i = 0
+    current = None
+    while i < len(lines):
+        line = lines[i]
+        if line.startswith("--- ") and i + 1 < len(lines) and lines[i + 1].startswith("+++ "):
+            old, new = line[4:].strip(), lines[i + 1][4:].strip()
+            current = FilePatch(_strip_prefix(old if new == "/dev/null" else new))
+            current.create = old == "/dev/null"
+            current.delete = new == "/dev/null"
+            patches.append(current)
+            i += 2
+            continue
+        if line.startswith("@@") and current is not None:
+            header = _HUNK_HEADER.match(line)
+            want_old = None
+            if header:
+                want_old = int(header.group(2) if header.group(2) is not None else 1)
+            body = []
+            i += 1
+            while i < len(lines) and not lines[i].startswith(("@@", "diff ")) and not _is_file_header(lines, i):
+                if not lines[i].startswith(("-", "+", " ", "\\")) and lines[i] != "":
+                    break
+                body.append(lines[i])
+                i += 1
+            old_lines, new_lines = [], []
+            for entry in body:
+                if entry.startswith("\\"):
+                    continue  # "\ No newline at end of file"
+                if entry.startswith("-"):
+                    old_lines.append(entry[1:])
+                elif entry.startswith("+"):
+                    new_lines.append(entry[1:])
+                else:
+                    # Context; editors sometimes drop the space on blank lines
+                    old_lines.append(entry[1:])
+                    new_lines.append(entry[1:])
+            # Blank lines after the last hunk are separators, not context
+            while body and body[-1] == "" and (want_old is None or len(old_lines) > want_old):
+                body.pop()
+                old_lines.pop()
+                new_lines.pop()
+            if old_lines == new_lines:
+                raise PatchError(f"{current.path}: hunk {line.strip()} changes nothing")
+            start = int(header.group(1)) if header else None
+            if header and header.group(2) == "0":
+                start += 1  # "-N,0" inserts after line N
+            current.hunks.append((old_lines, new_lines, start))
+            continue
+        if current is not None and line.strip() and not line.startswith(_GIT_HEADERS):
+            raise PatchError(f"{current.path}: unexpected line outside a hunk: {line!r}")
+        i += 1
+    for patch in patches:
+        if not patch.hunks and not patch.create and not patch.delete:
+            raise PatchError(f"{patch.path}: no hunks found")
+    return patches
+
+
+def parse_search_replace(text):
+    patches = {}
+    lines = text.splitlines()
+    path = None
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        if _SEARCH.match(line):
+            if path is None:
+                raise PatchError("search/replace block without a file path before it")
+            old_lines, new_lines = [], []
+            i += 1
+            while i < len(lines) and not _DIVIDER.match(lines[i]):
+                old_lines.append(lines[i])
+                i += 1
+            i += 1
+            while i < len(lines) and not _REPLACE.match(lines[i]):
+                new_lines.append(lines[i])
+                i += 1
+            if i >= len(lines):
+                raise PatchError(f"unterminated search/replace block for {path}")
+            patch = patches.setdefault(path, FilePatch(path))
+            patch.create = patch.create or not old_lines
+            patch.hunks.append((old_lines, new_lines, None))
+        elif line.strip() and not line.startswith("```"):
+            path = line.strip().strip("`*: ")
+        i += 1
+    return list(patches.values())
+
+
+def parse(text):
+    """Parses a unified diff or search/replace blocks into FilePatches."""
+    if any(_SEARCH.match(line) for line in text.splitlines()):
+        patches = parse_search_replace(text)
+    else:
+        patches = parse_unified(text)
+    if not patches:
+        raise PatchError("no file patches found (expected a unified diff or SEARCH/REPLACE blocks)")
+    return patches
+
+
+def _find(lines, old, start, hint):
+    """Index of `old` in lines at or after start, preferring the one nearest hint."""
+    if not old:
+        return None
+    normalizers = (lambda s: s, lambda s: s.rstrip(), lambda s: " ".join(s.split()))
+    for level, norm in enumerate(normalizers):
+        target = [norm(s) for s in old]
+        first = target[0]
+        found = [
+            i for i in range(start, len(lines) - len(old) + 1)
+            if norm(lines[i]) == first and [norm(s) for s in lines[i:i + len(old)]] == target
+        ]
+        if found:
+            if hint is None and len(found) > 1:
+                raise PatchError(f"search text matches {len(found)} places; add more context")
+            best = min(found, key=lambda i: abs(i - hint)) if hint is not None else found[0]
+            return best, level > 0
+    return None
+
+
+def _apply_hunks(path, lines, hunks):
+    fuzzy = 0
+    start = 0
+    delta = 0  # how far earlier hunks moved the lines below them
+    for number, (old, new, hint) in enumerate(hunks, 1):
+        hint = max(0, hint - 1 + delta) if hint else None
+        if not old:
+            # Pure insertion (or a new file): at the hint, else at the end
+            at = min(hint, len(lines)) if hint is not None else len(lines)
+            lines[at:at] = new
+            start = at + len(new)
+            delta += len(new)
+            continue
+        match = _find(lines, old, start, hint)
+        trim = 0
+        while match is None and trim < FUZZ:
+            # Like patch --fuzz: retry with outer context lines dropped
+            trim += 1
+            lead = _common_prefix(old, new)
+            tail = _common_suffix(old, new)
+            cut_lead, cut_tail = min(trim, lead), min(trim, tail)
+            if not cut_lead and not cut_tail:
+                break
+            trimmed_old = old[cut_lead:len(old) - cut_tail]
+            trimmed_new = new[cut_lead:len(new) - cut_tail]
+            match = _find(lines, trimmed_old, start, None if hint is None else hint + cut_lead)
+            if match is not None:
+                old, new = trimmed_old, trimmed_new
+        if match is None:
+            preview = "\n".join(old[:3])
+            raise PatchError(f"{path}: hunk {number} does not apply; could not find:\n{preview}")
+        at, was_fuzzy = match
+        fuzzy += was_fuzzy or trim > 0
+        lines[at:at + len(old)] = new
+        start = at + len(new)
+        delta += len(new) - len(old)
+    return fuzzy
+
+
+def _common_prefix(a, b):
+    n = 0
+    while n < min(len(a), len(b)) and a[n] == b[n]:
+        n += 1
+    return n
+
+
+def _common_suffix(a, b):
+    n = 0
+    while n < min(len(a), len(b)) and a[-1 - n] == b[-1 - n]:
+        n += 1
+    return n
+
+
+def plan(patches, base_dir="."):
+    """
+    Applies the patches in memory. Returns [(abs path, original text or None,
+    new text or None, stats)]; raises PatchError if any hunk fails.
+    """
+    changes = []
+    for patch in patches:
+        path = os.path.abspath(os.path.join(os.path.expanduser(base_dir), os.path.expanduser(patch.path)))
+        original = None
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8", newline="") as f:
+                original = f.read()
+        elif not patch.create:
+            raise PatchError(f"{patch.path}: file not found")
+        if patch.delete:
+            removed = len(original.split("\n")) - original.endswith("\n")
+            changes.append((path, original, None, {"hunks": 0, "fuzzy": 0, "added": 0, "removed": removed}))
+            continue
+        text = original or ""
+        newline = "\r\n" if "\r\n" in text else "\n"
+        # split, not splitlines: form feeds and other separators are content
+        lines = text.replace("\r\n", "\n").split("\n")
+        trailing = lines[-1] == ""
+        if trailing:
+            lines.pop()
+        before = list(lines)
+        fuzzy = _apply_hunks(patch.path, lines, patch.hunks)
+        updated = newline.join(lines)
+        if lines and (trailing or original is None):
+            updated += newline
+        added = removed = 0
+        for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, before, lines, autojunk=False).get_opcodes():
+            if tag != "equal":
+                removed += i2 - i1
+                added += j2 - j1
+        changes.append((path, original, updated, {
+            "hunks": len(patch.hunks), "fuzzy": fuzzy, "added": added, "removed": removed,
+        }))
+    return changes
+
+
+def _write_temp(path, text, mode):
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=".patch-", dir=directory)
+    with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+    if mode is not None:
+        os.chmod(tmp, mode)
+    return tmp
+
+
+def commit(changes):
+    """Writes the planned changes all-or-nothing."""
+    modes = {}
+    staged = []
+    try:
+        for path, original, updated, _ in changes:
+            if original is not None:
+                modes[path] = stat.S_IMODE(os.stat(path).st_mode)
+            if updated is not None:
+                staged.append((path, _write_temp(path, updated, modes.get(path))))
+    except OSError:
+        for _, tmp in staged:
+            os.remove(tmp)
+        raise
+
+    done = []
+    try:
+        for path, tmp in staged:
+            os.replace(tmp, path)
+            done.append(path)
+        for path, original, updated, _ in changes:
+            if updated is None:
+                os.remove(path)
+                done.append(path)
+    except OSError:
+        originals = {path: original for path, original, _, _ in changes}
+        for path in done:
+            if originals[path] is None:
+                os.remove(path)
+            else:
+                os.replace(_write_temp(path, originals[path], modes[path]), path)
+        for _, tmp in staged:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        raise
+
+
+def apply(text, base_dir=".", dry_run=False):
+    """Parses and applies a patch; returns the per-file plan that was (or would be) written."""
+    changes = plan(parse(text), base_dir)
+    if not dry_run:
+        commit(changes)
+    return changes
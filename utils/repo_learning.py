@@ -0,0 +1,179 @@
+import os
+import json
+import hashlib
+import subprocess
+import config
+from utils import ingest, file_search
+from utils.ignore import IgnoreRules
+
+# Incremental learn_repo. After each run the learned commit is recorded per
+# (repository, directory, collection), together with the size and mtime of
+# files that had uncommitted changes at the time. The next run learns only
+# what `git diff --name-status <last>..HEAD` and `git status` report as
+# added, modified or renamed, deletes the vectors of removed and renamed-away
+# files, and revisits files that were dirty, failed to learn or failed to be
+# forgotten last time. Without a
+# usable record (first run, rewritten history, full=True) every tracked file
+# is learned; outside git the directory is walked in full as before.
+
+
+def _git(root, *args):
+    return subprocess.run(
+        ["git", "-C", root, *args], check=True, capture_output=True, timeout=60
+    ).stdout.decode("utf-8", errors="replace")
+
+
+def _split_z(output):
+    return [field for field in output.split("\0") if field]
+
+
+def state_path(root, scope, collection_name):
+    key = hashlib.md5(f"{root}\0{scope}\0{collection_name}".encode("utf-8")).hexdigest()
+    return os.path.join(config.LEARN_STATE_DIR, key + ".json")
+
+
+def _load(path):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save(path, state):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp, path)
+
+
+def diff_since(root, commit):
+    """(changed, removed) repository-relative paths between commit and HEAD."""
+    changed, removed = set(), set()
+    fields = _split_z(_git(root, "diff", "--name-status", "-z", "-M", f"{commit}..HEAD"))
+    i = 0
+    while i < len(fields):
+        status = fields[i]
+        if status[0] in "RC":
+            old, new = fields[i + 1], fields[i + 2]
+            if status[0] == "R":
+                removed.add(old)
+            changed.add(new)
+            i += 3
+            continue
+        path = fields[i + 1]
+        (removed if status[0] == "D" else changed).add(path)
+        i += 2
+    return changed, removed
+
+
+def dirty_files(root):
+    """Repository-relative paths of tracked files with uncommitted changes, and of staged deletions."""
+    dirty, deleted = set(), set()
+    fields = _split_z(_git(root, "status", "--porcelain", "-z", "--untracked-files=no"))
+    i = 0
+    while i < len(fields):
+        entry = fields[i]
+        xy, path = entry[:2], entry[3:]
+        if "D" in xy:
+            deleted.add(path)
+        else:
+            dirty.add(path)
+        if "R" in xy or "C" in xy:
+            i += 1  # the next field is the rename source
+            if "R" in xy:
+                deleted.add(fields[i])
+        i += 1
+    return dirty, deleted
+
+
+def _signature(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def plan(root, scope, previous, full=False):
+    """
+    Works out what to learn. Returns (planned, state to record), where
+    planned is (paths to learn, paths to forget) relative to the repository,
+    or None when there is no usable record and every file must be learned.
+    """
+    head = _git(root, "rev-parse", "HEAD").strip()
+    dirty, deleted = dirty_files(root)
+    state = {"commit": head, "dirty": {}, "retry": [], "retry_removed": []}
+    for rel in dirty:
+        signature = _signature(os.path.join(root, rel))
+        if signature is not None:
+            state["dirty"][rel] = signature
+    if full or not previous or not previous.get("commit"):
+        return None, state
+    try:
+        _git(root, "cat-file", "-e", previous["commit"] + "^{commit}")
+    except subprocess.CalledProcessError:
+        return None, state  # history was rewritten since
+    changed, removed = diff_since(root, previous["commit"]) if previous["commit"] != head else (set(), set())
+    removed |= deleted | set(previous.get("retry_removed", []))
+    # Files dirty last time were learned with those changes: relearn them
+    # once they are clean again, or when they changed since the last run
+    was_dirty = previous.get("dirty", {})
+    changed |= {rel for rel in was_dirty if rel not in state["dirty"]} | set(previous.get("retry", []))
+    changed |= {rel for rel, signature in state["dirty"].items() if was_dirty.get(rel) != signature}
+    for rel in list(changed):
+        if not os.path.isfile(os.path.join(root, rel)):
+            changed.discard(rel)
+            removed.add(rel)
+    removed -= changed
+    inside = (lambda rel: rel == scope or rel.startswith(scope + "/")) if scope else (lambda rel: True)
+    return (sorted(filter(inside, changed)), sorted(filter(inside, removed))), state
+
+
+def learn_repo(path=".", full=False, collection_name="agent_learning", **backend):
+    """
+    Learns the files of the repository containing path (limited to path's
+    subtree) and returns the ingestion report text. `backend` is passed to
+    ingest.ingest (embed/upsert/delete_sources for tests).
+    """
+    path = os.path.realpath(os.path.expanduser(path))
+    rules = IgnoreRules(path)
+    try:
+        root = _git(path, "rev-parse", "--show-toplevel").strip()
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        # Not a git repository (or no git): learn everything under path
+        files = list(file_search.walk_files(path, ignore=rules))
+        result = ingest.ingest(files, collection_name=collection_name, **backend)
+        return ingest.format_report(result, collection_name)
+
+    scope = os.path.relpath(path, root).replace(os.sep, "/")
+    scope = "" if scope == "." else scope
+    record = state_path(root, scope, collection_name)
+    previous = None if full else _load(record)
+    try:
+        planned, state = plan(root, scope, previous, full)
+    except subprocess.CalledProcessError:
+        planned, state = None, None  # no commits yet
+    if planned is None:
+        listing = _git(root, "ls-files", "-z", "--", scope or ".")
+        learn, forget = sorted(_split_z(listing)), []
+    else:
+        learn, forget = planned
+    if planned is not None and not learn and not forget:
+        return f"Repository already learned at {state['commit'][:12]}; nothing changed."
+
+    absolute = {os.path.join(root, rel): rel for rel in learn}
+    forgotten = {os.path.join(root, rel): rel for rel in forget}
+    # Tracked files can still match PROJECT_CONTEXT_IGNORE
+    files = [p for p in absolute if os.path.isfile(p) and not rules.ignored_path(p)]
+    result = ingest.ingest(
+        files, collection_name=collection_name, removed=list(forgotten), **backend
+    )
+    if state is not None:
+        state["retry"] = sorted(absolute[p] for p in result["failed"] if p in absolute)
+        # Vectors that could not be deleted are deleted again next run
+        state["retry_removed"] = sorted(forgotten[p] for p in result["failed"] if p in forgotten)
+        _save(record, state)
+    mode = "full" if planned is None else f"incremental since {previous['commit'][:12]}"
+    return f"Learned repository ({mode}).\n" + ingest.format_report(result, collection_name)
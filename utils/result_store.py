@@ -0,0 +1,95 @@
+import os
+import re
+import hashlib
+import config
+
+# Large tool results are written here instead of going into the conversation
+# history verbatim, where they would be re-sent with every later request.
+# The model gets a head/tail preview and a handle it can page through with
+# the fetch_result tool.
+_HANDLE = re.compile(r"^[A-Za-z0-9_.-]+$")
+
+
+def _directory(directory=None):
+    return os.path.expanduser(directory or config.RESULT_STORE_DIR)
+
+
+def _prune(directory, keep):
+    try:
+        entries = sorted(os.scandir(directory), key=lambda e: e.stat().st_mtime)
+    except OSError:
+        return
+    for entry in entries[:-keep] if keep else []:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def spill(tool_name, result, directory=None, threshold=None):
+    """
+    Returns `result` unchanged if it is small, otherwise stores its text and
+    returns a preview that names the handle to fetch the rest with.
+    """
+    threshold = threshold or config.RESULT_SPILL_CHARS
+    text = result if isinstance(result, str) else str(result)
+    if len(text) <= threshold:
+        return result
+
+    directory = _directory(directory)
+    digest = hashlib.sha1(text.encode("utf-8", errors="replace")).hexdigest()[:12]
+    handle = f"{re.sub(r'[^A-Za-z0-9_]', '_', tool_name)}-{digest}"
+    try:
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{handle}.txt")
+        if not os.path.exists(path):
+            with open(path, "w", encoding="utf-8", errors="replace") as f:
+                f.write(text)
+            _prune(directory, config.RESULT_STORE_MAX_FILES)
+    except OSError as e:
+        print(f"⚠️ Could not store large result of {tool_name}: {e}")
+        return result
+
+    head = text[:config.RESULT_PREVIEW_HEAD]
+    tail = text[-config.RESULT_PREVIEW_TAIL:] if config.RESULT_PREVIEW_TAIL else ""
+    omitted = len(text) - len(head) - len(tail)
+    return (
+        f"{head}\n\n"
+        f"... [{omitted} of {len(text)} characters omitted. Full result stored as handle '{handle}'; "
+        f"call fetch_result(handle='{handle}', offset={len(head)}, length={config.RESULT_PAGE_CHARS}) to read more.] ...\n\n"
+        f"{tail}"
+    )
+
+
+def _header(handle, start, end, total):
+    return f"[{handle}: characters {start}-{end} of {total}]\n"
+
+
+def _footer(handle, offset, length):
+    return f"\n[Next: fetch_result(handle='{handle}', offset={offset}, length={length})]"
+
+
+def fetch(handle, offset=0, length=None, directory=None):
+    """Returns characters [offset, offset + length) of a stored result."""
+    if not _HANDLE.match(handle or ""):
+        return f"Error: Invalid result handle '{handle}'."
+    path = os.path.join(_directory(directory), f"{handle}.txt")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            text = f.read()
+    except FileNotFoundError:
+        return f"Error: Unknown result handle '{handle}'."
+    except OSError as e:
+        return f"Error reading result '{handle}': {e}"
+
+    offset = max(int(offset or 0), 0)
+    length = int(length or config.RESULT_PAGE_CHARS)
+    # Keep the whole page, header and footer included, under the spill
+    # threshold so execute_tool never spills a page again
+    size = str(max(len(text), offset))
+    overhead = len(_header(handle, size, size, size)) + len(_footer(handle, size, length))
+    length = max(1, min(length, config.RESULT_SPILL_CHARS - overhead))
+    chunk = text[offset:offset + length]
+    end = offset + len(chunk)
+    footer = _footer(handle, end, length) if end < len(text) else "\n[End of result]"
+    return f"{_header(handle, offset, end, len(text))}{chunk}{footer}"
@@ -0,0 +1,233 @@
+import os
+import time
+import signal
+import threading
+import subprocess
+import contextlib
+import config
+
+# Runs tool calls on a supervised worker thread with a deadline.
+# A call that overruns is cancelled: its cancel flag is set (checked by
+# check_cancelled()/sleep()), every subprocess it started through
+# run_process() has its process group killed, and the caller gets a
+# structured timeout result instead of waiting on the tool.
+
+_local = threading.local()
+
+
+class ToolCancelled(Exception):
+    """Raised inside a tool once its call has been cancelled."""
+
+
+class ToolCall:
+    def __init__(self, name, timeout):
+        self.name = name
+        self.timeout = timeout
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.cancelled = threading.Event()
+        self.finished = threading.Event()
+        self.processes = set()
+        self.result = None
+        self.error = None
+        self._paused_since = None
+        self._lock = threading.Lock()
+
+    def remaining(self):
+        if self.deadline is None or self._paused_since is not None:
+            return None
+        return self.deadline - time.monotonic()
+
+    def pause(self):
+        self._paused_since = time.monotonic()
+
+    def resume(self):
+        if self._paused_since is not None and self.deadline is not None:
+            self.deadline += time.monotonic() - self._paused_since
+        self._paused_since = None
+
+    def add_process(self, proc):
+        with self._lock:
+            self.processes.add(proc)
+        if self.cancelled.is_set():
+            _kill(proc)
+
+    def discard_process(self, proc):
+        with self._lock:
+            self.processes.discard(proc)
+
+    def cancel(self):
+        self.cancelled.set()
+        with self._lock:
+            processes = list(self.processes)
+        for proc in processes:
+            _kill(proc)
+
+
+def _kill(proc):
+    if proc.poll() is not None:
+        return
+    try:
+        if getattr(proc, "_own_session", False):
+            os.killpg(proc.pid, signal.SIGKILL)
+        else:
+            proc.kill()
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def current_call():
+    return getattr(_local, "call", None)
+
+
+def default_timeout(name):
+    return config.TOOL_TIMEOUTS.get(name, config.TOOL_TIMEOUTS.get("default"))
+
+
+def check_cancelled():
+    """Cooperative cancellation point for long-running tools."""
+    call = current_call()
+    if call is not None and call.cancelled.is_set():
+        raise ToolCancelled(f"Tool '{call.name}' was cancelled.")
+
+
+def sleep(seconds):
+    """time.sleep() that wakes up as soon as the current call is cancelled."""
+    call = current_call()
+    if call is None:
+        time.sleep(seconds)
+        return
+    if call.cancelled.wait(seconds):
+        raise ToolCancelled(f"Tool '{call.name}' was cancelled.")
+
+
+def remaining(default=None):
+    """Seconds left before the current call's deadline, capped at `default`."""
+    call = current_call()
+    left = call.remaining() if call is not None else None
+    if left is None:
+        return default
+    left = max(left, 0.1)
+    return min(left, default) if default else left
+
+
+@contextlib.contextmanager
+def paused():
+    """Stops the deadline clock, e.g. while waiting for the user to confirm."""
+    call = current_call()
+    if call is None:
+        yield
+        return
+    call.pause()
+    try:
+        yield
+    finally:
+        call.resume()
+
+
+def run_process(command, shell=False, capture_output=False, text=True, input=None, interactive=False):
+    """
+    subprocess.run() replacement that registers the child with the current call.
+    Non-interactive children get their own session so a timeout can kill the
+    whole process group; interactive ones (sudo, credential prompts) keep the
+    terminal and only the direct child is killed.
+    """
+    pipe = subprocess.PIPE if capture_output else None
+    proc = subprocess.Popen(
+        command,
+        shell=shell,
+        stdout=pipe,
+        stderr=pipe,
+        stdin=subprocess.PIPE if input is not None else None,
+        text=text,
+        start_new_session=not interactive,
+    )
+    proc._own_session = not interactive
+    call = current_call()
+    if call is not None:
+        call.add_process(proc)
+    try:
+        stdout, stderr = proc.communicate(input)
+    finally:
+        if call is not None:
+            call.discard_process(proc)
+    check_cancelled()
+    return subprocess.CompletedProcess(proc.args, proc.returncode, stdout, stderr)
+
+
+@contextlib.contextmanager
+def bound(call):
+    """Makes `call` the current call of this thread, for long work started outside run_with_deadline()."""
+    previous = current_call()
+    _local.call = call
+    try:
+        yield call
+    finally:
+        _local.call = previous
+
+
+def _worker(call, func, args, kwargs):
+    _local.call = call
+    try:
+        call.result = func(*args, **kwargs)
+    except BaseException as e:
+        call.error = e
+    finally:
+        _local.call = None
+        call.finished.set()
+
+
+def timeout_result(call):
+    return {
+        "status": "timeout",
+        "tool": call.name,
+        "timeout_seconds": call.timeout,
+        "error": f"Tool '{call.name}' did not finish within {call.timeout}s and was cancelled.",
+    }
+
+
+def run_with_deadline(name, func, args=(), kwargs=None, timeout=None):
+    """
+    Runs func(*args, **kwargs) on a worker thread and waits at most `timeout`
+    seconds (default: config.TOOL_TIMEOUTS for `name`). Exceptions raised by
+    the tool are re-raised here; an overrun returns timeout_result().
+    """
+    if timeout is None:
+        timeout = default_timeout(name)
+    if current_call() is not None or not timeout:
+        # Nested tool calls share the outer deadline.
+        return func(*args, **(kwargs or {}))
+
+    call = ToolCall(name, timeout)
+    worker = threading.Thread(
+        target=_worker, args=(call, func, args, kwargs or {}), name=f"tool-{name}", daemon=True
+    )
+    worker.start()
+    try:
+        while not call.finished.is_set():
+            left = call.remaining()
+            if left is not None and left <= 0:
+                call.cancel()
+                # Give the worker a moment to unwind; a thread stuck in pure Python
+                # cannot be interrupted and is left to finish in the background.
+                call.finished.wait(1.0)
+                return timeout_result(call)
+            call.finished.wait(min(left, 0.5) if left is not None else 0.5)
+    except KeyboardInterrupt:
+        call.cancel()
+        raise
+
+    if call.error is not None:
+        raise call.error
+    return call.result
+
+
+def pop_timeout(args):
+    """Removes the per-call `timeout_seconds` override from tool arguments."""
+    if not isinstance(args, dict) or "timeout_seconds" not in args:
+        return args, None
+    args = dict(args)
+    value = args.pop("timeout_seconds")
+    try:
+        return args, float(value)
+    except (TypeError, ValueError):
+        return args, None
@@ -0,0 +1,172 @@
+import os
+import json
+import time
+import threading
+from collections import OrderedDict
+
+# Shared memo table for idempotent tools. A tool opts in with
+# @tool(..., cache=<policy>): the policy names a scope and computes a cheap
+# validator (file stat, git index/HEAD, dpkg status, PATH directories) that
+# must match for a stored result to be reused. Mutating tools declare
+# @tool(..., invalidates=(<scope>, ...)) and drop the related entries after
+# they run; "*" drops everything (e.g. arbitrary shell commands).
+MAX_ENTRIES = 256
+
+_lock = threading.Lock()
+_entries = OrderedDict()
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+class Policy:
+    def __init__(self, scope, key, ttl=None, key_after_call=False):
+        self.scope = scope
+        self.key = key
+        self.ttl = ttl
+        # For tools that themselves touch what the key stats (git status
+        # refreshes the index), the key is re-read once the call returned.
+        self.key_after_call = key_after_call
+
+
+def _stat_key(path):
+    st = os.stat(path)
+    return (path, st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def files(arg="filepath"):
+    """Valid while the file named by argument `arg` keeps its mtime, size and inode."""
+    def key(args):
+        path = args.get(arg)
+        if not path:
+            return None
+        return _stat_key(os.path.abspath(os.path.expanduser(path)))
+    return Policy("files", key)
+
+
+def _git_dir(start):
+    path = start
+    while True:
+        candidate = os.path.join(path, ".git")
+        if os.path.isdir(candidate):
+            return candidate
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def git(worktree=False, ttl=None):
+    """
+    Valid while HEAD, the ref it points to and the index are unchanged.
+    Edits to tracked files do not touch those, so tools that read the working
+    tree (worktree=True) should also set a ttl.
+    """
+    def key(args):
+        git_dir = _git_dir(os.getcwd())
+        if git_dir is None:
+            return None
+        parts = [_stat_key(os.path.join(git_dir, "HEAD"))]
+        with open(os.path.join(git_dir, "HEAD"), "r", encoding="utf-8") as f:
+            head = f.read().strip()
+        if head.startswith("ref: "):
+            ref = os.path.join(git_dir, head[5:])
+            parts.append(_stat_key(ref) if os.path.exists(ref) else ref)
+        for name in ("packed-refs", "index") if worktree else ("packed-refs",):
+            path = os.path.join(git_dir, name)
+            if os.path.exists(path):
+                parts.append(_stat_key(path))
+        return tuple(parts)
+    return Policy("git", key, ttl, key_after_call=worktree)
+
+
+def packages():
+    """Valid while the dpkg status database is unchanged."""
+    candidates = [
+        os.path.join(os.environ.get("PREFIX", ""), "var/lib/dpkg/status"),
+        "/var/lib/dpkg/status",
+    ]
+
+    def key(args):
+        for path in candidates:
+            if os.path.exists(path):
+                return _stat_key(path)
+        return None
+    return Policy("packages", key)
+
+
+def executables():
+    """Valid while PATH and the directories on it are unchanged."""
+    def key(args):
+        dirs = os.environ.get("PATH", "").split(os.pathsep)
+        return tuple(_stat_key(d) if os.path.isdir(d) else d for d in dirs)
+    return Policy("executables", key)
+
+
+def _cacheable(result):
+    return not (isinstance(result, str) and result.startswith("Error"))
+
+
+def call(spec, args):
+    """Runs spec.func(**args), reusing a stored result whose validator still matches."""
+    policy = spec.cache
+    try:
+        validator = policy.key(args)
+    except (OSError, ValueError):
+        validator = None
+    if validator is None:
+        return spec.func(**args)
+
+    entry_key = (spec.name, json.dumps(args, sort_keys=True, default=str), os.getcwd())
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get(entry_key)
+        if (
+            entry is not None
+            and entry["validator"] == validator
+            and (policy.ttl is None or now - entry["stored"] < policy.ttl)
+        ):
+            _entries.move_to_end(entry_key)
+            _stats["hits"] += 1
+            return entry["result"]
+        _stats["misses"] += 1
+
+    # Unless key_after_call, the validator was taken before running, so a
+    # change made meanwhile makes the entry miss next time instead of serving
+    # stale data.
+    result = spec.func(**args)
+    if policy.key_after_call:
+        try:
+            validator = policy.key(args)
+        except (OSError, ValueError):
+            validator = None
+    if validator is not None and _cacheable(result):
+        with _lock:
+            _entries[entry_key] = {
+                "scope": policy.scope, "validator": validator, "stored": now, "result": result,
+            }
+            _entries.move_to_end(entry_key)
+            while len(_entries) > MAX_ENTRIES:
+                _entries.popitem(last=False)
+    return result
+
+
+def invalidate(scopes):
+    """Drops the entries of the given scopes ("*" for all)."""
+    if not scopes:
+        return
+    with _lock:
+        if "*" in scopes:
+            dropped = list(_entries)
+        else:
+            dropped = [k for k, entry in _entries.items() if entry["scope"] in scopes]
+        for key in dropped:
+            del _entries[key]
+        _stats["invalidations"] += 1
+
+
+def clear():
+    invalidate(("*",))
+
+
+def stats():
+    with _lock:
+        return dict(_stats, entries=len(_entries))
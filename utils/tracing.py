@@ -0,0 +1,159 @@
+import os
+import json
+import time
+import atexit
+import functools
+import threading
+
+# Tracing is off unless enable() is called; span() then hands back a shared
+# no-op context manager so the hot paths pay a single global lookup.
+_enabled = False
+_events = []
+_lock = threading.Lock()
+_path = None
+_format = "chrome"
+_stream = None
+
+DEFAULT_TRACE_PATH = "agent_trace.json"
+
+
+def is_enabled():
+    return _enabled
+
+
+def enable(path=DEFAULT_TRACE_PATH):
+    """
+    Starts recording spans to `path`. A `.jsonl` path streams one event per
+    line; anything else is written as a Chrome `trace_event` file at exit
+    (open it in chrome://tracing or https://ui.perfetto.dev).
+    """
+    global _enabled, _path, _format, _stream
+    if _enabled:
+        return
+    _path = os.path.expanduser(path)
+    _format = "jsonl" if _path.endswith(".jsonl") else "chrome"
+    if _format == "jsonl":
+        _stream = open(_path, "w", encoding="utf-8", buffering=1)
+    _enabled = True
+    atexit.register(flush)
+
+
+def disable():
+    """Stops recording and writes out (or closes) the trace."""
+    global _enabled, _stream
+    flush()
+    _enabled = False
+    with _lock:
+        if _stream is not None:
+            _stream.close()
+            _stream = None
+        _events.clear()
+    atexit.unregister(flush)
+
+
+def enable_from_argv(argv):
+    """
+    Handles `--profile` / `--profile=PATH` in an argument list.
+    Returns the arguments with the profile flag removed.
+    """
+    remaining = []
+    for arg in argv:
+        if arg == "--profile":
+            enable()
+        elif arg.startswith("--profile="):
+            enable(arg.split("=", 1)[1] or DEFAULT_TRACE_PATH)
+        else:
+            remaining.append(arg)
+    return remaining
+
+
+def _record(name, category, start_ns, end_ns, args):
+    event = {
+        "name": name,
+        "cat": category,
+        "ph": "X",
+        "ts": start_ns / 1000.0,
+        "dur": (end_ns - start_ns) / 1000.0,
+        "pid": os.getpid(),
+        "tid": threading.get_ident(),
+    }
+    if args:
+        event["args"] = args
+    with _lock:
+        if _stream is not None:
+            _stream.write(json.dumps(event, default=str) + "\n")
+        else:
+            _events.append(event)
+
+
+class _Span:
+    __slots__ = ("name", "category", "args", "_start")
+
+    def __init__(self, name, category, args):
+        self.name = name
+        self.category = category
+        self.args = args
+
+    def set(self, **attrs):
+        """Attaches extra attributes once they are known (e.g. a result size)."""
+        self.args.update(attrs)
+
+    def __enter__(self):
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.args["error"] = f"{exc_type.__name__}: {exc}"
+        _record(self.name, self.category, self._start, time.perf_counter_ns(), self.args)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name, category="agent", **attrs):
+    """Context manager timing a block. Costs one flag check when tracing is off."""
+    if not _enabled:
+        return _NULL_SPAN
+    return _Span(name, category, attrs)
+
+
+def traced(name=None, category="agent"):
+    """Decorator form of span()."""
+    def decorator(func):
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Span(span_name, category, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def flush():
+    """Writes buffered events to the trace file."""
+    with _lock:
+        if _stream is not None:
+            _stream.flush()
+            return
+        if not _path or not _events:
+            return
+        with open(_path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": _events, "displayTimeUnit": "ms"}, f, default=str)
@@ -0,0 +1,243 @@
+import os
+import re
+import array
+import sqlite3
+import hashlib
+import config
+from utils import supervisor, file_search
+from utils.ignore import IgnoreRules
+
+try:
+    import re._parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Persistent trigram index of a workspace, stored in SQLite under
+# config.INDEX_DIR. Each file's lower-cased byte trigrams are kept as a
+# posting list per trigram; refresh() re-indexes only files whose mtime or
+# size changed. A query extracts the literal runs the regex requires,
+# intersects their trigrams' posting lists and verifies just the candidates
+# with file_search. Patterns without a usable literal fall back to scanning
+# every indexed file.
+# Larger text files, and files that could not be read, are recorded as
+# unindexed and verified by every query.
+MAX_FILE_BYTES = 2 * 1024 * 1024
+FLUSH_POSTINGS = 2_000_000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY,
+    path TEXT UNIQUE NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    trigrams BLOB NOT NULL,
+    unindexed INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS postings (
+    trigram INTEGER NOT NULL,
+    file_id INTEGER NOT NULL,
+    PRIMARY KEY (trigram, file_id)
+) WITHOUT ROWID;
+"""
+
+
+def trigrams(data):
+    """Sorted unique trigrams of the lower-cased bytes, as 24-bit ints."""
+    data = data.lower()
+    if len(data) < 3:
+        return []
+    if np is not None:
+        b = np.frombuffer(data, dtype=np.uint8).astype(np.uint32)
+        return np.unique((b[:-2] << 16) | (b[1:-1] << 8) | b[2:]).tolist()
+    return sorted({(data[i] << 16) | (data[i + 1] << 8) | data[i + 2] for i in range(len(data) - 2)})
+
+
+def _runs(parsed, out):
+    """Collects the literal strings every match of the parsed pattern must contain."""
+    run = []
+    for op, av in parsed:
+        if op is sre_parse.LITERAL:
+            run.append(chr(av))
+            continue
+        if op is sre_parse.AT:
+            continue  # anchors do not consume anything
+        if run:
+            out.append("".join(run))
+            run = []
+        if op is sre_parse.SUBPATTERN:
+            _runs(av[-1], out)
+        elif op in (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT) and av[0] >= 1:
+            _runs(av[2], out)
+    if run:
+        out.append("".join(run))
+    return out
+
+
+def required_literals(pattern, literal=False):
+    if literal:
+        return [pattern]
+    try:
+        return _runs(sre_parse.parse(pattern), [])
+    except Exception:
+        return []
+
+
+def _index_path(root):
+    digest = hashlib.sha1(root.encode("utf-8")).hexdigest()[:16]
+    return os.path.join(os.path.expanduser(config.INDEX_DIR), f"{digest}.sqlite")
+
+
+class TrigramIndex:
+    def __init__(self, root, path=None):
+        self.root = os.path.abspath(os.path.expanduser(root))
+        self.path = path or _index_path(self.root)
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.db = sqlite3.connect(self.path)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(_SCHEMA)
+        columns = [row[1] for row in self.db.execute("PRAGMA table_info(files)")]
+        if "unindexed" not in columns:
+            # Indexes built before the column existed only skipped large files
+            with self.db:
+                self.db.execute("ALTER TABLE files ADD COLUMN unindexed INTEGER NOT NULL DEFAULT 0")
+                self.db.execute("UPDATE files SET unindexed = 1 WHERE size > ?", (MAX_FILE_BYTES,))
+        self._pending = []
+
+    def close(self):
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _remove(self, file_id, blob):
+        old = array.array("I")
+        old.frombytes(blob)
+        self.db.executemany(
+            "DELETE FROM postings WHERE trigram = ? AND file_id = ?", ((t, file_id) for t in old)
+        )
+        self.db.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def _add(self, path, st):
+        """
+        Indexes one file. Binary files are recorded without trigrams; oversized
+        text files and unreadable ones are marked unindexed.
+        """
+        grams = array.array("I")
+        indexed = unindexed = False
+        try:
+            if not file_search.binary_extension(path):
+                with open(path, "rb") as f:
+                    head = f.read(file_search.SNIFF_BYTES)
+                    if not file_search.is_binary(head):
+                        if st.st_size > MAX_FILE_BYTES:
+                            unindexed = True
+                        else:
+                            grams.extend(trigrams(head + f.read()))
+                            indexed = True
+        except OSError:
+            unindexed = True
+        cur = self.db.execute(
+            "INSERT INTO files (path, mtime_ns, size, trigrams, unindexed) VALUES (?, ?, ?, ?, ?)",
+            (path, st.st_mtime_ns, st.st_size, grams.tobytes(), int(unindexed)),
+        )
+        file_id = cur.lastrowid
+        self._pending.extend((t, file_id) for t in grams)
+        if len(self._pending) >= FLUSH_POSTINGS:
+            self._flush()
+        return indexed
+
+    def _flush(self):
+        # Inserting in key order appends to the B-tree instead of splitting
+        # pages all over it, which is several times faster for a full build.
+        self._pending.sort()
+        self.db.executemany("INSERT OR IGNORE INTO postings (trigram, file_id) VALUES (?, ?)", self._pending)
+        self._pending = []
+
+    def refresh(self):
+        """Brings the index up to date with the workspace; returns what changed."""
+        known = {
+            path: (file_id, mtime_ns, size)
+            for file_id, path, mtime_ns, size in self.db.execute("SELECT id, path, mtime_ns, size FROM files")
+        }
+        stats = {"added": 0, "updated": 0, "removed": 0, "skipped": 0}
+        seen = set()
+        with self.db:
+            for path in file_search.walk_files(self.root, ignore=IgnoreRules(self.root)):
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                seen.add(path)
+                entry = known.get(path)
+                if entry is not None and entry[1:] == (st.st_mtime_ns, st.st_size):
+                    continue
+                if entry is not None:
+                    self._remove(entry[0], self._blob(entry[0]))
+                if self._add(path, st):
+                    stats["updated" if entry is not None else "added"] += 1
+                else:
+                    stats["skipped"] += 1
+                supervisor.check_cancelled()
+            for path in known.keys() - seen:
+                file_id = known[path][0]
+                self._remove(file_id, self._blob(file_id))
+                stats["removed"] += 1
+            self._flush()
+        stats["files"] = self.db.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+        return stats
+
+    def _blob(self, file_id):
+        row = self.db.execute("SELECT trigrams FROM files WHERE id = ?", (file_id,)).fetchone()
+        return row[0] if row else b""
+
+    def candidates(self, literals, ignore_case=False):
+        """
+        Paths that contain every trigram of the literals, plus the unindexed
+        ones, or None if the literals give no filter.
+        """
+        wanted = set()
+        for text in literals:
+            wanted.update(trigrams(text.encode("utf-8")))
+        if ignore_case:
+            # The index only folds ASCII, so other bytes could match in another case
+            wanted = {t for t in wanted if not t & 0x808080}
+        if not wanted:
+            return None
+        ids = None
+        for trigram in wanted:
+            posting = {row[0] for row in self.db.execute(
+                "SELECT file_id FROM postings WHERE trigram = ?", (trigram,)
+            )}
+            ids = posting if ids is None else ids & posting
+            if not ids:
+                break
+        ids |= {row[0] for row in self.db.execute("SELECT id FROM files WHERE unindexed = 1")}
+        if not ids:
+            return []
+        placeholders = ",".join("?" * len(ids))
+        return sorted(
+            row[0] for row in self.db.execute(f"SELECT path FROM files WHERE id IN ({placeholders})", tuple(ids))
+        )
+
+    def all_paths(self):
+        return [row[0] for row in self.db.execute("SELECT path FROM files ORDER BY path")]
+
+    def search(self, pattern, literal=False, ignore_case=False, max_results=200):
+        """Returns (results, truncated, candidate count) for a regex or literal query."""
+        flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+        regex = re.compile(re.escape(pattern.encode("utf-8")) if literal else pattern.encode("utf-8"), flags)
+        ignore_case = bool(regex.flags & re.IGNORECASE)
+        paths = self.candidates(required_literals(pattern, literal), ignore_case)
+        if paths is None:
+            paths = self.all_paths()
+        results, truncated = file_search.search_paths(paths, regex, max_results)
+        return results, truncated, len(paths)
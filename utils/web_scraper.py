@@ -1,12 +1,13 @@
 import requests
 from bs4 import BeautifulSoup
+from utils import supervisor
 
 def scrape_text(url: str) -> str:
     """
     Scrapes the text content from a given URL.
     """
     try:
-        response = requests.get(url)
+        response = requests.get(url, timeout=supervisor.remaining(30))
         response.raise_for_status()  # Raise an exception for bad status codes
         soup = BeautifulSoup(response.content, "html.parser")
         return soup.get_text()
@@ -0,0 +1,333 @@
+import os
+import sys
+import queue
+import runpy
+import signal
+import socket
+import argparse
+import atexit
+import importlib
+import importlib.util
+import selectors
+import threading
+import traceback
+import subprocess
+from multiprocessing.connection import Connection
+
+import config
+from utils import supervisor
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+# Pool of pre-warmed worker processes for the tools in config.WORKER_POOL_TOOLS.
+# Each worker imports the tool library (and config.WORKER_PRELOAD) once, then
+# serves calls over a socketpair. A worker is replaced after
+# config.WORKER_MAX_CALLS calls, when its RSS exceeds config.WORKER_MAX_RSS_MB,
+# when it crashes, or when a call is cancelled; the agent process only sees an
+# error result. Inside a worker, run_module() forks the warm process to run
+# `python -m <module>` without interpreter startup or re-importing the module.
+
+_in_worker = False
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class WorkerCrashed(Exception):
+    """The worker process died while running a call."""
+
+
+def _rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class Worker:
+    def __init__(self):
+        parent_sock, child_sock = socket.socketpair()
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [PROJECT_ROOT, env.get("PYTHONPATH")]))
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "utils.worker_pool", "--fd", str(child_sock.fileno())],
+            pass_fds=(child_sock.fileno(),),
+            stdin=subprocess.DEVNULL,
+            env=env,
+            start_new_session=True,
+        )
+        child_sock.close()
+        self.conn = Connection(parent_sock.detach())
+        self.calls = 0
+        self.rss_mb = 0.0
+
+    @property
+    def pid(self):
+        return self.proc.pid
+
+    def alive(self):
+        return self.proc.poll() is None
+
+    def call(self, name, args):
+        """Runs one tool call, honouring the current call's cancellation."""
+        self.calls += 1
+        try:
+            self.conn.send(("call", name, args, os.getcwd()))
+            while not self.conn.poll(0.2):
+                supervisor.check_cancelled()
+                if not self.alive():
+                    break
+            status, payload, self.rss_mb = self.conn.recv()
+        except (EOFError, OSError, BrokenPipeError):
+            self.proc.wait()
+            raise WorkerCrashed(
+                f"Worker process for '{name}' exited unexpectedly (exit code {self.proc.returncode})."
+            )
+        if status == "error":
+            return f"Error executing tool '{name}': {payload}"
+        return payload
+
+    def stop(self, kill=False):
+        if self.alive() and not kill:
+            try:
+                self.conn.send(("stop",))
+                self.proc.wait(timeout=2)
+            except (OSError, subprocess.TimeoutExpired):
+                kill = True
+        if kill and self.alive():
+            try:
+                os.killpg(self.proc.pid, signal.SIGKILL)
+            except (ProcessLookupError, PermissionError):
+                pass
+            self.proc.wait()
+        self.conn.close()
+
+
+class WorkerPool:
+    def __init__(self, size=None, max_calls=None, max_rss_mb=None):
+        self.size = size or config.WORKER_POOL_SIZE
+        self.max_calls = max_calls or config.WORKER_MAX_CALLS
+        self.max_rss_mb = max_rss_mb or config.WORKER_MAX_RSS_MB
+        self._idle = queue.Queue()
+        self._workers = set()
+        self._lock = threading.Lock()
+        self._generation = 0
+        for _ in range(self.size):
+            self._add_worker()
+
+    def _add_worker(self):
+        worker = Worker()
+        worker.generation = self._generation
+        with self._lock:
+            self._workers.add(worker)
+        self._idle.put(worker)
+
+    def _retire(self, worker, kill=False):
+        with self._lock:
+            self._workers.discard(worker)
+        worker.stop(kill=kill)
+        self._add_worker()
+
+    def call(self, name, args):
+        while True:
+            try:
+                worker = self._idle.get(timeout=0.2)
+                break
+            except queue.Empty:
+                supervisor.check_cancelled()
+        try:
+            result = worker.call(name, args)
+        except WorkerCrashed as e:
+            self._retire(worker, kill=True)
+            return f"Error: {e}"
+        except BaseException:
+            # Cancelled or interrupted: the worker may still be running the call
+            self._retire(worker, kill=True)
+            raise
+        if (
+            worker.calls >= self.max_calls
+            or worker.rss_mb > self.max_rss_mb
+            or worker.generation != self._generation
+        ):
+            self._retire(worker)
+        else:
+            self._idle.put(worker)
+        return result
+
+    def recycle(self):
+        """Replaces every worker, e.g. after tool modules were reloaded."""
+        self._generation += 1
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._retire(worker)
+        # Busy workers are retired when their call returns
+
+    def stats(self):
+        with self._lock:
+            return [{"pid": w.pid, "calls": w.calls, "rss_mb": round(w.rss_mb, 1)} for w in self._workers]
+
+    def close(self):
+        with self._lock:
+            workers = list(self._workers)
+            self._workers.clear()
+        for worker in workers:
+            worker.stop(kill=not worker.alive())
+
+
+def enabled(name):
+    return config.WORKER_POOL_SIZE > 0 and name in config.WORKER_POOL_TOOLS and not _in_worker
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkerPool()
+            atexit.register(shutdown)
+        return _pool
+
+
+def prewarm():
+    """Starts the workers in the background so the first pooled call does not wait on imports."""
+    if config.WORKER_POOL_SIZE > 0 and config.WORKER_POOL_TOOLS:
+        get_pool()
+
+
+def recycle():
+    if _pool is not None:
+        _pool.recycle()
+
+
+def shutdown():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+def call(name, args):
+    return get_pool().call(name, args)
+
+
+def _drain(fds):
+    """Reads every fd until EOF without blocking on the order the child writes them."""
+    chunks = {fd: [] for fd in fds}
+    with selectors.DefaultSelector() as selector:
+        for fd in fds:
+            selector.register(fd, selectors.EVENT_READ)
+        open_fds = len(fds)
+        while open_fds:
+            for key, _ in selector.select():
+                data = os.read(key.fd, 65536)
+                if data:
+                    chunks[key.fd].append(data)
+                else:
+                    selector.unregister(key.fd)
+                    open_fds -= 1
+    return [b"".join(chunks[fd]).decode(errors="replace") for fd in fds]
+
+
+def run_module(module, args=(), capture_output=True):
+    """
+    Equivalent of supervisor.run_process([sys.executable, "-m", module, *args]).
+    In a pool worker the module runs in a fork of the warm worker, so neither
+    the interpreter nor already imported packages start from scratch.
+    """
+    args = [str(a) for a in args]
+    if not _in_worker or not hasattr(os, "fork"):
+        return supervisor.run_process([sys.executable, "-m", module, *args], capture_output=capture_output)
+
+    command = [sys.executable, "-m", module, *args]
+    if importlib.util.find_spec(module) is None:
+        return subprocess.CompletedProcess(command, 1, "", f"{sys.executable}: No module named {module}\n")
+
+    out_r, out_w = os.pipe()
+    err_r, err_w = os.pipe()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            os.close(out_r)
+            os.close(err_r)
+            os.dup2(out_w, 1)
+            os.dup2(err_w, 2)
+            sys.argv = [module, *args]
+            runpy.run_module(module, run_name="__main__", alter_sys=True)
+            code = 0
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            try:
+                sys.stdout.flush()
+                sys.stderr.flush()
+            finally:
+                os._exit(code)
+
+    os.close(out_w)
+    os.close(err_w)
+    stdout, stderr = _drain([out_r, err_r])
+    os.close(out_r)
+    os.close(err_r)
+    _, status = os.waitpid(pid, 0)
+    returncode = os.waitstatus_to_exitcode(status)
+    if not capture_output:
+        sys.stdout.write(stdout)
+        sys.stderr.write(stderr)
+        stdout = stderr = None
+    return subprocess.CompletedProcess(command, returncode, stdout, stderr)
+
+
+def _serve(fd):
+    global _in_worker
+    _in_worker = True
+    conn = Connection(fd)
+
+    import tools_mod
+    for module in config.WORKER_PRELOAD:
+        try:
+            importlib.import_module(module)
+        except Exception:
+            pass
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+        if message[0] == "stop":
+            break
+        _, name, args, cwd = message
+        try:
+            if cwd != os.getcwd():
+                os.chdir(cwd)
+            status, payload = "ok", tools_mod._execute_tool(name, args)
+        except BaseException as e:
+            status, payload = "error", f"{type(e).__name__}: {e}"
+        try:
+            conn.send((status, payload, _rss_mb()))
+        except Exception as e:
+            # Unpicklable result
+            conn.send(("ok", str(payload) if status == "ok" else f"{e}", _rss_mb()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tool worker process (started by WorkerPool).")
+    parser.add_argument("--fd", type=int, required=True)
+    args = parser.parse_args()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # Ctrl+C is handled by the agent
+    # Serve from the importable module so tools see _in_worker set
+    from utils import worker_pool
+    worker_pool._serve(args.fd)
+
+
+if __name__ == "__main__":
+    main()